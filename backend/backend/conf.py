@@ -0,0 +1,22 @@
+"""Per-feature settings with their defaults declared next to the code using them.
+
+Each feature reads one dict setting through an ``AppSettings``::
+
+    queue_settings = AppSettings("RUN_QUEUE", {"WORKERS": 2, "AUTOSTART": True})
+    queue_settings()["WORKERS"]
+
+Keys present in ``settings.RUN_QUEUE`` override the defaults one by one, so
+``settings.py`` (or ``override_settings``) only lists the values that differ.
+The setting is read on every call, which keeps ``override_settings`` working.
+"""
+
+from django.conf import settings
+
+
+class AppSettings:
+    def __init__(self, name, defaults):
+        self.name = name
+        self.defaults = defaults
+
+    def __call__(self):
+        return {**self.defaults, **getattr(settings, self.name, {})}
@@ -0,0 +1,203 @@
+"""Opt-in per-endpoint instrumentation of the API.
+
+``MetricsMiddleware`` wraps every request in a database execute wrapper and
+records, per view name and HTTP method, the wall time, SQL query count, time
+spent in the database, render time and response size. Render time covers
+only the renderer encoding the response body (e.g. ``JSONRenderer``);
+serializers build ``.data`` inside the view, so their cost is part of the
+wall time and of the database time of the queries they run. The last ``WINDOW`` samples of each endpoint are
+kept in memory for quantiles; counts and sums are cumulative, as Prometheus
+expects.
+
+``metrics_view`` (``/api/_metrics``) exposes the numbers in the Prometheus
+text format, and with ``DEBUG_HEADER`` every response carries its own
+numbers in ``Server-Timing`` and ``X-DB-Queries``.
+
+Enable it with ``INSTRUMENTATION["ENABLED"]`` (or ``API_METRICS=1``); when
+disabled the middleware removes itself at startup.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import Http404, HttpResponse
+
+from .conf import AppSettings
+
+# DEBUG_HEADER adds Server-Timing to responses and WINDOW is the number of
+# recent requests per endpoint kept for quantiles.
+instrumentation_settings = AppSettings(
+    "INSTRUMENTATION",
+    {
+        "ENABLED": os.environ.get("API_METRICS", "") == "1",
+        "DEBUG_HEADER": True,
+        "WINDOW": 1024,
+        "QUANTILES": (0.5, 0.9, 0.99),
+    },
+)
+
+# (metric name, sample field, help text)
+METRICS = (
+    ("api_request_duration_seconds", "duration", "Wall time of the request."),
+    ("api_db_queries", "queries", "SQL queries executed by the request."),
+    ("api_db_duration_seconds", "db_time", "Time spent executing SQL."),
+    ("api_render_duration_seconds", "render_time", "Time the renderer spent encoding the response body."),
+    ("api_response_bytes", "size", "Response body size."),
+)
+
+FIELDS = tuple(field for _, field, _ in METRICS)
+
+
+class EndpointStats:
+    """Rolling window of samples plus cumulative count and sums for one endpoint."""
+
+    def __init__(self, window):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.sums = dict.fromkeys(FIELDS, 0)
+
+    def add(self, sample):
+        self.samples.append(sample)
+        self.count += 1
+        for field in FIELDS:
+            self.sums[field] += sample[field]
+
+    def quantile(self, field, q):
+        values = sorted(sample[field] for sample in self.samples)
+        if not values:
+            return 0
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class MetricsRegistry:
+    def __init__(self, window=None):
+        self.window = window or instrumentation_settings()["WINDOW"]
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def record(self, view, method, sample):
+        with self._lock:
+            stats = self._endpoints.get((view, method))
+            if stats is None:
+                stats = self._endpoints[(view, method)] = EndpointStats(self.window)
+            stats.add(sample)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                key: (stats.count, dict(stats.sums), [dict(sample) for sample in stats.samples])
+                for key, stats in self._endpoints.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def render_prometheus(self, quantiles=None):
+        quantiles = quantiles or instrumentation_settings()["QUANTILES"]
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+            lines = []
+            for name, field, description in METRICS:
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} summary")
+                for (view, method), stats in endpoints:
+                    labels = f'view="{_escape(view)}",method="{method}"'
+                    for q in quantiles:
+                        lines.append(f'{name}{{{labels},quantile="{q}"}} {_number(stats.quantile(field, q))}')
+                    lines.append(f"{name}_sum{{{labels}}} {_number(stats.sums[field])}")
+                    lines.append(f"{name}_count{{{labels}}} {stats.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value):
+    return repr(round(value, 6)) if isinstance(value, float) else str(value)
+
+
+registry = MetricsRegistry()
+
+
+class _QueryTimer:
+    """``connection.execute_wrapper`` counting queries and their duration."""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.queries += 1
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        config = instrumentation_settings()
+        if not config["ENABLED"]:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.debug_header = config["DEBUG_HEADER"]
+
+    def __call__(self, request):
+        timer = _QueryTimer()
+        request._metrics_render = [None, 0.0]
+        started = time.perf_counter()
+        wrappers = [connection.execute_wrapper(timer) for connection in connections.all()]
+        for wrapper in wrappers:
+            wrapper.__enter__()
+        try:
+            response = self.get_response(request)
+        finally:
+            for wrapper in reversed(wrappers):
+                wrapper.__exit__(None, None, None)
+        duration = time.perf_counter() - started
+
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else "unmatched"
+        if view == "api-metrics":
+            return response
+        size = 0 if response.streaming else len(response.content)
+        sample = {
+            "duration": duration,
+            "queries": timer.queries,
+            "db_time": timer.seconds,
+            "render_time": request._metrics_render[1],
+            "size": size,
+        }
+        registry.record(view, request.method, sample)
+        if self.debug_header:
+            response["X-DB-Queries"] = str(timer.queries)
+            response["Server-Timing"] = (
+                f"db;dur={timer.seconds * 1000:.2f}, "
+                f"render;dur={sample['render_time'] * 1000:.2f}, "
+                f"total;dur={duration * 1000:.2f}"
+            )
+        return response
+
+    def process_template_response(self, request, response):
+        # Called right before DRF's ``Response.render()``; time the rendering.
+        timing = request._metrics_render
+        timing[0] = time.perf_counter()
+
+        def rendered(response):
+            timing[1] = time.perf_counter() - timing[0]
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+def metrics_view(request):
+    if not instrumentation_settings()["ENABLED"]:
+        raise Http404("Instrumentation is disabled.")
+    return HttpResponse(registry.render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
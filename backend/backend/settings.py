@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -53,6 +54,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "backend.metrics.MetricsMiddleware",
 ]
 
 ROOT_URLCONF = "backend.urls"
@@ -78,12 +80,69 @@ WSGI_APPLICATION = "backend.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# SQLite by default. Set DB_ENGINE=postgresql (plus DB_NAME, DB_USER,
+# DB_PASSWORD, DB_HOST, DB_PORT) for PostgreSQL, which lets many run workers
+# write concurrently and backs JSON fields with GIN-indexed jsonb.
+DB_ENGINE = os.environ.get("DB_ENGINE", "sqlite3").lower()
+
+if DB_ENGINE in ("postgresql", "postgres"):
+    # DB_POOL=1 uses psycopg's connection pool instead of persistent
+    # per-thread connections (the two are mutually exclusive).
+    DB_POOL = os.environ.get("DB_POOL", "").lower() in ("1", "true", "yes")
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("DB_NAME", "fast_apitest"),
+            "USER": os.environ.get("DB_USER", "postgres"),
+            "PASSWORD": os.environ.get("DB_PASSWORD", ""),
+            "HOST": os.environ.get("DB_HOST", "127.0.0.1"),
+            "PORT": os.environ.get("DB_PORT", "5432"),
+            "CONN_MAX_AGE": 0 if DB_POOL else int(os.environ.get("DB_CONN_MAX_AGE", "60")),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                "pool": {
+                    "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", "2")),
+                    "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", "20")),
+                }
+            }
+            if DB_POOL
+            else {},
+        }
+    }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get("DB_NAME") or BASE_DIR / "db.sqlite3",
+            "OPTIONS": {
+                # WAL lets the API read while run workers write; writers take the
+                # lock up front and wait up to ``timeout`` seconds for it instead
+                # of failing with "database is locked".
+                "init_command": "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;",
+                "transaction_mode": "IMMEDIATE",
+                "timeout": int(os.environ.get("DB_BUSY_TIMEOUT", "20")),
+            },
+        }
+    }
+
+
+# Process-local memory cache by default. Set CACHE_DIR to share cached API
+# responses and generation stamps between web processes on one host.
+if os.environ.get("CACHE_DIR"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.environ["CACHE_DIR"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "fast-apitest",
+            "OPTIONS": {"MAX_ENTRIES": 5000},
+        }
     }
-}
 
 
 # Password validation
@@ -136,3 +195,23 @@ REST_FRAMEWORK = {
 }
 
 CORS_ALLOW_ALL_ORIGINS = True
+
+# Feature settings. Each is a dict whose keys override, one by one, the
+# defaults declared (and documented) next to the code that reads it through
+# backend.conf.AppSettings; list only the values that differ here.
+#
+#   SUITE_RUNNER      interfaces.runner       suite execution concurrency
+#   RUN_QUEUE         interfaces.queue        background workers and shards
+#   HTTP_CLIENT       interfaces.http_client  keep-alive pools and timeouts
+#   INTERFACE_SEARCH  interfaces.search       search limits, matcher cache
+#   BULK_WRITE        interfaces.serializers  /bulk/ endpoint limits
+#   RESULT_STORE      interfaces.results      per-case result storage
+#   RUN_STREAM        interfaces.streams      report event stream polling
+#   LOAD_TEST         interfaces.loadtest     load test bounds and timeouts
+#   MOCK_SERVER       interfaces.mock         mock server address and faults
+#   SCENARIO_RUN      interfaces.scenarios    scenario step parallelism
+#   API_CACHE         projects.caching        list response caching
+#   INSTRUMENTATION   backend.metrics         request metrics (API_METRICS=1)
+#
+# Plain settings: ASSERTION_CACHE_SIZE and TEMPLATE_CACHE_SIZE (entries kept
+# per process, default 4096) and SWAGGER_IMPORT_BATCH_SIZE (default 500).
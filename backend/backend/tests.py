@@ -0,0 +1,102 @@
+import os
+import runpy
+from unittest import mock
+
+from django.conf import settings
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from projects.models import Project
+
+from .conf import AppSettings
+from .metrics import registry
+
+
+@override_settings(INSTRUMENTATION={"ENABLED": True, "DEBUG_HEADER": True})
+class MetricsTests(APITestCase):
+    def setUp(self):
+        registry.reset()
+        Project.objects.create(name="demo")
+
+    def test_debug_header_reports_request_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/environments/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(int(response["X-DB-Queries"]), len(queries))
+        self.assertRegex(response["Server-Timing"], r"^db;dur=[\d.]+, render;dur=[\d.]+, total;dur=[\d.]+$")
+
+    def test_metrics_endpoint_exports_per_view_summaries(self):
+        self.client.get("/api/projects/")
+        self.client.get("/api/projects/")
+        self.client.post("/api/projects/", {"name": "other"}, format="json")
+
+        response = self.client.get("/api/_metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        body = response.content.decode()
+        self.assertIn("# TYPE api_db_queries summary", body)
+        self.assertIn("# HELP api_render_duration_seconds Time the renderer spent encoding the response body.", body)
+        self.assertIn('api_request_duration_seconds_count{view="project-list",method="GET"} 2', body)
+        self.assertIn('api_response_bytes_count{view="project-list",method="POST"} 1', body)
+        self.assertIn('api_db_queries{view="project-list",method="GET",quantile="0.5"}', body)
+        self.assertNotIn("api-metrics", body)
+
+    @override_settings(INSTRUMENTATION={"ENABLED": False})
+    def test_disabled_instrumentation_adds_nothing(self):
+        response = self.client.get("/api/projects/")
+
+        self.assertNotIn("X-DB-Queries", response)
+        self.assertEqual(self.client.get("/api/_metrics").status_code, 404)
+        self.assertEqual(registry.snapshot(), {})
+
+
+class DatabaseSettingsTests(SimpleTestCase):
+    def _databases(self, **environ):
+        path = os.path.join(settings.BASE_DIR, "backend", "settings.py")
+        with mock.patch.dict(os.environ, environ, clear=True):
+            return runpy.run_path(path)["DATABASES"]["default"]
+
+    def test_sqlite_is_the_default(self):
+        database = self._databases(DB_BUSY_TIMEOUT="5")
+
+        self.assertEqual(database["ENGINE"], "django.db.backends.sqlite3")
+        self.assertEqual(str(database["NAME"]), os.path.join(settings.BASE_DIR, "db.sqlite3"))
+        self.assertEqual(database["OPTIONS"]["timeout"], 5)
+        self.assertEqual(database["OPTIONS"]["transaction_mode"], "IMMEDIATE")
+
+    def test_postgresql_is_configured_from_the_environment(self):
+        database = self._databases(
+            DB_ENGINE="PostgreSQL",
+            DB_NAME="runs",
+            DB_USER="tester",
+            DB_PASSWORD="secret",
+            DB_HOST="db",
+            DB_PORT="6432",
+            DB_CONN_MAX_AGE="300",
+        )
+
+        self.assertEqual(database["ENGINE"], "django.db.backends.postgresql")
+        self.assertEqual(
+            [database[key] for key in ("NAME", "USER", "PASSWORD", "HOST", "PORT", "CONN_MAX_AGE")],
+            ["runs", "tester", "secret", "db", "6432", 300],
+        )
+        self.assertEqual(database["OPTIONS"], {})
+
+    def test_postgresql_pool_disables_persistent_connections(self):
+        database = self._databases(DB_ENGINE="postgres", DB_POOL="true", DB_POOL_MAX_SIZE="8")
+
+        self.assertEqual(database["CONN_MAX_AGE"], 0)
+        self.assertEqual(database["OPTIONS"]["pool"], {"min_size": 2, "max_size": 8})
+
+
+class AppSettingsTests(SimpleTestCase):
+    def test_setting_keys_override_defaults_one_by_one(self):
+        feature_settings = AppSettings("FEATURE", {"SIZE": 8, "ENABLED": True})
+
+        self.assertEqual(feature_settings(), {"SIZE": 8, "ENABLED": True})
+        with override_settings(FEATURE={"SIZE": 2, "EXTRA": 1}):
+            self.assertEqual(feature_settings(), {"SIZE": 2, "ENABLED": True, "EXTRA": 1})
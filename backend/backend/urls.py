@@ -19,6 +19,7 @@ from django.contrib import admin
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
+from backend.metrics import metrics_view
 from environments.views import EnvironmentViewSet
 from interfaces.views import (
     InterfaceCaseViewSet,
@@ -26,9 +27,11 @@ from interfaces.views import (
     ScenarioStepViewSet,
     ScenarioViewSet,
     SwaggerImportView,
+    TestCaseResultViewSet,
     TestReportViewSet,
     TestSuiteViewSet,
 )
+from interfaces.streams import report_stream
 from projects.views import ProjectViewSet
 
 router = DefaultRouter()
@@ -40,9 +43,12 @@ router.register("scenarios", ScenarioViewSet, basename="scenario")
 router.register("scenario-steps", ScenarioStepViewSet, basename="scenario-step")
 router.register("test-suites", TestSuiteViewSet, basename="test-suite")
 router.register("test-reports", TestReportViewSet, basename="test-report")
+router.register("test-results", TestCaseResultViewSet, basename="test-result")
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include(router.urls)),
     path("api/swagger/import/", SwaggerImportView.as_view(), name="swagger-import"),
+    path("api/test-reports/<int:pk>/stream/", report_stream, name="test-report-stream"),
+    path("api/_metrics", metrics_view, name="api-metrics"),
 ]
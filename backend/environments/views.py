@@ -1,10 +1,12 @@
 from rest_framework import viewsets
 
+from projects.caching import GenerationCacheMixin, bump_generation
+
 from .models import Environment
 from .serializers import EnvironmentSerializer
 
 
-class EnvironmentViewSet(viewsets.ModelViewSet):
+class EnvironmentViewSet(GenerationCacheMixin, viewsets.ModelViewSet):
     serializer_class = EnvironmentSerializer
     queryset = Environment.objects.select_related("project").order_by("project__name", "name")
 
@@ -19,11 +21,13 @@ class EnvironmentViewSet(viewsets.ModelViewSet):
         environment = serializer.save()
         if environment.is_default:
             Environment.objects.filter(project=environment.project).exclude(pk=environment.pk).update(is_default=False)
+            bump_generation(environment.project_id)
 
     def perform_update(self, serializer):
         environment = serializer.save()
         if environment.is_default:
             Environment.objects.filter(project=environment.project).exclude(pk=environment.pk).update(is_default=False)
+            bump_generation(environment.project_id)
 
     def destroy(self, request, *args, **kwargs):
         environment = self.get_object()
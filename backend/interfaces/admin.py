@@ -1,6 +1,15 @@
 from django.contrib import admin
 
-from .models import APIInterface, InterfaceCase, Scenario, ScenarioStep, TestReport, TestSuite
+from .models import (
+    APIInterface,
+    InterfaceCase,
+    RunJob,
+    Scenario,
+    ScenarioStep,
+    TestCaseResult,
+    TestReport,
+    TestSuite,
+)
 
 
 @admin.register(APIInterface)
@@ -39,6 +48,19 @@ class TestSuiteAdmin(admin.ModelAdmin):
 
 @admin.register(TestReport)
 class TestReportAdmin(admin.ModelAdmin):
-    list_display = ("suite", "status", "created_at")
-    list_filter = ("status", "suite__project")
-    search_fields = ("suite__name", "suite__project__name")
+    list_display = ("suite", "scenario", "kind", "status", "created_at")
+    list_filter = ("kind", "status", "suite__project")
+    search_fields = ("suite__name", "scenario__name", "suite__project__name")
+
+
+@admin.register(TestCaseResult)
+class TestCaseResultAdmin(admin.ModelAdmin):
+    list_display = ("name", "report", "status_code", "latency_ms", "passed")
+    list_filter = ("passed",)
+    raw_id_fields = ("report", "case")
+
+
+@admin.register(RunJob)
+class RunJobAdmin(admin.ModelAdmin):
+    list_display = ("report", "status", "worker", "attempts", "created_at", "updated_at")
+    list_filter = ("status",)
@@ -0,0 +1,385 @@
+"""Compiled assertion engine for ``InterfaceCase.assertions``.
+
+A case's assertion list is compiled once into a ``CompiledAssertions``
+evaluator: JSONPath expressions, regular expressions and JSON schemas are
+parsed up front, and the evaluator is cached per case until the case's
+``updated_at`` changes. Supported rules::
+
+    {"type": "status", "expected": 200}
+    {"path": "$.data.id", "expected": 1}                  # jsonpath, "eq"
+    {"type": "jsonpath", "path": "$.items", "operator": "contains", "expected": 3}
+    {"type": "regex", "pattern": "ok", "header": "X-State"}  # body when no header
+    {"type": "latency", "expected": 500}                   # budget in ms
+    {"type": "schema", "schema": {"type": "object", "required": ["id"]}}
+
+JSONPath operators are ``eq``, ``ne``, ``gt``, ``gte``, ``lt``, ``lte``,
+``contains``, ``in`` and ``exists``. Schemas support the common subset of
+JSON Schema: ``type``, ``enum``, ``const``, ``properties``, ``required``,
+``additionalProperties``, ``items``, ``minItems``/``maxItems``,
+``minLength``/``maxLength``, ``pattern`` and ``minimum``/``maximum``.
+"""
+
+import json
+import operator
+import re
+
+from django.conf import settings
+
+from .jsonpath import JSONPathError, MISSING, compile_path, resolve
+from .lru import VersionedLRU
+
+DEFAULT_CACHE_SIZE = 4096
+
+
+def decode_json(raw):
+    try:
+        return json.loads(raw)
+    except (TypeError, ValueError):
+        return None
+
+
+def _contains(actual, expected):
+    try:
+        return expected in actual
+    except TypeError:
+        return False
+
+
+def _ordered(compare):
+    def check(actual, expected):
+        try:
+            return compare(actual, expected)
+        except TypeError:
+            return False
+
+    return check
+
+
+OPERATORS = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "gt": _ordered(operator.gt),
+    "gte": _ordered(operator.ge),
+    "lt": _ordered(operator.lt),
+    "lte": _ordered(operator.le),
+    "contains": _contains,
+    "in": lambda actual, expected: _contains(expected, actual),
+}
+
+
+class Response:
+    """The parts of a response assertions look at; the body is decoded lazily."""
+
+    __slots__ = ("status_code", "body", "latency_ms", "headers", "_document", "_text")
+
+    def __init__(self, status_code, body, latency_ms, headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.latency_ms = latency_ms
+        self.headers = headers or {}
+        self._document = MISSING
+        self._text = None
+
+    @property
+    def document(self):
+        if self._document is MISSING:
+            self._document = decode_json(self.body)
+        return self._document
+
+    @property
+    def text(self):
+        if self._text is None:
+            body = self.body or b""
+            self._text = body.decode("utf-8", errors="replace") if isinstance(body, bytes) else str(body)
+        return self._text
+
+    def header(self, name):
+        name = name.lower()
+        for key, value in self.headers.items():
+            if key.lower() == name:
+                return value
+        return None
+
+
+# JSON schema subset -------------------------------------------------------
+
+_JSON_TYPES = {
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "string": lambda value: isinstance(value, str),
+    "integer": lambda value: isinstance(value, int) and not isinstance(value, bool),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "boolean": lambda value: isinstance(value, bool),
+    "null": lambda value: value is None,
+}
+
+
+def _is_number(value):
+    return _JSON_TYPES["number"](value)
+
+
+def _is_size(value):
+    return _JSON_TYPES["integer"](value) and value >= 0
+
+
+def _is_names(value):
+    return isinstance(value, list) and all(isinstance(name, str) for name in value)
+
+
+def _keyword(schema, key, valid, expected):
+    value = schema[key]
+    if not valid(value):
+        raise ValueError(f"Schema keyword {key!r} must be {expected}, got {value!r}.")
+    return value
+
+
+def compile_schema(schema):
+    """Compile ``schema`` into ``validate(value, where="$")`` returning an error or ``None``.
+
+    Malformed keywords (a string ``minimum``, a non-list ``enum``, ...) raise
+    ``ValueError`` here rather than ``TypeError`` when a response is checked.
+    """
+
+    if not isinstance(schema, dict):
+        raise ValueError("Schema must be an object.")
+    checks = []
+
+    if "type" in schema:
+        names = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+        unknown = [name for name in names if not isinstance(name, str) or name not in _JSON_TYPES]
+        if unknown:
+            raise ValueError(f"Unsupported schema type: {unknown[0]}")
+        predicates = [_JSON_TYPES[name] for name in names]
+
+        def check_type(value, where):
+            if not any(predicate(value) for predicate in predicates):
+                return f"{where}: expected {'/'.join(names)}"
+
+        checks.append(check_type)
+
+    if "enum" in schema:
+        choices = _keyword(schema, "enum", lambda value: isinstance(value, list), "a list")
+        checks.append(lambda value, where: None if value in choices else f"{where}: not one of {choices}")
+    if "const" in schema:
+        const = schema["const"]
+        checks.append(lambda value, where: None if value == const else f"{where}: expected {const!r}")
+
+    for key, compare, message in (
+        ("minimum", operator.lt, "is less than"),
+        ("maximum", operator.gt, "is greater than"),
+    ):
+        if key in schema:
+            bound = _keyword(schema, key, _is_number, "a number")
+
+            def check_bound(value, where, bound=bound, compare=compare, message=message):
+                if _JSON_TYPES["number"](value) and compare(value, bound):
+                    return f"{where}: {value} {message} {bound}"
+
+            checks.append(check_bound)
+
+    for key, predicate, compare in (
+        ("minLength", _JSON_TYPES["string"], operator.lt),
+        ("maxLength", _JSON_TYPES["string"], operator.gt),
+        ("minItems", _JSON_TYPES["array"], operator.lt),
+        ("maxItems", _JSON_TYPES["array"], operator.gt),
+    ):
+        if key in schema:
+            bound = _keyword(schema, key, _is_size, "a non-negative integer")
+
+            def check_size(value, where, key=key, bound=bound, predicate=predicate, compare=compare):
+                if predicate(value) and compare(len(value), bound):
+                    return f"{where}: violates {key}={bound}"
+
+            checks.append(check_size)
+
+    if "pattern" in schema:
+        pattern = re.compile(_keyword(schema, "pattern", lambda value: isinstance(value, str), "a string"))
+
+        def check_pattern(value, where):
+            if isinstance(value, str) and not pattern.search(value):
+                return f"{where}: does not match {pattern.pattern!r}"
+
+        checks.append(check_pattern)
+
+    if "properties" in schema:
+        _keyword(schema, "properties", lambda value: isinstance(value, dict), "an object")
+    properties = {name: compile_schema(sub) for name, sub in (schema.get("properties") or {}).items()}
+    if "required" in schema:
+        _keyword(schema, "required", _is_names, "a list of property names")
+    required = list(schema.get("required") or [])
+    additional = schema.get("additionalProperties", True)
+    extra = compile_schema(additional) if isinstance(additional, dict) else None
+    if properties or required or additional is not True:
+
+        def check_object(value, where):
+            if not isinstance(value, dict):
+                return None
+            for name in required:
+                if name not in value:
+                    return f"{where}: missing required property {name!r}"
+            for name, item in value.items():
+                validate = properties.get(name)
+                if validate is None:
+                    if additional is False:
+                        return f"{where}: unexpected property {name!r}"
+                    validate = extra
+                if validate is not None:
+                    error = validate(item, f"{where}.{name}")
+                    if error:
+                        return error
+            return None
+
+        checks.append(check_object)
+
+    if isinstance(schema.get("items"), dict):
+        validate_item = compile_schema(schema["items"])
+
+        def check_items(value, where):
+            if not isinstance(value, list):
+                return None
+            for index, item in enumerate(value):
+                error = validate_item(item, f"{where}[{index}]")
+                if error:
+                    return error
+            return None
+
+        checks.append(check_items)
+
+    def validate(value, where="$"):
+        for check in checks:
+            error = check(value, where)
+            if error:
+                return error
+        return None
+
+    return validate
+
+
+# Rule compilation ---------------------------------------------------------
+
+
+def _failing(assertion, message):
+    def check(response):
+        return {"assertion": assertion, "passed": False, "error": message}
+
+    return check
+
+
+def _compile_rule(assertion):
+    kind = assertion.get("type") or ("jsonpath" if assertion.get("path") else "status")
+    expected = assertion.get("expected")
+
+    if kind == "status":
+
+        def check(response):
+            actual = response.status_code
+            return {"assertion": assertion, "passed": actual == expected, "actual": actual}
+
+        return check
+
+    if kind == "latency":
+        if not _is_number(expected):
+            raise ValueError(f"Latency budget must be a number of milliseconds, got {expected!r}.")
+
+        def check(response):
+            actual = response.latency_ms
+            passed = actual is not None and actual <= expected
+            return {"assertion": assertion, "passed": passed, "actual": actual}
+
+        return check
+
+    if kind == "jsonpath":
+        steps = compile_path(assertion.get("path", "$"))
+        name = assertion.get("operator") or "eq"
+        if name == "exists":
+
+            def check(response):
+                actual = resolve(steps, response.document)
+                passed = (actual is not MISSING) == (expected is not False)
+                return {"assertion": assertion, "passed": passed, "actual": None if actual is MISSING else actual}
+
+            return check
+        if name not in OPERATORS:
+            raise ValueError(f"Unsupported operator: {name}")
+        compare = OPERATORS[name]
+
+        def check(response):
+            actual = resolve(steps, response.document)
+            actual = None if actual is MISSING else actual
+            return {"assertion": assertion, "passed": compare(actual, expected), "actual": actual}
+
+        return check
+
+    if kind == "regex":
+        if not isinstance(assertion.get("pattern", ""), str):
+            raise ValueError("Regex pattern must be a string.")
+        pattern = re.compile(assertion.get("pattern", ""))
+        header = assertion.get("header")
+
+        def check(response):
+            source = (response.header(header) or "") if header else response.text
+            match = pattern.search(source)
+            return {"assertion": assertion, "passed": match is not None, "actual": match.group(0) if match else None}
+
+        return check
+
+    if kind == "schema":
+        validate = compile_schema(assertion.get("schema") or {})
+        steps = compile_path(assertion.get("path", "$"))
+
+        def check(response):
+            document = resolve(steps, response.document)
+            error = validate(None if document is MISSING else document)
+            result = {"assertion": assertion, "passed": error is None}
+            if error:
+                result["error"] = error
+            return result
+
+        return check
+
+    raise ValueError(f"Unsupported assertion type: {kind}")
+
+
+class CompiledAssertions:
+    """Evaluator for one case's assertion list."""
+
+    __slots__ = ("checks",)
+
+    def __init__(self, assertions):
+        self.checks = []
+        for assertion in assertions or []:
+            if not isinstance(assertion, dict):
+                self.checks.append(_failing(assertion, "Assertion must be an object."))
+                continue
+            try:
+                self.checks.append(_compile_rule(assertion))
+            except (JSONPathError, ValueError, re.error) as exc:
+                self.checks.append(_failing(assertion, str(exc)))
+
+    def __call__(self, status_code, body, latency_ms, headers=None):
+        response = Response(status_code, body, latency_ms, headers)
+        return [check(response) for check in self.checks]
+
+    def __len__(self):
+        return len(self.checks)
+
+
+class AssertionCache(VersionedLRU):
+    """Compiled evaluators keyed by case id and invalidated on ``updated_at``."""
+
+    def __init__(self, size=None):
+        super().__init__(size or getattr(settings, "ASSERTION_CACHE_SIZE", DEFAULT_CACHE_SIZE))
+
+    def get(self, case):
+        if case.pk is None:
+            return CompiledAssertions(case.assertions)
+        return self.fetch(case.pk, case.updated_at, lambda: CompiledAssertions(case.assertions))
+
+
+assertion_cache = AssertionCache()
+
+
+def compiled_assertions(case):
+    """Return the cached evaluator for ``case``'s current assertions."""
+
+    return assertion_cache.get(case)
@@ -0,0 +1,347 @@
+"""Reproducible API benchmarks over synthetic data.
+
+``seed`` fills the database with one project of ``count`` interfaces (one
+case each), suites and scenarios of up to 100 cases, and ``count`` finished
+reports. ``run_benchmarks`` then times, through the test client:
+
+* ``list`` and ``retrieve`` of every router registration,
+* ``SwaggerImportView`` with a generated spec of ``count`` operations, both
+  into an empty project and re-importing the unchanged spec,
+* ``TestSuiteViewSet.run`` (the enqueue) and the execution of the queued job
+  against a local HTTP server.
+
+Each benchmark records p50/p95/mean/max latency in milliseconds and the SQL
+queries issued on the request thread. List caches are cleared before every
+request unless ``warm`` is set, so the numbers cover the ORM path. The
+``benchmark`` management command runs this against a throwaway test database
+and writes JSON that ``compare`` diffs against a previous run.
+"""
+
+import json
+import math
+import platform
+import subprocess
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import django
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from environments.models import Environment
+from projects.caching import api_cache_settings
+from projects.models import Project
+
+from .models import (
+    APIInterface,
+    InterfaceCase,
+    Scenario,
+    ScenarioStep,
+    TestCaseResult,
+    TestReport,
+    TestSuite,
+)
+from .queue import claim_next_job, process_job, queue_settings
+
+SCALES = {
+    "small": 10,
+    "medium": 1_000,
+    "large": 50_000,
+}
+
+SUITE_SIZE = 100
+SCENARIO_STEPS = 5
+BATCH_SIZE = 2_000
+
+
+class _OkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    payload = json.dumps({"ok": True}).encode()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.payload)))
+        self.end_headers()
+        self.wfile.write(self.payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class LocalServer:
+    """Threaded HTTP server answering every GET with ``200 {"ok": true}``."""
+
+    def __enter__(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _OkHandler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def seed(count, base_url="http://127.0.0.1:9", name="benchmark"):
+    """Create a project with ``count`` interfaces, cases and reports; return what was created."""
+
+    project = Project.objects.create(name=name)
+    environment = Environment.objects.create(project=project, name="local", base_url=base_url, is_default=True)
+    APIInterface.objects.bulk_create(
+        [
+            APIInterface(
+                project=project,
+                name=f"resource {index}",
+                method="GET",
+                path=f"/resources/{index}/{{id}}",
+                description=f"Synthetic interface number {index}",
+                request_params={"page": 1},
+            )
+            for index in range(count)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    interfaces = list(APIInterface.objects.filter(project=project).order_by("pk").values_list("pk", flat=True))
+    InterfaceCase.objects.bulk_create(
+        [
+            InterfaceCase(
+                interface_id=interface_id,
+                name="default",
+                environment=environment,
+                request_payload={"path": f"/resources/{index}/{{{{ id }}}}"},
+                assertions=[{"type": "status", "expected": 200}],
+            )
+            for index, interface_id in enumerate(interfaces)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    cases = list(InterfaceCase.objects.filter(interface__project=project).order_by("pk").values_list("pk", flat=True))
+    environment.variables = {"id": 1}
+    environment.save(update_fields=["variables", "updated_at"])
+
+    suite_count = max(1, count // SUITE_SIZE)
+    suites = TestSuite.objects.bulk_create(
+        [TestSuite(project=project, name=f"suite {index}") for index in range(suite_count)], batch_size=BATCH_SIZE
+    )
+    memberships = []
+    for suite, chunk in zip(suites, _chunks(cases, SUITE_SIZE)):
+        memberships.extend(TestSuite.cases.through(testsuite_id=suite.pk, interfacecase_id=pk) for pk in chunk)
+        suite.case_count = len(chunk)
+    TestSuite.cases.through.objects.bulk_create(memberships, batch_size=BATCH_SIZE)
+    TestSuite.objects.bulk_update(suites, ["case_count"], batch_size=BATCH_SIZE)
+
+    scenarios = Scenario.objects.bulk_create(
+        [Scenario(project=project, name=f"scenario {index}") for index in range(suite_count)], batch_size=BATCH_SIZE
+    )
+    ScenarioStep.objects.bulk_create(
+        [
+            ScenarioStep(scenario=scenario, interface_case_id=case_id, order=order)
+            for scenario, chunk in zip(scenarios, _chunks(cases, SCENARIO_STEPS))
+            for order, case_id in enumerate(chunk, start=1)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+    now = timezone.now()
+    reports = TestReport.objects.bulk_create(
+        [
+            TestReport(
+                suite=suites[index % suite_count],
+                status="success",
+                summary="synthetic",
+                details={"executed": 1, "passed": 1, "failed": 0},
+            )
+            for index in range(count)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    TestCaseResult.objects.bulk_create(
+        [
+            TestCaseResult(
+                report=report,
+                case_id=cases[index],
+                name="default",
+                method="GET",
+                url=f"{base_url}/resources/{index}/1",
+                status_code=200,
+                latency_ms=1.0,
+                passed=True,
+                created_at=now,
+            )
+            for index, report in enumerate(reports)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    return {
+        "project": project,
+        "environment": environment,
+        "suite": suites[0],
+        "counts": {
+            "interfaces": len(interfaces),
+            "cases": len(cases),
+            "suites": suite_count,
+            "scenarios": len(scenarios),
+            "reports": len(reports),
+        },
+    }
+
+
+def swagger_spec(count):
+    return {
+        "openapi": "3.0.0",
+        "info": {"title": "benchmark", "version": "1.0"},
+        "paths": {
+            f"/items/{index}/{{id}}": {
+                "get": {
+                    "summary": f"Get item {index}",
+                    "parameters": [{"name": "id", "in": "path", "required": True, "schema": {"type": "integer"}}],
+                    "responses": {"200": {"description": "ok"}},
+                }
+            }
+            for index in range(count)
+        },
+    }
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1))]
+
+
+def measure(name, call, iterations, prepare=None, clear_cache=True):
+    """Time ``call(prepare(index))`` ``iterations`` times and summarize the samples."""
+
+    durations = []
+    queries = []
+    status_code = None
+    for index in range(iterations):
+        argument = prepare(index) if prepare else None
+        if clear_cache:
+            caches[api_cache_settings()["ALIAS"]].clear()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = call(argument)
+            durations.append((time.perf_counter() - started) * 1000)
+        queries.append(len(captured))
+        status_code = getattr(response, "status_code", getattr(response, "status", None))
+    return {
+        "name": name,
+        "iterations": iterations,
+        "status": status_code,
+        "queries": max(queries),
+        "p50_ms": round(_percentile(durations, 0.5), 3),
+        "p95_ms": round(_percentile(durations, 0.95), 3),
+        "mean_ms": round(sum(durations) / len(durations), 3),
+        "max_ms": round(max(durations), 3),
+    }
+
+
+def _endpoint_benchmarks(client, iterations, warm):
+    from backend.urls import router
+
+    def get(name, url):
+        return measure(name, lambda _: client.get(url), iterations, clear_cache=not warm)
+
+    results = []
+    for prefix, viewset, basename in router.registry:
+        results.append(get(f"{basename}-list", f"/api/{prefix}/"))
+        instance = viewset.queryset.model.objects.order_by("pk").first()
+        if instance is not None:
+            results.append(get(f"{basename}-detail", f"/api/{prefix}/{instance.pk}/"))
+    return results
+
+
+def _import_benchmarks(client, count, iterations):
+    spec = swagger_spec(count)
+
+    def new_project(index):
+        return Project.objects.create(name=f"import-{index}-{time.time_ns()}").pk
+
+    def post(project_id):
+        return client.post("/api/swagger/import/", {"project": project_id, "swagger": spec}, format="json")
+
+    fresh = measure("swagger-import", post, iterations, prepare=new_project)
+    target = new_project(iterations)
+    post(target)
+    unchanged = measure("swagger-reimport", post, iterations, prepare=lambda index: target)
+    return [fresh, unchanged]
+
+
+def _run_benchmarks(client, suite, iterations):
+    def enqueue(_):
+        return client.post(f"/api/test-suites/{suite.pk}/run/", {}, format="json")
+
+    def execute(_):
+        job = claim_next_job("benchmark")
+        return process_job(job) if job else None
+
+    with override_settings(RUN_QUEUE={**queue_settings(), "AUTOSTART": False, "SHARDS": 1}):
+        queued = measure("test-suite-run", enqueue, iterations)
+        executed = measure("test-suite-execute", execute, iterations)
+    return [queued, executed]
+
+
+def run_benchmarks(count, iterations=20, heavy_iterations=3, warm=False):
+    """Seed ``count`` rows and run every benchmark; return ``{"seed": ..., "results": [...]}``."""
+
+    with LocalServer() as server:
+        seeded = seed(count, base_url=server.base_url)
+        client = APIClient()
+        results = _endpoint_benchmarks(client, iterations, warm)
+        results += _import_benchmarks(client, count, heavy_iterations)
+        results += _run_benchmarks(client, seeded["suite"], heavy_iterations)
+    return {"seed": seeded["counts"], "results": results}
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def environment_info(iterations, heavy_iterations, warm):
+    return {
+        "revision": _git_revision(),
+        "created_at": timezone.now().isoformat(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "iterations": iterations,
+        "heavy_iterations": heavy_iterations,
+        "warm_cache": warm,
+    }
+
+
+def compare(baseline, current, threshold=0.2):
+    """Yield ``(scale, name, metric, before, after, regressed)`` for benchmarks present in both runs.
+
+    Latency regresses when p50 or p95 grows by more than ``threshold``
+    (relative); any growth of the query count is a regression.
+    """
+
+    for scale, run in current.get("scales", {}).items():
+        previous = {result["name"]: result for result in baseline.get("scales", {}).get(scale, {}).get("results", [])}
+        for result in run["results"]:
+            before = previous.get(result["name"])
+            if before is None:
+                continue
+            for metric in ("queries", "p50_ms", "p95_ms"):
+                old, new = before[metric], result[metric]
+                if metric == "queries":
+                    regressed = new > old
+                else:
+                    regressed = new > old * (1 + threshold)
+                yield scale, result["name"], metric, old, new, regressed
@@ -0,0 +1,224 @@
+"""Keep-alive HTTP connection pools shared by case executions.
+
+Each pool is keyed by environment and target origin and hands out at most
+``POOL_SIZE`` persistent ``http.client`` connections. A connection carries a
+single request at a time (no pipelining) and goes back to the pool only after
+its response has been fully read, so it can be safely reused for the next
+request. Connections that were idle for too long, or that the server closed,
+are discarded and transparently replaced.
+
+A request that finds the pool exhausted waits for a connection to be
+released; by default without a deadline (``POOL_TIMEOUT = None``), since the
+wait is bounded by the requests in flight, each of which has its own read
+timeout. ``HTTPResponse.elapsed`` covers the exchange only, not that wait.
+"""
+
+import http.client
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+from backend.conf import AppSettings
+
+# Timeouts in seconds; POOL_TIMEOUT bounds the wait for a free connection,
+# None waits until one is released.
+http_client_settings = AppSettings(
+    "HTTP_CLIENT",
+    {
+        "POOL_SIZE": 8,
+        "CONNECT_TIMEOUT": 5,
+        "READ_TIMEOUT": 10,
+        "IDLE_TIMEOUT": 30,
+        "POOL_TIMEOUT": None,
+    },
+)
+
+# Errors raised when a kept-alive connection was closed by the peer.
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+)
+
+
+class PoolTimeout(OSError):
+    """Raised when no connection became available in time."""
+
+
+@dataclass
+class HTTPResponse:
+    status: int
+    headers: dict
+    body: bytes
+    # Seconds from sending the request to reading the whole response.
+    elapsed: float = 0.0
+
+
+class ConnectionPool:
+    """Bounded LIFO pool of persistent connections to one origin."""
+
+    def __init__(self, scheme, host, port, size, connect_timeout, read_timeout, idle_timeout, pool_timeout=None):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.size = size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.idle_timeout = idle_timeout
+        self.pool_timeout = pool_timeout
+        self._idle = deque()
+        self._open = 0
+        self._condition = threading.Condition()
+        self.created = 0
+        self.reused = 0
+
+    def _new_connection(self):
+        connection_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        return connection_class(self.host, self.port, timeout=self.connect_timeout)
+
+    def acquire(self):
+        deadline = None if self.pool_timeout is None else time.monotonic() + self.pool_timeout
+        with self._condition:
+            while True:
+                while self._idle:
+                    connection, released_at = self._idle.pop()
+                    if time.monotonic() - released_at < self.idle_timeout:
+                        self.reused += 1
+                        return connection, True
+                    connection.close()
+                    self._open -= 1
+                if self._open < self.size:
+                    self._open += 1
+                    self.created += 1
+                    break
+                if deadline is None:
+                    self._condition.wait()
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(f"No connection to {self.host} available within {self.pool_timeout}s")
+                self._condition.wait(remaining)
+        try:
+            return self._new_connection(), False
+        except Exception:
+            self.discard(None)
+            raise
+
+    def release(self, connection):
+        with self._condition:
+            self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    def discard(self, connection):
+        if connection is not None:
+            connection.close()
+        with self._condition:
+            self._open -= 1
+            self._condition.notify()
+
+    def _send(self, connection, method, target, body, headers):
+        started = time.perf_counter()
+        if connection.sock is None:
+            connection.connect()
+        connection.sock.settimeout(self.read_timeout)
+        connection.request(method, target, body=body, headers=headers)
+        response = connection.getresponse()
+        payload = response.read()
+        elapsed = time.perf_counter() - started
+        return response, HTTPResponse(response.status, dict(response.getheaders()), payload, elapsed)
+
+    def urlopen(self, method, target, body=None, headers=None):
+        headers = headers or {}
+        connection, reused = self.acquire()
+        try:
+            try:
+                response, result = self._send(connection, method, target, body, headers)
+            except STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+                # The server dropped an idle keep-alive connection; retry once on a fresh one.
+                connection.close()
+                response, result = self._send(connection, method, target, body, headers)
+        except Exception:
+            self.discard(connection)
+            raise
+        if response.will_close:
+            self.discard(connection)
+        else:
+            self.release(connection)
+        return result
+
+    def close(self):
+        with self._condition:
+            while self._idle:
+                connection, _ = self._idle.pop()
+                connection.close()
+                self._open -= 1
+
+
+class HTTPClient:
+    """Routes requests to a ``ConnectionPool`` per (environment, origin)."""
+
+    def __init__(self, pool_size=None, connect_timeout=None, read_timeout=None, idle_timeout=None, pool_timeout=None):
+        config = http_client_settings()
+        self.pool_size = pool_size or config["POOL_SIZE"]
+        self.connect_timeout = connect_timeout or config["CONNECT_TIMEOUT"]
+        self.read_timeout = read_timeout or config["READ_TIMEOUT"]
+        self.idle_timeout = idle_timeout or config["IDLE_TIMEOUT"]
+        self.pool_timeout = pool_timeout or config["POOL_TIMEOUT"]
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def pool_for(self, url, key=None):
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        port = parts.port or (443 if scheme == "https" else 80)
+        pool_key = (key, scheme, parts.hostname, port)
+        with self._lock:
+            pool = self._pools.get(pool_key)
+            if pool is None:
+                pool = self._pools[pool_key] = ConnectionPool(
+                    scheme,
+                    parts.hostname,
+                    port,
+                    self.pool_size,
+                    self.connect_timeout,
+                    self.read_timeout,
+                    self.idle_timeout,
+                    self.pool_timeout,
+                )
+            return pool
+
+    def request(self, method, url, headers=None, body=None, key=None):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported URL: {url}")
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+        return self.pool_for(url, key).urlopen(method, target, body=body, headers=headers)
+
+    def stats(self):
+        with self._lock:
+            pools = list(self._pools.values())
+        return {
+            "pools": len(pools),
+            "connections_created": sum(pool.created for pool in pools),
+            "connections_reused": sum(pool.reused for pool in pools),
+        }
+
+    def close(self):
+        with self._lock:
+            pools = list(self._pools.values())
+        for pool in pools:
+            pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
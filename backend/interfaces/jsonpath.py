@@ -0,0 +1,53 @@
+"""Minimal JSONPath support for assertions and extractions.
+
+Only the subset used by case definitions is supported: the ``$`` root,
+dotted keys (``$.data.token``), bracketed keys (``$['data']``) and list
+indexes (``$.items[0]``). Expressions are compiled once and cached.
+"""
+
+import re
+from functools import lru_cache
+
+_TOKEN_RE = re.compile(r"\.([^.\[\]]+)|\[(-?\d+)\]|\[['\"]([^'\"]+)['\"]\]")
+
+MISSING = object()
+
+
+class JSONPathError(ValueError):
+    """Raised when an expression cannot be parsed."""
+
+
+@lru_cache(maxsize=4096)
+def compile_path(expression):
+    """Return the tuple of lookup steps for ``expression``."""
+
+    expression = (expression or "").strip()
+    if not expression.startswith("$"):
+        expression = f"$.{expression}" if expression else "$"
+    steps = []
+    position = 1
+    while position < len(expression):
+        match = _TOKEN_RE.match(expression, position)
+        if not match:
+            raise JSONPathError(f"Unsupported JSONPath expression: {expression}")
+        key, index, quoted = match.groups()
+        steps.append(int(index) if index is not None else (key if key is not None else quoted))
+        position = match.end()
+    return tuple(steps)
+
+
+def resolve(steps, document):
+    """Walk ``document`` along compiled ``steps``; return ``MISSING`` when absent."""
+
+    current = document
+    for step in steps:
+        try:
+            current = current[step]
+        except (KeyError, IndexError, TypeError):
+            return MISSING
+    return current
+
+
+def find(expression, document, default=None):
+    value = resolve(compile_path(expression), document)
+    return default if value is MISSING else value
@@ -0,0 +1,480 @@
+"""Load-test mode: drive a suite or scenario at a target rate or concurrency.
+
+Two schedulers are available:
+
+* ``rps`` is open loop. Iteration *i* is due at ``t0 + i / rps`` whether or
+  not earlier requests have finished, and its latency is measured from that
+  intended start. A slow server therefore shows up as higher latency instead
+  of silently lowering the request rate (coordinated omission).
+* ``concurrency`` is closed loop: N virtual users each start their next
+  iteration as soon as the previous one finished.
+
+Requests go through a small asyncio HTTP/1.1 client with per-origin
+keep-alive pools, so thousands of requests can be in flight from a single
+worker thread. Latencies are recorded in ``LatencyHistogram``, a log-linear
+histogram in the spirit of HdrHistogram, and only the aggregated
+percentiles and buckets are stored on the report.
+"""
+
+import asyncio
+import math
+import ssl
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+from django.utils import timezone
+
+from backend.conf import AppSettings
+
+from .http_client import HTTPResponse
+from .runner import default_environments, prepare_suite
+from .scenarios import extract, load_scenarios, prepare_step
+
+# Upper bounds accepted by the API, open-loop requests allowed in flight
+# before new iterations are dropped, and client timeouts (seconds).
+# MAX_DURATION may exceed RUN_QUEUE["STALE_AFTER"]: the job heartbeat keeps
+# a running load test claimed, so the stale sweep does not start it again.
+load_test_settings = AppSettings(
+    "LOAD_TEST",
+    {
+        "MAX_DURATION": 600,
+        "MAX_RPS": 5000,
+        "MAX_CONCURRENCY": 1000,
+        "MAX_IN_FLIGHT": 2000,
+        "CONNECT_TIMEOUT": 5,
+        "READ_TIMEOUT": 30,
+    },
+)
+
+PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+class LatencyHistogram:
+    """Log-linear latency histogram with microsecond resolution.
+
+    Values are grouped into 2**``SUB_BUCKET_BITS`` linear sub-buckets per
+    power of two, which bounds the relative error of every reported
+    percentile to under 1% while memory stays proportional to the number of
+    distinct buckets hit.
+    """
+
+    SUB_BUCKET_BITS = 7
+
+    def __init__(self):
+        self.counts = Counter()
+        self.count = 0
+        self.total_us = 0
+        self.min_us = None
+        self.max_us = 0
+
+    def _bucket(self, value):
+        shift = max(0, value.bit_length() - self.SUB_BUCKET_BITS)
+        return (value >> shift) << shift
+
+    def _upper(self, bucket):
+        shift = max(0, bucket.bit_length() - self.SUB_BUCKET_BITS)
+        return bucket + (1 << shift) - 1
+
+    def record(self, latency_ms):
+        value = max(0, int(latency_ms * 1000))
+        self.counts[self._bucket(value)] += 1
+        self.count += 1
+        self.total_us += value
+        self.min_us = value if self.min_us is None else min(self.min_us, value)
+        self.max_us = max(self.max_us, value)
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        self.count += other.count
+        self.total_us += other.total_us
+        if other.min_us is not None:
+            self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+        self.max_us = max(self.max_us, other.max_us)
+
+    def percentile(self, percentile):
+        """Return the ``percentile`` latency in milliseconds (upper bucket bound)."""
+
+        if not self.count:
+            return None
+        target = max(1, math.ceil(self.count * percentile / 100))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= target:
+                return round(min(self._upper(bucket), self.max_us) / 1000, 3)
+        return round(self.max_us / 1000, 3)
+
+    def summary(self):
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "min": round(self.min_us / 1000, 3),
+            "mean": round(self.total_us / self.count / 1000, 3),
+            **{f"p{str(p).replace('.', '_')}": self.percentile(p) for p in PERCENTILES},
+            "max": round(self.max_us / 1000, 3),
+        }
+
+    def buckets(self):
+        """``[[lower_bound_us, count], ...]`` in ascending order, for re-plotting."""
+
+        return [[bucket, self.counts[bucket]] for bucket in sorted(self.counts)]
+
+
+# Async HTTP client ------------------------------------------------------------
+
+
+class AsyncConnectionPool:
+    """Keep-alive HTTP/1.1 connections to one origin, one request at a time each."""
+
+    def __init__(self, scheme, host, port, size, connect_timeout, read_timeout):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._idle = []
+        self._slots = asyncio.Semaphore(size)
+        self.created = 0
+        self.reused = 0
+
+    async def _connect(self):
+        context = ssl.create_default_context() if self.scheme == "https" else None
+        connection = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=context),
+            self.connect_timeout,
+        )
+        self.created += 1
+        return connection
+
+    async def _exchange(self, connection, method, target, headers, body):
+        reader, writer = connection
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {self.host}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items() if name.lower() != "host")
+        if body is not None or method in ("POST", "PUT", "PATCH"):
+            lines.append(f"Content-Length: {len(body or b'')}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (body or b""))
+        await writer.drain()
+        return await asyncio.wait_for(_read_response(reader, method), self.read_timeout)
+
+    async def request(self, method, target, headers, body):
+        async with self._slots:
+            reused = bool(self._idle)
+            connection = self._idle.pop() if reused else await self._connect()
+            self.reused += reused
+            try:
+                try:
+                    response, keep_alive = await self._exchange(connection, method, target, headers, body)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    if not reused:
+                        raise
+                    # The server dropped an idle keep-alive connection; retry once on a fresh one.
+                    _close(connection)
+                    connection = await self._connect()
+                    response, keep_alive = await self._exchange(connection, method, target, headers, body)
+            except BaseException:
+                _close(connection)
+                raise
+            if keep_alive:
+                self._idle.append(connection)
+            else:
+                _close(connection)
+            return response
+
+    def close(self):
+        while self._idle:
+            _close(self._idle.pop())
+
+
+def _close(connection):
+    connection[1].close()
+
+
+async def _read_response(reader, method):
+    """Read one response; return ``(HTTPResponse, keep_alive)``."""
+
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError("Connection closed before the response")
+    version, status, *_ = status_line.decode("latin-1").split(" ", 2) + [""]
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip()] = value.strip()
+    lowered = {name.lower(): value for name, value in headers.items()}
+    status = int(status)
+    keep_alive = version == "HTTP/1.1" and lowered.get("connection", "").lower() != "close"
+
+    if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+        body = b""
+    elif "chunked" in lowered.get("transfer-encoding", "").lower():
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";", 1)[0], 16)
+            if not size:
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        body = b"".join(chunks)
+    elif "content-length" in lowered:
+        body = await reader.readexactly(int(lowered["content-length"]))
+    else:
+        body = await reader.read()
+        keep_alive = False
+    return HTTPResponse(status, headers, body), keep_alive
+
+
+class AsyncHTTPClient:
+    """Asyncio counterpart of ``http_client.HTTPClient`` (same ``request`` signature)."""
+
+    def __init__(self, pool_size, connect_timeout=None, read_timeout=None):
+        config = load_test_settings()
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout or config["CONNECT_TIMEOUT"]
+        self.read_timeout = read_timeout or config["READ_TIMEOUT"]
+        self._pools = {}
+
+    async def request(self, method, url, headers=None, body=None, key=None):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported URL: {url}")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        pool_key = (key, parts.scheme, parts.hostname, port)
+        pool = self._pools.get(pool_key)
+        if pool is None:
+            pool = self._pools[pool_key] = AsyncConnectionPool(
+                parts.scheme, parts.hostname, port, self.pool_size, self.connect_timeout, self.read_timeout
+            )
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+        return await pool.request(method, target, headers or {}, body)
+
+    def stats(self):
+        pools = list(self._pools.values())
+        return {
+            "pools": len(pools),
+            "connections_created": sum(pool.created for pool in pools),
+            "connections_reused": sum(pool.reused for pool in pools),
+        }
+
+    def close(self):
+        for pool in self._pools.values():
+            pool.close()
+
+
+# Plans and statistics ---------------------------------------------------------
+
+
+class LoadStats:
+    """Counters shared by all iterations of a run (single event loop, no locking)."""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.service_time = LatencyHistogram()
+        self.by_request = defaultdict(LatencyHistogram)
+        self.status_codes = Counter()
+        self.iterations = 0
+        self.requests = 0
+        self.errors = 0
+        self.assertion_failures = 0
+        self.dropped = 0
+        self.error_samples = Counter()
+
+    def error(self, message):
+        self.errors += 1
+        if len(self.error_samples) < 20 or message in self.error_samples:
+            self.error_samples[message] += 1
+
+
+class RequestPlan:
+    """Base for what one load-test iteration sends."""
+
+    check_assertions = True
+
+    async def send(self, client, prepared, stats):
+        """Send ``prepared``, record it in ``stats`` and return the response (or ``None``)."""
+
+        if prepared.error:
+            stats.error(prepared.error)
+            return None
+        started = time.perf_counter()
+        try:
+            response = await client.request(
+                prepared.method, prepared.url, headers=prepared.headers, body=prepared.body, key=prepared.pool_key
+            )
+        except (OSError, ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError) as exc:
+            stats.requests += 1
+            stats.error(str(exc) or exc.__class__.__name__)
+            return None
+        latency_ms = (time.perf_counter() - started) * 1000
+        stats.requests += 1
+        stats.service_time.record(latency_ms)
+        stats.by_request[prepared.name].record(latency_ms)
+        stats.status_codes[str(response.status)] += 1
+        if self.check_assertions:
+            results = prepared.assertions(response.status, response.body, latency_ms, response.headers)
+            if not all(item["passed"] for item in results):
+                stats.assertion_failures += 1
+        return response
+
+    async def iterate(self, client, stats):
+        raise NotImplementedError
+
+
+class SuitePlan(RequestPlan):
+    """Cycle through a suite's active cases; one iteration sends one request."""
+
+    def __init__(self, suite):
+        self.requests = prepare_suite(suite)
+        self._next = 0
+
+    async def iterate(self, client, stats):
+        if not self.requests:
+            return
+        prepared = self.requests[self._next % len(self.requests)]
+        self._next += 1
+        await self.send(client, prepared, stats)
+
+
+class ScenarioPlan(RequestPlan):
+    """Run every step of a scenario per iteration, passing extracted values along."""
+
+    def __init__(self, scenario):
+        self.scenario = load_scenarios([scenario.pk])[0]
+        self.steps = list(self.scenario.steps.all())
+        self.fallback = default_environments({self.scenario.project_id}).get(self.scenario.project_id)
+
+    async def iterate(self, client, stats):
+        context = {}
+        for step in self.steps:
+            prepared, extractions = prepare_step(step, context, self.fallback)
+            response = await self.send(client, prepared, stats)
+            if response is None:
+                return
+            extracted, errors = extract(extractions, response)
+            context.update(extracted)
+            if errors:
+                stats.error(errors[0])
+                return
+
+
+# Scheduler --------------------------------------------------------------------
+
+
+class LoadTest:
+    """Execute ``plan`` for ``duration`` seconds at ``rps`` or with ``concurrency`` users."""
+
+    def __init__(self, plan, duration, rps=None, concurrency=None, max_in_flight=None, pool_size=None):
+        config = load_test_settings()
+        if not rps and not concurrency:
+            raise ValueError("Either rps or concurrency is required.")
+        self.plan = plan
+        self.duration = duration
+        self.rps = rps
+        self.concurrency = concurrency
+        self.max_in_flight = max_in_flight or config["MAX_IN_FLIGHT"]
+        self.pool_size = pool_size or min(self.max_in_flight, concurrency or self.max_in_flight)
+        self.stats = LoadStats()
+
+    async def _iteration(self, client, intended_start):
+        await self.plan.iterate(client, self.stats)
+        self.stats.iterations += 1
+        # Measured from the intended start, so scheduling delay counts as latency.
+        self.stats.latency.record((time.perf_counter() - intended_start) * 1000)
+
+    async def _open_loop(self, client, started):
+        interval = 1 / self.rps
+        total = int(self.duration * self.rps)
+        in_flight = set()
+        for index in range(total):
+            intended = started + index * interval
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(in_flight) >= self.max_in_flight:
+                self.stats.dropped += 1
+                continue
+            task = asyncio.create_task(self._iteration(client, intended))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        if in_flight:
+            await asyncio.gather(*in_flight)
+
+    async def _closed_loop(self, client, started):
+        deadline = started + self.duration
+
+        async def user():
+            while time.perf_counter() < deadline:
+                await self._iteration(client, time.perf_counter())
+
+        await asyncio.gather(*(user() for _ in range(self.concurrency)))
+
+    async def run(self):
+        client = AsyncHTTPClient(pool_size=self.pool_size)
+        started = time.perf_counter()
+        try:
+            if self.rps:
+                await self._open_loop(client, started)
+            else:
+                await self._closed_loop(client, started)
+        finally:
+            client.close()
+        elapsed = time.perf_counter() - started
+        return self.summary(elapsed, client.stats())
+
+    def summary(self, elapsed, connections):
+        stats = self.stats
+        return {
+            "mode": "rps" if self.rps else "concurrency",
+            "elapsed_s": round(elapsed, 3),
+            "iterations": stats.iterations,
+            "requests": stats.requests,
+            "errors": stats.errors,
+            "assertion_failures": stats.assertion_failures,
+            "dropped": stats.dropped,
+            "throughput_rps": round(stats.requests / elapsed, 2) if elapsed else 0,
+            "latency_ms": stats.latency.summary(),
+            "service_time_ms": stats.service_time.summary(),
+            "status_codes": dict(stats.status_codes),
+            "by_request": {name: histogram.summary() for name, histogram in stats.by_request.items()},
+            "histogram": stats.latency.buckets(),
+            "error_samples": dict(stats.error_samples),
+            "connections": connections,
+        }
+
+
+def run_load_test(report):
+    """Execute the load test described by ``report.details["config"]`` and store its statistics."""
+
+    config = dict((report.details or {}).get("config") or {})
+    plan = SuitePlan(report.suite) if report.suite_id else ScenarioPlan(report.scenario)
+    plan.check_assertions = config.get("assertions", True)
+    load_test = LoadTest(
+        plan,
+        duration=config["duration"],
+        rps=config.get("rps"),
+        concurrency=config.get("concurrency"),
+    )
+    details = {"config": config, **asyncio.run(load_test.run())}
+
+    failures = details["errors"] + details["assertion_failures"] + details["dropped"]
+    attempted = details["requests"] + details["dropped"]
+    error_rate = failures / attempted if attempted else 1.0
+    details["error_rate"] = round(error_rate, 4)
+    details["finished_at"] = timezone.now().isoformat()
+    report.details = details
+    report.status = "success" if attempted and error_rate <= config.get("max_error_rate", 0) else "failed"
+    report.summary = (
+        f"{details['requests']} requests in {details['elapsed_s']}s "
+        f"({details['throughput_rps']} req/s), p99 {details['latency_ms'].get('p99')} ms, "
+        f"error rate {error_rate:.2%}"
+    )
+    report.save(update_fields=["details", "status", "summary"])
+    return report
@@ -0,0 +1,40 @@
+"""Thread-safe LRU cache whose entries are stamped with a version."""
+
+import threading
+from collections import OrderedDict
+
+
+class VersionedLRU:
+    """At most ``size`` values, each valid while its stored version is current.
+
+    ``fetch(key, version, build)`` returns the cached value when the entry's
+    version equals ``version``; otherwise it calls ``build()`` (outside the
+    lock, so two threads may build the same entry), stores the result and
+    evicts the least recently used entries.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def fetch(self, key, version, build):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                return entry[1]
+        value = build()
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,68 @@
+import json
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+from interfaces.benchmark import SCALES, compare, environment_info, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = "Benchmark the API against synthetic data in a throwaway test database and write the results as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            action="append",
+            choices=sorted(SCALES),
+            help="Dataset size (repeatable): small=10, medium=1k, large=50k interfaces. Defaults to small.",
+        )
+        parser.add_argument("--iterations", type=int, default=20, help="Requests per list/retrieve benchmark.")
+        parser.add_argument(
+            "--heavy-iterations", type=int, default=3, help="Repetitions of the import and suite run benchmarks."
+        )
+        parser.add_argument("--warm", action="store_true", help="Keep list response caches between requests.")
+        parser.add_argument("--output", default="benchmark.json", help="Path of the JSON report ('-' for stdout).")
+        parser.add_argument("--compare", help="Previous JSON report to compare against.")
+        parser.add_argument(
+            "--threshold", type=float, default=0.2, help="Relative latency growth reported as a regression."
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["compare"]:
+            try:
+                with open(options["compare"], encoding="utf-8") as handle:
+                    baseline = json.load(handle)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read baseline {options['compare']}: {exc}")
+
+        scales = options["scale"] or ["small"]
+        iterations, heavy = max(1, options["iterations"]), max(1, options["heavy_iterations"])
+        setup_test_environment()
+        databases = setup_databases(verbosity=0, interactive=False)
+        try:
+            report = {"meta": environment_info(iterations, heavy, options["warm"]), "scales": {}}
+            for scale in scales:
+                self.stderr.write(f"Running {scale} benchmarks ({SCALES[scale]} interfaces)...")
+                report["scales"][scale] = run_benchmarks(SCALES[scale], iterations, heavy, options["warm"])
+                call_command("flush", interactive=False, verbosity=0)
+        finally:
+            teardown_databases(databases, verbosity=0)
+            teardown_test_environment()
+
+        encoded = json.dumps(report, indent=2)
+        if options["output"] == "-":
+            self.stdout.write(encoded)
+        else:
+            with open(options["output"], "w", encoding="utf-8") as handle:
+                handle.write(encoded + "\n")
+            self.stderr.write(self.style.SUCCESS(f"Wrote {options['output']}."))
+
+        if baseline is not None:
+            regressions = 0
+            for scale, name, metric, before, after, regressed in compare(baseline, report, options["threshold"]):
+                if regressed:
+                    regressions += 1
+                    self.stderr.write(self.style.WARNING(f"{scale} {name} {metric}: {before} -> {after}"))
+            self.stderr.write(f"{regressions} regressions against {options['compare']}.")
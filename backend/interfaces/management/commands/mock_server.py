@@ -0,0 +1,66 @@
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandError
+
+from environments.models import Environment
+from interfaces.mock import MockRoutes, MockServer
+from projects.models import Project
+
+
+class Command(BaseCommand):
+    help = "Serve a project's interfaces from a local mock server until interrupted."
+
+    def add_arguments(self, parser):
+        parser.add_argument("project", type=int, help="Project whose interfaces are served.")
+        parser.add_argument("--host", default=None, help="Address to bind.")
+        parser.add_argument("--port", type=int, default=None, help="Port to bind (0 picks a free port).")
+        parser.add_argument("--latency", type=float, default=None, help="Added latency per response in ms.")
+        parser.add_argument("--jitter", type=float, default=None, help="Uniform random extra latency in ms.")
+        parser.add_argument(
+            "--error-rate", type=float, default=None, help="Fraction of requests answered with an error."
+        )
+        parser.add_argument("--error-status", type=int, default=None, help="Status code of injected errors.")
+        parser.add_argument("--seed", type=int, default=None, help="Seed for latency jitter and error injection.")
+        parser.add_argument(
+            "--no-recorded", action="store_true", help="Ignore recorded run responses and answer from the spec only."
+        )
+        parser.add_argument(
+            "--environment",
+            help="Create or update this environment of the project to point at the mock server.",
+        )
+
+    def handle(self, *args, **options):
+        project = Project.objects.filter(pk=options["project"]).first()
+        if project is None:
+            raise CommandError(f"Project {options['project']} does not exist.")
+        if options["error_rate"] is not None and not 0 <= options["error_rate"] <= 1:
+            raise CommandError("--error-rate must be between 0 and 1.")
+
+        routes = MockRoutes(project.pk, recorded=not options["no_recorded"])
+        server = MockServer(
+            routes,
+            latency_ms=options["latency"],
+            jitter_ms=options["jitter"],
+            error_rate=options["error_rate"],
+            error_status=options["error_status"],
+            seed=options["seed"],
+        )
+        try:
+            asyncio.run(self._serve(server, project, options))
+        except KeyboardInterrupt:
+            pass
+
+    async def _serve(self, server, project, options):
+        host, port = await server.start(options["host"], options["port"])
+        base_url = f"http://{'127.0.0.1' if host == '0.0.0.0' else host}:{port}"
+        if options["environment"]:
+            await asyncio.to_thread(
+                Environment.objects.update_or_create,
+                project=project,
+                name=options["environment"],
+                defaults={"base_url": base_url},
+            )
+            self.stdout.write(f"Environment {options['environment']!r} now points at {base_url}.")
+        message = f"Serving {len(server.routes)} interfaces of {project.name} on {base_url}."
+        self.stdout.write(self.style.SUCCESS(message))
+        await server.serve_forever()
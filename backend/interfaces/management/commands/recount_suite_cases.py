@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from interfaces.signals import refresh_case_counts
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized TestSuite.case_count column."
+
+    def add_arguments(self, parser):
+        parser.add_argument("suites", nargs="*", type=int, help="Suite ids to recount (default: all).")
+
+    def handle(self, *args, **options):
+        updated = refresh_case_counts(options["suites"] or None)
+        self.stdout.write(self.style.SUCCESS(f"Recounted {updated} test suites."))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from interfaces.queue import RunWorkerPool, WorkerProcessSupervisor, requeue_stale_jobs
+
+
+class Command(BaseCommand):
+    help = "Execute queued test suite runs until interrupted."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=None, help="Number of worker threads per process.")
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Number of worker processes; each claims jobs and suite shards independently.",
+        )
+        parser.add_argument("--poll-interval", type=float, default=None, help="Seconds between queue polls.")
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale jobs.")
+        if options["processes"] > 1:
+            supervisor = WorkerProcessSupervisor(
+                options["processes"], size=options["workers"], poll_interval=options["poll_interval"]
+            )
+            supervisor.start()
+            self.stdout.write(self.style.SUCCESS(f"Started {options['processes']} run worker processes."))
+            try:
+                supervisor.supervise()
+            except KeyboardInterrupt:
+                supervisor.stop()
+            return
+        pool = RunWorkerPool(size=options["workers"], poll_interval=options["poll_interval"])
+        pool.start()
+        self.stdout.write(self.style.SUCCESS(f"Started {pool.size} run workers."))
+        try:
+            pool.join()
+        except KeyboardInterrupt:
+            pool.stop()
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-17 16:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interfaces', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='testreport',
+            name='status',
+            field=models.CharField(choices=[('success', 'Success'), ('failed', 'Failed'), ('running', 'Running'), ('queued', 'Queued')], default='running', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='RunJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('error', 'Error')], default='queued', max_length=20)),
+                ('worker', models.CharField(blank=True, max_length=120)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='interfaces.testreport')),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='interfaces__status_aa2ff5_idx')],
+            },
+        ),
+    ]
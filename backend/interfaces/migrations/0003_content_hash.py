@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 17:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interfaces', '0002_run_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apiinterface',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
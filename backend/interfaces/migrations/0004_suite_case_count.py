@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-17 17:18
+
+from django.db import migrations, models
+
+
+def backfill_case_counts(apps, schema_editor):
+    TestSuite = apps.get_model("interfaces", "TestSuite")
+    for suite in TestSuite.objects.annotate(total=models.Count("cases")).iterator():
+        if suite.total:
+            TestSuite.objects.filter(pk=suite.pk).update(case_count=suite.total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interfaces', '0003_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testsuite',
+            name='case_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_case_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-17 17:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('environments', '0001_initial'),
+        ('interfaces', '0004_suite_case_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='interfacecase',
+            index=models.Index(fields=['name', 'id'], name='case_name_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testreport',
+            index=models.Index(fields=['-created_at', '-id'], name='report_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.7 on 2026-10-17 17:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interfaces', '0005_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TestCaseResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=160)),
+                ('method', models.CharField(max_length=10)),
+                ('url', models.TextField(blank=True)),
+                ('status_code', models.PositiveIntegerField(blank=True, null=True)),
+                ('latency_ms', models.FloatField(blank=True, null=True)),
+                ('passed', models.BooleanField(default=False)),
+                ('assertions', models.JSONField(blank=True, default=list)),
+                ('error', models.TextField(blank=True)),
+                ('response_size', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('case', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='results', to='interfaces.interfacecase')),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='interfaces.testreport')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ResponseBody',
+            fields=[
+                ('result', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='body', serialize=False, to='interfaces.testcaseresult')),
+                ('encoding', models.CharField(choices=[('identity', 'Identity'), ('zlib', 'zlib')], default='identity', max_length=10)),
+                ('truncated', models.BooleanField(default=False)),
+                ('data', models.BinaryField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='testcaseresult',
+            index=models.Index(fields=['report', 'passed'], name='interfaces__report__e302c5_idx'),
+        ),
+    ]
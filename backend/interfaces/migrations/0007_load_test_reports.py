@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-17 17:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interfaces', '0006_case_results'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testreport',
+            name='kind',
+            field=models.CharField(choices=[('functional', 'Functional'), ('load', 'Load test')], default='functional', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='testreport',
+            name='scenario',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reports', to='interfaces.scenario'),
+        ),
+        migrations.AlterField(
+            model_name='testreport',
+            name='suite',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reports', to='interfaces.testsuite'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-17 17:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interfaces', '0007_load_test_reports'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='runjob',
+            name='shard',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='runjob',
+            name='shard_count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='runjob',
+            name='stats',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
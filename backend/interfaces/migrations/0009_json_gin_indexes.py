@@ -0,0 +1,41 @@
+"""GIN (jsonb_path_ops) indexes for JSON containment queries on PostgreSQL.
+
+The indexes are created with raw SQL and only on PostgreSQL; other backends
+store JSON as text and have no equivalent index type.
+"""
+
+from django.db import migrations
+
+GIN_INDEXES = (
+    ("interfaces", "InterfaceCase", "assertions", "case_assertions_gin"),
+    ("interfaces", "TestReport", "details", "report_details_gin"),
+    ("interfaces", "APIInterface", "request_params", "interface_params_gin"),
+)
+
+
+def create_gin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for app_label, model_name, column, name in GIN_INDEXES:
+        table = schema_editor.quote_name(apps.get_model(app_label, model_name)._meta.db_table)
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({schema_editor.quote_name(column)} jsonb_path_ops)"
+        )
+
+
+def drop_gin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for _, _, _, name in GIN_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("interfaces", "0008_run_job_shards"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_gin_indexes, drop_gin_indexes),
+    ]
@@ -0,0 +1,20 @@
+"""Full-text search index over interface name, path, method and description.
+
+The SQL lives in ``interfaces.search_index`` so later migrations that
+rebuild the table on SQLite can recreate the triggers.
+"""
+
+from django.db import migrations
+
+from interfaces.search_index import create_search_index, drop_search_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("interfaces", "0009_json_gin_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-17 17:43
+
+from django.db import migrations, models
+
+from interfaces.search_index import around_table_rebuild
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interfaces', '0010_interface_search_index'),
+    ]
+
+    # SQLite adds the column by rebuilding the table, which drops the FTS triggers.
+    operations = around_table_rebuild(
+        migrations.AddField(
+            model_name='apiinterface',
+            name='responses',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    )
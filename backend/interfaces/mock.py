@@ -0,0 +1,308 @@
+"""Asyncio mock server answering a project's ``APIInterface`` definitions.
+
+``MockRoutes`` snapshots a project once: a ``PathMatcher`` over the
+interfaces' path templates and one pre-encoded response per interface. The
+response is, in order of preference,
+
+* the body of the most recent passing run result recorded for one of the
+  interface's cases,
+* an ``example``/``examples`` entry of the lowest 2xx response imported from
+  the OpenAPI spec (``APIInterface.responses``),
+* a value synthesized from that response's schema, or
+* ``{}``.
+
+``MockServer`` serves the routes over HTTP/1.1 with keep-alive from a single
+event loop, so it does no database work per request and can stand in for
+``Environment.base_url`` in load tests. Latency (fixed plus uniform jitter)
+and error responses are injected from a seeded RNG, which makes runs
+repeatable. Unknown paths answer ``404``, known paths with another method
+``405``.
+
+Routes are not reloaded; restart the server after changing interfaces.
+"""
+
+import asyncio
+import json
+import random
+import threading
+
+from django.db.models import Max
+
+from backend.conf import AppSettings
+
+from .models import APIInterface, ResponseBody, TestCaseResult
+from .results import decode_body
+from .search import PathMatcher
+
+# Bind address, injected latency and jitter in ms, fraction of requests
+# answered with ERROR_STATUS, and the nesting depth up to which response
+# schemas are synthesized.
+mock_server_settings = AppSettings(
+    "MOCK_SERVER",
+    {
+        "HOST": "127.0.0.1",
+        "PORT": 8100,
+        "LATENCY_MS": 0,
+        "JITTER_MS": 0,
+        "ERROR_RATE": 0.0,
+        "ERROR_STATUS": 500,
+        "MAX_SCHEMA_DEPTH": 8,
+    },
+)
+
+REASONS = {200: "OK", 201: "Created", 202: "Accepted", 204: "No Content", 404: "Not Found", 405: "Method Not Allowed"}
+
+_SAMPLE_STRINGS = {
+    "date": "2024-01-01",
+    "date-time": "2024-01-01T00:00:00Z",
+    "email": "user@example.com",
+    "uuid": "00000000-0000-4000-8000-000000000000",
+    "uri": "https://example.com",
+}
+
+
+def example_from_schema(schema, depth=0, max_depth=None):
+    """Return a JSON value conforming to (a practical subset of) ``schema``."""
+
+    max_depth = max_depth or mock_server_settings()["MAX_SCHEMA_DEPTH"]
+    if not isinstance(schema, dict) or depth > max_depth:
+        return None
+    for key in ("example", "default"):
+        if key in schema:
+            return schema[key]
+    if schema.get("enum"):
+        return schema["enum"][0]
+    for key in ("allOf", "oneOf", "anyOf"):
+        if schema.get(key):
+            if key != "allOf":
+                return example_from_schema(schema[key][0], depth + 1, max_depth)
+            merged = {}
+            for part in schema[key]:
+                value = example_from_schema(part, depth + 1, max_depth)
+                if isinstance(value, dict):
+                    merged.update(value)
+            return merged
+
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = next((item for item in kind if item != "null"), None)
+    if kind == "object" or (kind is None and "properties" in schema):
+        return {
+            name: example_from_schema(prop, depth + 1, max_depth)
+            for name, prop in (schema.get("properties") or {}).items()
+        }
+    if kind == "array":
+        item = example_from_schema(schema.get("items"), depth + 1, max_depth)
+        return [] if item is None else [item]
+    if kind == "string":
+        return _SAMPLE_STRINGS.get(schema.get("format"), "string")
+    if kind == "integer":
+        return schema.get("minimum", 0)
+    if kind == "number":
+        return float(schema.get("minimum", 0))
+    if kind == "boolean":
+        return True
+    return None
+
+
+def _success_status(responses):
+    codes = sorted(int(code) for code in responses if str(code).isdigit())
+    return next((code for code in codes if 200 <= code < 300), 200)
+
+
+def response_from_spec(responses):
+    """Return ``(status, value)`` for the lowest 2xx response of an OpenAPI ``responses`` map."""
+
+    responses = responses if isinstance(responses, dict) else {}
+    status = _success_status(responses)
+    response = responses.get(str(status)) or {}
+    if not isinstance(response, dict):
+        return status, {}
+
+    content = response.get("content") or {}
+    media = content.get("application/json") or next(iter(content.values()), None) or {}
+    if "example" in media:
+        return status, media["example"]
+    examples = media.get("examples") or {}
+    for example in examples.values():
+        if isinstance(example, dict) and "value" in example:
+            return status, example["value"]
+    swagger_examples = response.get("examples") or {}  # Swagger 2.0
+    if "application/json" in swagger_examples:
+        return status, swagger_examples["application/json"]
+
+    schema = media.get("schema") or response.get("schema")
+    value = example_from_schema(schema) if schema else None
+    return status, {} if value is None else value
+
+
+def recorded_bodies(interface_ids):
+    """Map interface ids to ``(status, body)`` of their latest passing result, in two queries."""
+
+    latest = dict(
+        TestCaseResult.objects.filter(case__interface_id__in=interface_ids, passed=True, body__isnull=False)
+        .values("case__interface_id")
+        .annotate(latest=Max("pk"))
+        .values_list("latest", "case__interface_id")
+    )
+    return {
+        latest[body.pk]: (body.result.status_code or 200, decode_body(body))
+        for body in ResponseBody.objects.filter(pk__in=latest).select_related("result")
+    }
+
+
+def _encode(value):
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+class MockRoutes:
+    """Snapshot of a project's interfaces: path matcher plus a pre-encoded response per interface."""
+
+    def __init__(self, project_id, recorded=True):
+        interfaces = list(
+            APIInterface.objects.filter(project_id=project_id).values_list("pk", "method", "path", "responses")
+        )
+        self.matcher = PathMatcher((pk, method, path) for pk, method, path, _ in interfaces)
+        recordings = recorded_bodies([pk for pk, *_ in interfaces]) if recorded else {}
+        self.responses = {}
+        for pk, method, path, responses in interfaces:
+            if pk in recordings:
+                status, body = recordings[pk]
+            else:
+                status, value = response_from_spec(responses)
+                body = _encode(value)
+            self.responses[pk] = (status, body)
+
+    def __len__(self):
+        return len(self.responses)
+
+    def resolve(self, method, path):
+        """Return ``(status, body)``; ``404`` for unknown paths, ``405`` for unsupported methods."""
+
+        matches = self.matcher.match(path, method)
+        if matches:
+            return self.responses[matches[0]]
+        if self.matcher.match(path):
+            return 405, _encode({"detail": f"Method {method} not allowed."})
+        return 404, _encode({"detail": "No interface matches this path."})
+
+
+class MockServer:
+    def __init__(self, routes, latency_ms=None, jitter_ms=None, error_rate=None, error_status=None, seed=None):
+        config = mock_server_settings()
+        self.routes = routes
+        self.latency = (config["LATENCY_MS"] if latency_ms is None else latency_ms) / 1000
+        self.jitter = (config["JITTER_MS"] if jitter_ms is None else jitter_ms) / 1000
+        self.error_rate = config["ERROR_RATE"] if error_rate is None else error_rate
+        self.error_status = error_status or config["ERROR_STATUS"]
+        self.random = random.Random(seed)
+        self.stats = {"requests": 0, "injected_errors": 0, "not_found": 0}
+        self._server = None
+
+    async def start(self, host=None, port=None):
+        config = mock_server_settings()
+        self._server = await asyncio.start_server(
+            self._serve_connection, host or config["HOST"], config["PORT"] if port is None else port
+        )
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def respond(self, method, path):
+        """Return ``(status, body, delay_seconds)`` for one request."""
+
+        self.stats["requests"] += 1
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.stats["injected_errors"] += 1
+            return self.error_status, _encode({"detail": "Injected error."}), delay
+        status, body = self.routes.resolve("GET" if method == "HEAD" else method, path)
+        if status == 404:
+            self.stats["not_found"] += 1
+        return status, body, delay
+
+    async def _serve_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = (request_line.decode("latin-1").split() + ["", "", ""])[:3]
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                await self._discard_body(reader, headers)
+
+                status, body, delay = self.respond(method.upper(), target.split("?", 1)[0])
+                if delay:
+                    await asyncio.sleep(delay)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                if method.upper() == "HEAD" or status == 204:
+                    body = b""
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status} {REASONS.get(status, 'Mock')}\r\n"
+                        "Content-Type: application/json\r\n"
+                        f"Content-Length: {len(body)}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                    ).encode("latin-1")
+                    + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _discard_body(reader, headers):
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            while True:
+                size = int((await reader.readline()).split(b";", 1)[0], 16)
+                if not size:
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    return
+                await reader.readexactly(size + 2)
+        length = int(headers.get("content-length") or 0)
+        if length:
+            await reader.readexactly(length)
+
+
+class MockServerThread:
+    """Run a ``MockServer`` on its own event loop in a daemon thread (``with`` block)."""
+
+    def __init__(self, server, host=None, port=0):
+        self.server = server
+        self.host = host
+        self.port = port
+        self.base_url = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        host, port = asyncio.run_coroutine_threadsafe(self.server.start(self.host, self.port), self._loop).result()
+        self.base_url = f"http://{host}:{port}"
+        return self
+
+    def __exit__(self, *exc_info):
+        asyncio.run_coroutine_threadsafe(self.server.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
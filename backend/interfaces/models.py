@@ -28,6 +28,10 @@ class APIInterface(models.Model):
     request_params = models.JSONField(default=dict, blank=True)
     request_body = models.JSONField(default=dict, blank=True)
     headers = models.JSONField(default=dict, blank=True)
+    # OpenAPI response objects by status code; the mock server answers from them.
+    responses = models.JSONField(default=dict, blank=True)
+    # SHA-256 of the imported operation, used to skip unchanged rows on re-import.
+    content_hash = models.CharField(max_length=64, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -63,6 +67,7 @@ class InterfaceCase(models.Model):
 
     class Meta:
         ordering = ["interface__project__name", "name"]
+        indexes = [models.Index(fields=["name", "id"], name="case_name_id_idx")]
 
     def __str__(self) -> str:  # pragma: no cover - debugging helper
         return f"{self.interface.name}::{self.name}"
@@ -118,6 +123,8 @@ class TestSuite(models.Model):
     name = models.CharField(max_length=160)
     description = models.TextField(blank=True)
     cases = models.ManyToManyField(InterfaceCase, related_name="test_suites", blank=True)
+    # Denormalized len(cases), maintained by the signals in interfaces.signals.
+    case_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -134,13 +141,30 @@ class TestReport(models.Model):
         ("success", "Success"),
         ("failed", "Failed"),
         ("running", "Running"),
+        ("queued", "Queued"),
+    )
+
+    KIND_CHOICES = (
+        ("functional", "Functional"),
+        ("load", "Load test"),
     )
 
     suite = models.ForeignKey(
         TestSuite,
+        null=True,
+        blank=True,
         related_name="reports",
         on_delete=models.CASCADE,
     )
+    # Set instead of ``suite`` for scenario load tests.
+    scenario = models.ForeignKey(
+        Scenario,
+        null=True,
+        blank=True,
+        related_name="reports",
+        on_delete=models.CASCADE,
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default="functional")
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="running")
     summary = models.TextField(blank=True)
     details = models.JSONField(default=dict, blank=True)
@@ -148,6 +172,99 @@ class TestReport(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [models.Index(fields=["-created_at", "-id"], name="report_created_id_idx")]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.suite or self.scenario}::{self.created_at:%Y-%m-%d %H:%M}"
+
+
+class TestCaseResult(models.Model):
+    """Outcome of one case execution within a report."""
+
+    report = models.ForeignKey(
+        TestReport,
+        related_name="results",
+        on_delete=models.CASCADE,
+    )
+    case = models.ForeignKey(
+        InterfaceCase,
+        null=True,
+        blank=True,
+        related_name="results",
+        on_delete=models.SET_NULL,
+    )
+    name = models.CharField(max_length=160)
+    method = models.CharField(max_length=10)
+    url = models.TextField(blank=True)
+    status_code = models.PositiveIntegerField(null=True, blank=True)
+    latency_ms = models.FloatField(null=True, blank=True)
+    passed = models.BooleanField(default=False)
+    assertions = models.JSONField(default=list, blank=True)
+    error = models.TextField(blank=True)
+    response_size = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [models.Index(fields=["report", "passed"])]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.report_id}::{self.name}"
+
+
+class ResponseBody(models.Model):
+    """Compressed response body, kept out of the result rows."""
+
+    ENCODING_CHOICES = (
+        ("identity", "Identity"),
+        ("zlib", "zlib"),
+    )
+
+    result = models.OneToOneField(
+        TestCaseResult,
+        primary_key=True,
+        related_name="body",
+        on_delete=models.CASCADE,
+    )
+    encoding = models.CharField(max_length=10, choices=ENCODING_CHOICES, default="identity")
+    truncated = models.BooleanField(default=False)
+    data = models.BinaryField()
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.result_id}::{self.encoding}"
+
+
+class RunJob(models.Model):
+    """Database-backed queue entry consumed by the run workers."""
+
+    STATUS_CHOICES = (
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("error", "Error"),
+    )
+
+    report = models.ForeignKey(
+        TestReport,
+        related_name="jobs",
+        on_delete=models.CASCADE,
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="queued")
+    # A suite run may be split into ``shard_count`` jobs, one per shard.
+    shard = models.PositiveIntegerField(default=0)
+    shard_count = models.PositiveIntegerField(default=1)
+    # Partial statistics of a finished shard, merged into the report at the end.
+    stats = models.JSONField(default=dict, blank=True)
+    worker = models.CharField(max_length=120, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["created_at", "id"]
+        indexes = [models.Index(fields=["status", "created_at"])]
 
     def __str__(self) -> str:  # pragma: no cover
-        return f"{self.suite}::{self.created_at:%Y-%m-%d %H:%M}"
+        return f"{self.report_id}::{self.status}"
@@ -0,0 +1,262 @@
+"""Streaming Swagger/OpenAPI parsing for large JSON and YAML specs.
+
+The spec is parsed twice from a seekable stream: the first pass checks that
+the root is a mapping with a ``paths`` key and collects the reusable
+``components`` (OpenAPI 3) / ``definitions``/``parameters`` (Swagger 2)
+sections, the second pass yields ``paths`` one path item at a time. In
+both formats only the children of the wanted sections are built from the
+parser's events (ijson for JSON), so peak memory is bounded by the
+components plus the largest path item rather than the whole file.
+
+``$ref`` pointers are resolved lazily by ``RefResolver`` — only the
+components an operation actually references are expanded, and each one is
+expanded once. Recursive references are left as ``{"$ref": ...}``.
+"""
+
+import hashlib
+import io
+
+# Top-level sections that ``#/...`` references point into.
+COMPONENT_SECTIONS = ("components", "definitions", "parameters", "responses")
+
+YAML_EXTENSIONS = (".yaml", ".yml")
+
+
+class SpecError(ValueError):
+    """Raised when an uploaded spec cannot be parsed."""
+
+
+def detect_format(stream, name=""):
+    """Return ``"json"`` or ``"yaml"`` from the file name or the first byte."""
+
+    if name and name.lower().endswith(YAML_EXTENSIONS):
+        return "yaml"
+    if name and name.lower().endswith(".json"):
+        return "json"
+    head = stream.read(1024)
+    stream.seek(0)
+    if isinstance(head, str):
+        head = head.encode("utf-8")
+    return "json" if head.lstrip(b"\xef\xbb\xbf \t\r\n").startswith(b"{") else "yaml"
+
+
+def digest_stream(stream, chunk_size=1 << 16):
+    """Return the SHA-256 of ``stream``'s content and rewind it."""
+
+    digest = hashlib.sha256()
+    stream.seek(0)
+    while chunk := stream.read(chunk_size):
+        digest.update(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def as_stream(raw):
+    """Wrap pasted spec text in a seekable binary stream."""
+
+    if not isinstance(raw, (str, bytes, bytearray)):
+        raise SpecError("The spec must be a mapping or JSON/YAML text.")
+    return io.BytesIO(raw.encode("utf-8") if isinstance(raw, str) else raw)
+
+
+# JSON -----------------------------------------------------------------------
+
+
+def _json_sections(stream, sections, keys=None):
+    """Yield ``(section, key, value)`` for children of top-level ``sections`` in one pass.
+
+    Only those children are built from ijson's events; top-level keys are
+    added to ``keys`` when given.
+    """
+
+    try:
+        import ijson
+        from ijson.common import ObjectBuilder
+    except ImportError as exc:  # pragma: no cover - depends on installed extras
+        raise SpecError("Streaming JSON import requires the 'ijson' package.") from exc
+
+    stream.seek(0)
+    depth = 0
+    section = key = builder = None
+    try:
+        for index, (_, event, value) in enumerate(ijson.parse(stream, use_float=True)):
+            if index == 0 and event != "start_map":
+                raise SpecError("The spec must be a JSON object.")
+            if event in ("start_map", "start_array"):
+                depth += 1
+            elif event in ("end_map", "end_array"):
+                depth -= 1
+            if builder is not None:
+                builder.event(event, value)
+                if depth == 2:
+                    yield section, key, builder.value
+                    builder = None
+            elif event == "map_key" and depth == 1:
+                section = value
+                if keys is not None:
+                    keys.add(value)
+            elif event == "map_key" and depth == 2 and section in sections:
+                key, builder = value, ObjectBuilder()
+    except ijson.JSONError as exc:
+        raise SpecError(f"Invalid JSON: {exc}") from exc
+
+
+# YAML -----------------------------------------------------------------------
+
+
+def _yaml_sections(stream, sections, keys=None):
+    """Yield ``(section, key, value)`` for children of top-level ``sections``.
+
+    Each child is rebuilt from its own slice of parser events, so anchors
+    must not be shared between path items. Top-level keys are added to
+    ``keys`` when given.
+    """
+
+    try:
+        import yaml
+    except ImportError as exc:  # pragma: no cover - depends on installed extras
+        raise SpecError("YAML import requires the 'PyYAML' package.") from exc
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    wrapper = [yaml.StreamStartEvent(), yaml.DocumentStartEvent()]
+    closing = [yaml.DocumentEndEvent(), yaml.StreamEndEvent()]
+    collection_start = (yaml.MappingStartEvent, yaml.SequenceStartEvent)
+    collection_end = (yaml.MappingEndEvent, yaml.SequenceEndEvent)
+    document_events = (yaml.StreamStartEvent, yaml.DocumentStartEvent, yaml.DocumentEndEvent, yaml.StreamEndEvent)
+
+    def build(events):
+        return yaml.load(yaml.emit([*wrapper, *events, *closing]), Loader=loader)
+
+    stream.seek(0)
+    try:
+        events = yaml.parse(stream, Loader=loader)
+        depth = 0
+        section = None
+        expect_key = True
+        for event in events:
+            if depth == 0 and not isinstance(event, (yaml.MappingStartEvent, *document_events)):
+                raise SpecError("The spec must be a mapping.")
+            if depth == 1 and isinstance(event, yaml.ScalarEvent) and expect_key:
+                section = event.value if event.value in sections else None
+                if keys is not None:
+                    keys.add(event.value)
+                expect_key = False
+                continue
+            if depth == 1 and not isinstance(event, collection_end):
+                expect_key = True
+                if section is None or not isinstance(event, yaml.MappingStartEvent):
+                    _skip(event, events, collection_start, collection_end)
+                    continue
+                yield from _yaml_children(section, events, build, collection_start, collection_end)
+                continue
+            if isinstance(event, collection_start):
+                depth += 1
+            elif isinstance(event, collection_end):
+                depth -= 1
+    except yaml.YAMLError as exc:
+        raise SpecError(f"Invalid YAML: {exc}") from exc
+
+
+def _skip(event, events, collection_start, collection_end):
+    if not isinstance(event, collection_start):
+        return
+    depth = 1
+    for event in events:
+        if isinstance(event, collection_start):
+            depth += 1
+        elif isinstance(event, collection_end):
+            depth -= 1
+            if not depth:
+                return
+
+
+def _yaml_children(section, events, build, collection_start, collection_end):
+    for event in events:
+        if isinstance(event, collection_end):
+            return
+        key = event.value
+        value = next(events)
+        fragment = [value]
+        if isinstance(value, collection_start):
+            depth = 1
+            for event in events:
+                fragment.append(event)
+                if isinstance(event, collection_start):
+                    depth += 1
+                elif isinstance(event, collection_end):
+                    depth -= 1
+                    if not depth:
+                        break
+        yield section, key, build(fragment)
+
+
+# References -----------------------------------------------------------------
+
+
+class RefResolver:
+    """Memoized, lazy resolver for local ``#/...`` references."""
+
+    def __init__(self, root):
+        self.root = root
+        self._cache = {}
+
+    def _target(self, ref):
+        node = self.root
+        for part in ref[2:].split("/"):
+            part = part.replace("~1", "/").replace("~0", "~")
+            if isinstance(node, list) and part.isdigit():
+                index = int(part)
+                node = node[index] if index < len(node) else None
+            elif isinstance(node, dict):
+                node = node.get(part)
+            else:
+                node = None
+            if node is None:
+                return None
+        return node
+
+    def resolve(self, node, _active=frozenset()):
+        if isinstance(node, list):
+            return [self.resolve(item, _active) for item in node]
+        if not isinstance(node, dict):
+            return node
+        ref = node.get("$ref")
+        if isinstance(ref, str) and ref.startswith("#/"):
+            if ref in self._cache:
+                return self._cache[ref]
+            target = self._target(ref)
+            if target is None or ref in _active:
+                return node
+            resolved = self.resolve(target, _active | {ref})
+            self._cache[ref] = resolved
+            return resolved
+        return {key: self.resolve(value, _active) for key, value in node.items()}
+
+
+# Entry points ---------------------------------------------------------------
+
+
+def iter_spec_sections(stream, fmt, sections, keys=None):
+    reader = _yaml_sections if fmt == "yaml" else _json_sections
+    return reader(stream, sections, keys)
+
+
+def stream_operations(stream, name="", fmt=None, methods=None):
+    """Yield ``(path, METHOD, operation)`` from ``stream`` with refs resolved."""
+
+    fmt = fmt or detect_format(stream, name)
+    root, keys = {}, set()
+    for section, key, value in iter_spec_sections(stream, fmt, COMPONENT_SECTIONS, keys):
+        root.setdefault(section, {})[key] = value
+    if "paths" not in keys:
+        raise SpecError("The spec has no 'paths' section.")
+    resolver = RefResolver(root)
+
+    for _, path, path_item in iter_spec_sections(stream, fmt, ("paths",)):
+        if not isinstance(path_item, dict):
+            continue
+        for method, operation in path_item.items():
+            if methods is not None and method.lower() not in methods:
+                continue
+            if isinstance(operation, dict):
+                yield str(path), method.upper(), resolver.resolve(operation)
@@ -0,0 +1,137 @@
+"""Keyset (seek) pagination for large, append-heavy listings.
+
+Pages are addressed by an opaque cursor holding the ordering values of the
+last row on the previous page, so fetching page N is a single indexed range
+scan (``WHERE (created_at, id) < (...) ORDER BY ... LIMIT n``) instead of an
+``OFFSET`` scan, and no ``COUNT(*)`` is issued.
+"""
+
+import base64
+import json
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+class KeysetPagination(BasePagination):
+    """Paginate on a unique ``ordering`` tuple, e.g. ``("-created_at", "-id")``.
+
+    The last ordering field must be unique so ties on the leading fields are
+    broken deterministically; the matching composite index lives on the model.
+    """
+
+    ordering = ("-id",)
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = api_settings.PAGE_SIZE or 20
+    max_page_size = 200
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def _encode(self, row, reverse):
+        values = [getattr(row, name) for name in self._names]
+        payload = json.dumps({"v": values, "r": reverse}, default=str, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+    def _decode(self, queryset, token):
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+            raw_values, reverse = payload["v"], bool(payload["r"])
+            if len(raw_values) != len(self._names):
+                raise ValueError
+            values = [
+                queryset.model._meta.get_field(name).to_python(value)
+                for name, value in zip(self._names, raw_values)
+            ]
+        except (ValueError, TypeError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def _seek(self, values, reverse):
+        """``Q`` selecting rows strictly after (or before, when ``reverse``) ``values``."""
+
+        condition = Q()
+        for index in reversed(range(len(self._names))):
+            name = self._names[index]
+            descending = self._descending[index] != reverse
+            step = Q(**{f"{name}__{'lt' if descending else 'gt'}": values[index]})
+            if index < len(self._names) - 1:
+                step |= Q(**{name: values[index]}) & condition
+            condition = step
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self._names = [field.lstrip("-") for field in self.ordering]
+        self._descending = [field.startswith("-") for field in self.ordering]
+        size = self.get_page_size(request)
+
+        token = request.query_params.get(self.cursor_query_param)
+        reverse = False
+        if token:
+            values, reverse = self._decode(queryset, token)
+            queryset = queryset.filter(self._seek(values, reverse))
+
+        order = [
+            f"{'-' if descending != reverse else ''}{name}"
+            for name, descending in zip(self._names, self._descending)
+        ]
+        rows = list(queryset.order_by(*order)[: size + 1])
+        has_more = len(rows) > size
+        rows = rows[:size]
+        if reverse:
+            rows.reverse()
+
+        self._next = self._encode(rows[-1], False) if rows and (has_more or reverse) else None
+        self._previous = self._encode(rows[0], True) if rows and token and (has_more or not reverse) else None
+        return rows
+
+    def _link(self, token):
+        if token is None:
+            return None
+        url = self.request.build_absolute_uri()
+        parts = urlsplit(url)
+        query = [
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if key != self.cursor_query_param
+        ]
+        query.append((self.cursor_query_param, token))
+        return urlunsplit(parts._replace(query=urlencode(query)))
+
+    def get_paginated_response(self, data):
+        return Response({"next": self._link(self._next), "previous": self._link(self._previous), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class ReportPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
+
+
+class CasePagination(KeysetPagination):
+    ordering = ("name", "id")
+
+
+class ResultPagination(KeysetPagination):
+    ordering = ("id",)
@@ -0,0 +1,362 @@
+"""Database-backed run queue and the local worker pool that drains it.
+
+``enqueue_suite_run`` and ``enqueue_load_test`` record a queued ``TestReport``
+together with its ``RunJob`` rows. Workers claim jobs with a conditional
+UPDATE, so any number of threads or ``run_workers`` processes (on any number
+of hosts) can share the same table without a separate broker.
+
+Large suites can be split into shards: each shard is its own job, executed
+and retried independently, and stores its partial statistics on the job.
+The worker finishing the last shard merges them into the report.
+"""
+
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from django.db import close_old_connections, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from backend.conf import AppSettings
+
+from .loadtest import run_load_test
+from .models import RunJob, TestReport
+from .runner import finish_report, run_shard, run_suite
+
+logger = logging.getLogger(__name__)
+
+# AUTOSTART spawns worker threads inside the web process on the first
+# enqueue; disable it when running `manage.py run_workers`. SHARDS splits each
+# suite run into that many independently claimed jobs. While a job runs its
+# worker refreshes claimed_at every HEARTBEAT seconds; every SWEEP_INTERVAL
+# seconds jobs without a heartbeat for STALE_AFTER seconds (crashed workers)
+# are requeued, or failed once they were claimed MAX_ATTEMPTS times.
+queue_settings = AppSettings(
+    "RUN_QUEUE",
+    {
+        "WORKERS": 2,
+        "POLL_INTERVAL": 1.0,
+        "AUTOSTART": True,
+        "MAX_ATTEMPTS": 3,
+        "HEARTBEAT": 30,
+        "STALE_AFTER": 600,
+        "SWEEP_INTERVAL": 60,
+        "SHARDS": 1,
+        "MAX_SHARDS": 64,
+    },
+)
+
+
+def enqueue_suite_run(suite, summary="", shards=None):
+    """Create a queued report for ``suite`` and hand it to the workers.
+
+    ``shards`` (default ``RUN_QUEUE["SHARDS"]``) splits the run into that
+    many jobs, capped by ``MAX_SHARDS`` and by the number of cases.
+    """
+
+    config = queue_settings()
+    shards = max(1, min(shards or config["SHARDS"], config["MAX_SHARDS"], suite.case_count or 1))
+    return _enqueue(TestReport(suite=suite, status="queued", summary=summary), shards)
+
+
+def enqueue_load_test(config, suite=None, scenario=None):
+    """Queue a load test of ``suite`` or ``scenario``; ``config`` is kept in ``details``."""
+
+    report = TestReport(suite=suite, scenario=scenario, kind="load", status="queued", details={"config": config})
+    return _enqueue(report)
+
+
+def _enqueue(report, shards=1):
+    with transaction.atomic():
+        report.save()
+        RunJob.objects.bulk_create(
+            [RunJob(report=report, shard=shard, shard_count=shards) for shard in range(shards)]
+        )
+        if queue_settings()["AUTOSTART"]:
+            transaction.on_commit(lambda: get_worker_pool().wake())
+    return report
+
+
+def claim_next_job(worker):
+    """Atomically move the oldest queued job to ``running`` and return it."""
+
+    candidates = list(
+        RunJob.objects.filter(status="queued").order_by("created_at", "id").values_list("pk", flat=True)[:10]
+    )
+    for pk in candidates:
+        now = timezone.now()
+        claimed = RunJob.objects.filter(pk=pk, status="queued").update(
+            status="running",
+            worker=worker,
+            claimed_at=now,
+            attempts=F("attempts") + 1,
+            updated_at=now,
+        )
+        if claimed:
+            return RunJob.objects.select_related("report", "report__suite", "report__scenario").get(pk=pk)
+    return None
+
+
+class JobHeartbeat:
+    """Refresh a running job's ``claimed_at`` from a side thread (``with`` block).
+
+    The stale sweep only requeues jobs whose heartbeat stopped, so runs
+    longer than ``STALE_AFTER`` are not claimed a second time.
+    """
+
+    def __init__(self, job, interval=None):
+        self.job = job
+        self.interval = interval or queue_settings()["HEARTBEAT"]
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._beat, name=f"run-job-{job.pk}-heartbeat", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+
+    def _beat(self):
+        try:
+            while not self._stopped.wait(self.interval):
+                try:
+                    RunJob.objects.filter(pk=self.job.pk, status="running").update(claimed_at=timezone.now())
+                except Exception:  # pragma: no cover - retried on the next beat
+                    logger.exception("Heartbeat of run job %s failed", self.job.pk)
+        finally:
+            connections.close_all()
+
+
+def _fail_report(report, reason):
+    report.status = "failed"
+    report.summary = report.summary or f"Run aborted: {reason}"
+    report.save(update_fields=["status", "summary"])
+
+
+def process_job(job):
+    report = job.report
+    TestReport.objects.filter(pk=report.pk, status="queued").update(status="running")
+    report.status = "running"
+    try:
+        with JobHeartbeat(job):
+            if report.kind == "load":
+                run_load_test(report)
+            elif job.shard_count > 1:
+                job.stats = run_shard(report, job.shard, job.shard_count)
+            else:
+                run_suite(report)
+    except Exception as exc:  # pragma: no cover - depends on runtime failures
+        logger.exception("Run job %s failed", job.pk)
+        job.error = str(exc)
+        if job.attempts < queue_settings()["MAX_ATTEMPTS"]:
+            job.status = "queued"
+        else:
+            job.status = "error"
+            if job.shard_count == 1:
+                _fail_report(report, exc)
+    else:
+        job.status = "done"
+    job.save(update_fields=["status", "stats", "error", "updated_at"])
+    if job.shard_count > 1 and job.status in ("done", "error"):
+        finish_sharded_report(report)
+    return job
+
+
+def finish_sharded_report(report):
+    """Merge the shards of ``report`` once none of them is queued or running.
+
+    Every finishing shard calls this; only the call that sees all shards
+    settled writes the report, and the result does not depend on which one.
+    """
+
+    with transaction.atomic():
+        jobs = list(RunJob.objects.select_for_update().filter(report=report).order_by("shard"))
+        if any(job.status in ("queued", "running") for job in jobs):
+            return False
+        failed = [job for job in jobs if job.status == "error"]
+        error = ""
+        if failed:
+            error = f"Shards {', '.join(str(job.shard) for job in failed)} of {len(jobs)} aborted: {failed[0].error}"
+        finish_report(report, [job.stats for job in jobs if job.status == "done"], error=error)
+    return True
+
+
+def requeue_stale_jobs():
+    """Return jobs abandoned by a crashed worker to the queue; return how many were requeued.
+
+    ``attempts`` counts claims, so a job that keeps killing its worker is
+    marked ``error`` (and its report failed) once it was claimed
+    ``MAX_ATTEMPTS`` times instead of being requeued forever.
+    """
+
+    config = queue_settings()
+    now = timezone.now()
+    stale = RunJob.objects.filter(status="running", claimed_at__lt=now - timedelta(seconds=config["STALE_AFTER"]))
+    for job in stale.filter(attempts__gte=config["MAX_ATTEMPTS"]).select_related("report"):
+        abandoned = RunJob.objects.filter(pk=job.pk, status="running", claimed_at=job.claimed_at).update(
+            status="error", error="Worker stopped responding.", updated_at=now
+        )
+        if not abandoned:
+            continue
+        if job.shard_count > 1:
+            finish_sharded_report(job.report)
+        else:
+            _fail_report(job.report, "worker stopped responding.")
+    return stale.filter(attempts__lt=config["MAX_ATTEMPTS"]).update(status="queued", updated_at=now)
+
+
+class RunWorkerPool:
+    """Threads that poll the queue table and execute claimed jobs.
+
+    Every ``SWEEP_INTERVAL`` seconds one of the threads also requeues jobs
+    left ``running`` by a crashed process, so a web process started with
+    ``AUTOSTART`` recovers them without ``run_workers``.
+    """
+
+    def __init__(self, size=None, poll_interval=None):
+        config = queue_settings()
+        self.size = size or config["WORKERS"]
+        self.poll_interval = poll_interval or config["POLL_INTERVAL"]
+        self.sweep_interval = config["SWEEP_INTERVAL"]
+        self._next_sweep = 0.0
+        self._threads = []
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            self._stopping.clear()
+            for index in range(self.size):
+                thread = threading.Thread(
+                    target=self._work,
+                    name=f"run-worker-{index}",
+                    args=(f"{self._prefix}:{index}",),
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def wake(self):
+        self.start()
+        self._wakeup.set()
+
+    def stop(self, timeout=None):
+        self._stopping.set()
+        self._wakeup.set()
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout)
+
+    def join(self):
+        for thread in list(self._threads):
+            thread.join()
+
+    def _sweep_due(self):
+        with self._lock:
+            now = time.monotonic()
+            if now < self._next_sweep:
+                return False
+            self._next_sweep = now + self.sweep_interval
+            return True
+
+    def _work(self, worker):
+        while not self._stopping.is_set():
+            job = None
+            try:
+                close_old_connections()
+                if self._sweep_due():
+                    requeue_stale_jobs()
+                job = claim_next_job(worker)
+                if job:
+                    process_job(job)
+            except Exception:  # pragma: no cover - keep the worker alive
+                logger.exception("Run worker %s crashed while polling", worker)
+            finally:
+                close_old_connections()
+            if not job:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = RunWorkerPool()
+        return _pool
+
+
+def serve_workers(size=None, poll_interval=None):
+    """Process entry point: run a ``RunWorkerPool`` until the process is stopped."""
+
+    import django
+
+    django.setup()
+    pool = RunWorkerPool(size=size, poll_interval=poll_interval)
+    pool.start()
+    try:
+        pool.join()
+    except KeyboardInterrupt:
+        pool.stop()
+
+
+class WorkerProcessSupervisor:
+    """Keep ``processes`` worker processes alive, restarting any that die.
+
+    Each process runs its own thread pool and claims jobs (or shards) from the
+    queue table, so CPU-bound work such as JSON parsing and assertion
+    evaluation is spread across cores instead of one interpreter's GIL.
+    """
+
+    def __init__(self, processes, size=None, poll_interval=None, check_interval=5):
+        self.processes = processes
+        self.size = size
+        self.poll_interval = poll_interval
+        self.check_interval = check_interval
+        self._children = []
+        self._stopping = threading.Event()
+
+    def _spawn(self, index):
+        process = multiprocessing.Process(
+            target=serve_workers,
+            args=(self.size, self.poll_interval),
+            name=f"run-worker-process-{index}",
+            daemon=True,
+        )
+        process.start()
+        return process
+
+    def start(self):
+        # Forked children must not share the parent's database connections.
+        connections.close_all()
+        self._children = [self._spawn(index) for index in range(self.processes)]
+
+    def supervise(self):
+        while not self._stopping.wait(self.check_interval):
+            for index, process in enumerate(self._children):
+                if not process.is_alive():
+                    logger.warning("Run worker process %s exited with %s; restarting", process.pid, process.exitcode)
+                    self._children[index] = self._spawn(index)
+
+    def stop(self, timeout=10):
+        self._stopping.set()
+        for process in self._children:
+            process.terminate()
+        for process in self._children:
+            process.join(timeout)
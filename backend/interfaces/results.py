@@ -0,0 +1,88 @@
+"""Batched persistence of per-case run results.
+
+Results are written to ``TestCaseResult`` while a run is in progress, in
+``bulk_create`` batches, and response bodies go to the separate
+``ResponseBody`` table, zlib-compressed and capped in size. The report
+itself only keeps aggregate statistics.
+"""
+
+import zlib
+
+from backend.conf import AppSettings
+
+from .models import ResponseBody, TestCaseResult
+
+# Rows per bulk insert and response body storage limits.
+result_settings = AppSettings(
+    "RESULT_STORE",
+    {
+        "BATCH_SIZE": 200,
+        "MAX_BODY_BYTES": 1024 * 1024,
+        "COMPRESS_MIN_BYTES": 256,
+    },
+)
+
+
+def encode_body(body, max_bytes=None, compress_min_bytes=None):
+    """Return ``(encoding, data, truncated)`` for storing ``body``."""
+
+    config = result_settings()
+    max_bytes = max_bytes or config["MAX_BODY_BYTES"]
+    compress_min_bytes = compress_min_bytes or config["COMPRESS_MIN_BYTES"]
+    truncated = len(body) > max_bytes
+    body = body[:max_bytes]
+    if len(body) < compress_min_bytes:
+        return "identity", body, truncated
+    return "zlib", zlib.compress(body, 6), truncated
+
+
+def decode_body(stored):
+    data = bytes(stored.data)
+    return zlib.decompress(data) if stored.encoding == "zlib" else data
+
+
+class ResultWriter:
+    """Buffer ``CaseResult`` objects and flush them to the database in batches."""
+
+    def __init__(self, report, batch_size=None):
+        config = result_settings()
+        self.report = report
+        self.batch_size = batch_size or config["BATCH_SIZE"]
+        self._pending = []
+        self.written = 0
+
+    def add(self, result):
+        self._pending.append(result)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        rows = TestCaseResult.objects.bulk_create(
+            [
+                TestCaseResult(
+                    report=self.report,
+                    case_id=result.case_id,
+                    name=result.name[:160],
+                    method=result.method,
+                    url=result.url,
+                    status_code=result.status_code,
+                    latency_ms=result.latency_ms,
+                    passed=result.passed,
+                    assertions=result.assertions,
+                    error=result.error,
+                    response_size=len(result.body or b""),
+                )
+                for result in pending
+            ],
+            batch_size=self.batch_size,
+        )
+        bodies = []
+        for row, result in zip(rows, pending):
+            if result.body:
+                encoding, data, truncated = encode_body(result.body)
+                bodies.append(ResponseBody(result=row, encoding=encoding, data=data, truncated=truncated))
+        ResponseBody.objects.bulk_create(bodies, batch_size=self.batch_size)
+        self.written += len(rows)
@@ -0,0 +1,326 @@
+"""Concurrent execution engine for interface cases.
+
+Cases are loaded from the database up front and then dispatched to a thread
+pool, so worker threads never touch the ORM. The number of requests in
+flight is bounded by the pool size and, per environment and host, by the
+size of the keep-alive connection pool in ``http_client``.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from urllib.parse import urlencode
+
+from django.utils import timezone
+
+from backend.conf import AppSettings
+from environments.models import Environment
+
+from .assertions import CompiledAssertions, compiled_assertions
+from .http_client import HTTPClient
+from .models import InterfaceCase, TestCaseResult
+from .results import ResultWriter
+from .templates import RequestTemplate, request_template
+
+# Global worker threads, concurrent requests (and pooled keep-alive
+# connections) per environment/host and read timeout (seconds).
+runner_settings = AppSettings(
+    "SUITE_RUNNER",
+    {
+        "MAX_WORKERS": 16,
+        "PER_HOST_LIMIT": 8,
+        "TIMEOUT": 10,
+    },
+)
+
+
+@dataclass
+class PreparedRequest:
+    case_id: int
+    name: str
+    method: str
+    url: str
+    headers: dict = field(default_factory=dict)
+    body: bytes = None
+    assertions: CompiledAssertions = field(default_factory=lambda: CompiledAssertions([]))
+    pool_key: int = None
+    error: str = ""
+
+
+@dataclass
+class CaseResult:
+    case_id: int
+    name: str
+    method: str
+    url: str
+    status_code: int = None
+    latency_ms: float = None
+    passed: bool = False
+    assertions: list = field(default_factory=list)
+    error: str = ""
+    body: bytes = field(default=None, repr=False)
+
+    def as_dict(self):
+        data = asdict(self)
+        del data["body"]
+        return data
+
+
+def prepare_request(case, environment=None, payload=None, context=None):
+    """Build the outgoing request for ``case`` against ``environment``.
+
+    The case's payload, path and headers are rendered with the environment's
+    ``variables`` (plus ``context``) through a ``RequestTemplate`` cached per
+    (case, environment). ``payload`` overrides ``case.request_payload``, e.g.
+    with scenario variables already substituted, and bypasses the cache.
+    """
+
+    environment = environment or case.environment
+    if payload is None:
+        template = request_template(case, environment)
+    else:
+        template = RequestTemplate(case, environment, payload)
+    method, path, params, headers, body = template.render(context)
+    path = str(path)
+    prepared = PreparedRequest(
+        case_id=case.pk,
+        name=case.name,
+        method=method,
+        url=path,
+        assertions=compiled_assertions(case),
+    )
+    if not environment or not environment.base_url:
+        prepared.error = "No environment with a base URL is configured for this case."
+        return prepared
+
+    url = f"{environment.base_url.rstrip('/')}/{path.lstrip('/')}"
+    if params:
+        url = f"{url}{'&' if '?' in url else '?'}{urlencode(params, doseq=True)}"
+    prepared.url = url
+    prepared.pool_key = environment.pk
+    # Shared with the cached template when it has no placeholders; never mutated.
+    prepared.headers = headers
+    prepared.body = body
+    return prepared
+
+
+class SuiteRunner:
+    """Run prepared requests with bounded global and per-host concurrency.
+
+    All requests of a run share one ``HTTPClient``; its per-origin pool size
+    is the per-host concurrency limit.
+    """
+
+    def __init__(self, max_workers=None, per_host_limit=None, timeout=None, client=None):
+        config = runner_settings()
+        self.max_workers = max_workers or config["MAX_WORKERS"]
+        self.per_host_limit = per_host_limit or config["PER_HOST_LIMIT"]
+        self.timeout = timeout or config["TIMEOUT"]
+        self._owns_client = client is None
+        self.client = client or HTTPClient(pool_size=self.per_host_limit, read_timeout=self.timeout)
+
+    def send(self, prepared):
+        return self.client.request(
+            prepared.method,
+            prepared.url,
+            headers=prepared.headers,
+            body=prepared.body,
+            key=prepared.pool_key,
+        )
+
+    def perform(self, prepared):
+        """Execute ``prepared`` and return ``(result, response)``.
+
+        ``response`` is the raw ``HTTPResponse`` (``None`` when the request
+        could not be sent) so callers such as the scenario runner can extract
+        values from headers and body.
+        """
+
+        result = CaseResult(
+            case_id=prepared.case_id,
+            name=prepared.name,
+            method=prepared.method,
+            url=prepared.url,
+            error=prepared.error,
+        )
+        if prepared.error:
+            return result, None
+
+        started = time.perf_counter()
+        try:
+            response = self.send(prepared)
+        except (OSError, ValueError) as exc:
+            result.error = str(exc)
+            result.latency_ms = round((time.perf_counter() - started) * 1000, 3)
+            return result, None
+        # Waiting for a pooled connection is not part of the endpoint's latency.
+        result.latency_ms = round(response.elapsed * 1000, 3)
+        result.status_code = response.status
+        result.body = response.body
+        result.assertions = prepared.assertions(
+            result.status_code,
+            response.body,
+            result.latency_ms,
+            response.headers,
+        )
+        result.passed = all(item["passed"] for item in result.assertions)
+        return result, response
+
+    def execute(self, prepared):
+        return self.perform(prepared)[0]
+
+    def run(self, requests):
+        requests = list(requests)
+        if not requests:
+            return []
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(requests))) as executor:
+                return list(executor.map(self.execute, requests))
+        finally:
+            if self._owns_client:
+                self.client.close()
+
+    def iter_results(self, requests):
+        """Yield results in completion order, so callers can persist them while the run continues."""
+
+        requests = list(requests)
+        if not requests:
+            return
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(requests))) as executor:
+                futures = [executor.submit(self.execute, prepared) for prepared in requests]
+                for future in as_completed(futures):
+                    yield future.result()
+        finally:
+            if self._owns_client:
+                self.client.close()
+
+
+def default_environments(project_ids):
+    return {
+        env.project_id: env
+        for env in Environment.objects.filter(project_id__in=project_ids, is_default=True)
+    }
+
+
+def prepare_suite(suite, shard=0, shard_count=1):
+    """Prepare a request for every active case of ``suite`` (or of one shard of it).
+
+    Shards take every ``shard_count``-th case in primary key order, so their
+    sizes differ by at most one.
+    """
+
+    cases = suite.cases.filter(is_active=True)
+    if shard_count > 1:
+        ids = list(cases.order_by("pk").values_list("pk", flat=True))[shard::shard_count]
+        cases = InterfaceCase.objects.filter(pk__in=ids)
+    cases = list(cases.select_related("interface", "environment").order_by("pk"))
+    fallback = default_environments({suite.project_id})
+    return [_prepare_case(case, case.environment or fallback.get(suite.project_id)) for case in cases]
+
+
+def _prepare_case(case, environment):
+    """``prepare_request``, turning a malformed payload into a failed result for that case only."""
+
+    try:
+        return prepare_request(case, environment)
+    except (AttributeError, TypeError, ValueError) as exc:
+        return PreparedRequest(
+            case_id=case.pk,
+            name=case.name,
+            method=case.interface.method,
+            url=case.interface.path,
+            error=f"Invalid request payload: {exc}",
+        )
+
+
+def run_shard(report, shard=0, shard_count=1, runner=None):
+    """Execute one shard of ``report.suite`` and return its partial statistics.
+
+    Per-case results are written to ``TestCaseResult`` in batches as they
+    complete. A retried shard first deletes the results it wrote before.
+    """
+
+    prepared = prepare_suite(report.suite, shard, shard_count)
+    stale = TestCaseResult.objects.filter(report=report)
+    if shard_count > 1:
+        stale = stale.filter(case_id__in=[request.case_id for request in prepared])
+    stale.delete()
+
+    writer = ResultWriter(report)
+    runner = runner or SuiteRunner()
+    executed = passed = latency_count = 0
+    latency_total = 0.0
+    latency_max = None
+    started = time.perf_counter()
+    for result in runner.iter_results(prepared):
+        executed += 1
+        passed += result.passed
+        if result.latency_ms is not None:
+            latency_count += 1
+            latency_total += result.latency_ms
+            latency_max = max(latency_max or 0, result.latency_ms)
+        writer.add(result)
+    writer.flush()
+    return {
+        "shard": shard,
+        "executed": executed,
+        "passed": passed,
+        "latency_count": latency_count,
+        "latency_total": round(latency_total, 3),
+        "latency_max": latency_max,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+        "connections": runner.client.stats(),
+    }
+
+
+def merge_partials(partials):
+    """Aggregate ``run_shard`` statistics into the report's ``details``."""
+
+    executed = sum(part["executed"] for part in partials)
+    passed = sum(part["passed"] for part in partials)
+    latency_count = sum(part["latency_count"] for part in partials)
+    latency_max = [part["latency_max"] for part in partials if part["latency_max"] is not None]
+    connections = {}
+    for part in partials:
+        for key, value in part["connections"].items():
+            connections[key] = connections.get(key, 0) + value
+    details = {
+        "executed_cases": executed,
+        "passed": passed,
+        "failed": executed - passed,
+        # Shards run in parallel, so the slowest one bounds the run.
+        "duration_ms": max((part["duration_ms"] for part in partials), default=0),
+        "latency_ms": {
+            "avg": round(sum(part["latency_total"] for part in partials) / latency_count, 3) if latency_count else None,
+            "max": max(latency_max, default=None),
+        },
+        "connections": connections,
+        "finished_at": timezone.now().isoformat(),
+    }
+    if len(partials) > 1:
+        details["shards"] = len(partials)
+    return details
+
+
+def finish_report(report, partials, error=""):
+    details = merge_partials(partials)
+    report.status = "success" if not error and details["passed"] == details["executed_cases"] else "failed"
+    if error:
+        report.summary = error
+    elif not report.summary:
+        report.summary = (
+            f"Executed {details['executed_cases']} cases: {details['passed']} passed, {details['failed']} failed."
+        )
+    report.details = details
+    report.save(update_fields=["status", "summary", "details"])
+    return report
+
+
+def run_suite(report, runner=None):
+    """Execute every active case of ``report.suite`` in this process.
+
+    ``report.details`` keeps only aggregate statistics; see ``run_shard``.
+    """
+
+    return finish_report(report, [run_shard(report, runner=runner)])
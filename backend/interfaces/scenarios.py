@@ -0,0 +1,331 @@
+"""Scenario execution with step-to-step variable extraction.
+
+Every scenario's steps are loaded together with their cases, interfaces and
+environments in one prefetch, so the steps run without touching the ORM.
+After each step the case's ``extractions`` are applied to the response, and
+``{{ name }}`` placeholders in later steps' requests are rendered from them.
+
+Steps form a dependency graph rather than a chain: a step waits only for
+the earlier steps (by ``order``) that produce a variable its request renders
+(through ``extractions`` or ``config["variables"]``), for the steps listed in
+``config["depends_on"]`` (by order), or for every earlier step when
+``config["sequential"]`` is set. Ready steps run concurrently, so a scenario
+takes as long as its critical path. Each step renders against the values of
+its own dependencies, which are the values it would have seen running in
+order. Independent scenarios run in parallel and share one ``SuiteRunner``
+(and so one keep-alive connection pool).
+"""
+
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.db.models import Prefetch
+
+from backend.conf import AppSettings
+
+from .assertions import decode_json
+from .jsonpath import JSONPathError, MISSING, compile_path, resolve
+from .models import Scenario, ScenarioStep
+from .runner import SuiteRunner, default_environments, prepare_request
+from .templates import PLACEHOLDER_RE
+
+# Steps run as a dependency graph; PARALLEL_STEPS=False runs every scenario
+# strictly in order. Scenarios run inside the request, so POST
+# /api/scenarios/run/ accepts at most MAX_SCENARIOS of them.
+scenario_settings = AppSettings(
+    "SCENARIO_RUN",
+    {
+        "PARALLEL_STEPS": True,
+        "MAX_STEP_WORKERS": 8,
+        "MAX_SCENARIOS": 16,
+    },
+)
+
+
+def _header(headers, name):
+    name = (name or "").lower()
+    for key, value in (headers or {}).items():
+        if key.lower() == name:
+            return value
+    return MISSING
+
+
+def extract(extractions, response):
+    """Evaluate ``[{"name": "token", "path": "$.data.token"}, ...]`` rules.
+
+    Supported types are ``jsonpath`` (default when ``path`` is set),
+    ``header`` and ``regex`` (over the body, or over ``header`` when given).
+    Returns ``(values, errors)``.
+    """
+
+    values, errors = {}, []
+    body = None
+    for extraction in extractions or []:
+        if not isinstance(extraction, dict):
+            errors.append(f"Extraction rules must be objects, got {extraction!r}")
+            continue
+        name = extraction.get("name")
+        if not name:
+            continue
+        kind = extraction.get("type") or ("jsonpath" if extraction.get("path") else "header")
+        try:
+            if kind == "jsonpath":
+                if body is None:
+                    body = decode_json(response.body)
+                value = resolve(compile_path(extraction.get("path", "$")), body)
+            elif kind == "header":
+                value = _header(response.headers, extraction.get("header") or name)
+            elif kind == "regex":
+                if extraction.get("header"):
+                    source = _header(response.headers, extraction["header"])
+                    source = "" if source is MISSING else source
+                else:
+                    source = response.body.decode("utf-8", errors="replace")
+                match = re.search(extraction.get("pattern", ""), source)
+                value = match.group(extraction.get("group", 1 if match and match.groups() else 0)) if match else MISSING
+            else:
+                errors.append(f"Unsupported extraction type: {kind}")
+                continue
+        except (JSONPathError, re.error, IndexError, TypeError) as exc:
+            errors.append(f"{name}: {exc}")
+            continue
+        if value is MISSING:
+            if "default" in extraction:
+                value = extraction["default"]
+            else:
+                errors.append(f"{name}: no value extracted")
+                continue
+        values[name] = value
+    return values, errors
+
+
+def load_scenarios(scenario_ids):
+    """Fetch scenarios with their full step chain in a fixed number of queries."""
+
+    steps = ScenarioStep.objects.select_related(
+        "interface_case",
+        "interface_case__interface",
+        "interface_case__environment",
+    ).order_by("order")
+    return list(
+        Scenario.objects.filter(pk__in=scenario_ids)
+        .prefetch_related(Prefetch("steps", queryset=steps))
+        .order_by("pk")
+    )
+
+
+def prepare_step(step, context, fallback=None):
+    """Build the request for ``step`` with ``{{ name }}`` placeholders rendered.
+
+    ``context`` is updated in place with the environment's variables (without
+    overriding extracted values) and the step's ``config["variables"]``.
+    Returns ``(prepared, extractions)``.
+    """
+
+    config = step.config or {}
+    case = step.interface_case
+    environment = case.environment or fallback
+    if environment:
+        for name, value in (environment.variables or {}).items():
+            context.setdefault(name, value)
+    context.update(config.get("variables") or {})
+
+    # Without a step override the case's cached template is rendered with the run context.
+    override = config.get("request_payload")
+    payload = {**(case.request_payload or {}), **override} if override else None
+    prepared = prepare_request(case, environment, payload=payload, context=context)
+    return prepared, [*(case.extractions or []), *(config.get("extractions") or [])]
+
+
+def _extractions(step):
+    return [*(step.interface_case.extractions or []), *((step.config or {}).get("extractions") or [])]
+
+
+def _strings(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            yield from _strings(key)
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+def produced_names(step):
+    """Context names ``step`` sets: its ``config["variables"]`` and extractions."""
+
+    names = set((step.config or {}).get("variables") or {})
+    names.update(
+        extraction["name"]
+        for extraction in _extractions(step)
+        if isinstance(extraction, dict) and extraction.get("name")
+    )
+    return names
+
+
+def consumed_names(step, fallback=None):
+    """Root names of the placeholders ``step``'s request renders.
+
+    Returns ``None`` when a placeholder addresses the whole context (``$``).
+    """
+
+    case = step.interface_case
+    environment = case.environment or fallback
+    sources = (
+        case.request_payload,
+        (step.config or {}).get("request_payload"),
+        case.interface.path,
+        case.interface.headers,
+        environment.headers if environment else None,
+    )
+    names = set()
+    for text in _strings(list(sources)):
+        for match in PLACEHOLDER_RE.finditer(text):
+            try:
+                path = compile_path(match.group(1))
+            except JSONPathError:  # left unrendered by the template
+                continue
+            if not path or not isinstance(path[0], str):
+                return None
+            names.add(path[0])
+    return names
+
+
+def step_dependencies(steps, fallback=None, parallel=True):
+    """Return, for each step, the sorted positions of the earlier steps it must wait for."""
+
+    dependencies = []
+    producers = {}
+    positions_by_order = {}
+    for position, step in enumerate(steps):
+        config = step.config or {}
+        consumed = consumed_names(step, fallback) if parallel and not config.get("sequential") else None
+        if consumed is None:
+            required = set(range(position))
+        else:
+            required = {producer for name in consumed for producer in producers.get(name, ())}
+            for order in config.get("depends_on") or []:
+                required.update(positions_by_order.get(order, ()))
+        dependencies.append(sorted(required))
+        for name in produced_names(step):
+            producers.setdefault(name, []).append(position)
+        positions_by_order.setdefault(step.order, []).append(position)
+    return dependencies
+
+
+def _run_step(step, context, fallback, runner):
+    """Send ``step`` with ``context``; return ``(entry, produced values)``."""
+
+    prepared, extractions = prepare_step(step, context, fallback)
+    result, response = runner.perform(prepared)
+    produced = dict((step.config or {}).get("variables") or {})
+    entry = {"step": step.pk, "order": step.order, **result.as_dict(), "extracted": {}}
+    if response is not None:
+        extracted, errors = extract(extractions, response)
+        produced.update(extracted)
+        entry["extracted"] = extracted
+        if errors:
+            result.passed = False
+            entry["passed"] = False
+            entry["error"] = "; ".join(errors)
+    return entry, produced
+
+
+def run_scenario(scenario, runner, fallback=None):
+    """Run the step graph of ``scenario`` and return the outcome as a dict.
+
+    ``ScenarioStep.config`` may provide ``variables`` seeded into the context,
+    a ``request_payload`` merged over the case's payload, extra
+    ``extractions``, ``continue_on_failure``, ``depends_on`` (orders of
+    earlier steps to wait for) and ``sequential``. A failed step (without
+    ``continue_on_failure``) stops every step after it in ``order`` from
+    starting; steps already in flight complete.
+    """
+
+    config = scenario_settings()
+    steps = list(scenario.steps.all())
+    dependencies = step_dependencies(steps, fallback, config["PARALLEL_STEPS"])
+    environments = [step.interface_case.environment or fallback for step in steps]
+
+    # Environment variables visible to each step when running in order: the
+    # first environment defining a name wins, extracted values override them.
+    defaults, seen = [], {}
+    for environment in environments:
+        defaults.append(dict(seen))
+        for name, value in ((environment.variables if environment else None) or {}).items():
+            seen.setdefault(name, value)
+
+    entries, outputs = {}, {}
+    pending = set(range(len(steps)))
+    running = {}
+    stop_after = None
+    passed = True
+    started = time.perf_counter()
+    workers = max(1, min(config["MAX_STEP_WORKERS"], runner.max_workers, len(steps) or 1))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            for position in sorted(pending):
+                if len(running) >= workers or (stop_after is not None and position > stop_after):
+                    break
+                if any(required not in outputs for required in dependencies[position]):
+                    continue
+                context = dict(defaults[position])
+                for required in dependencies[position]:
+                    context.update(outputs[required])
+                pending.discard(position)
+                running[executor.submit(_run_step, steps[position], context, fallback, runner)] = position
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                position = running.pop(future)
+                entry, outputs[position] = future.result()
+                entry["depends_on"] = [steps[required].pk for required in dependencies[position]]
+                entries[position] = entry
+                if not entry["passed"]:
+                    passed = False
+                    if not (steps[position].config or {}).get("continue_on_failure"):
+                        stop_after = position if stop_after is None else min(stop_after, position)
+
+    context = {}
+    for position in sorted(entries):
+        for name, value in ((environments[position].variables if environments[position] else None) or {}).items():
+            context.setdefault(name, value)
+        context.update(outputs[position])
+
+    return {
+        "scenario": scenario.pk,
+        "name": scenario.name,
+        "status": "success" if passed else "failed",
+        "executed_steps": len(entries),
+        "total_steps": len(steps),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+        "variables": context,
+        "steps": [entries[position] for position in sorted(entries)],
+    }
+
+
+def run_scenarios(scenario_ids, runner=None):
+    """Run independent scenarios in parallel; results are ordered by scenario id."""
+
+    scenarios = load_scenarios(scenario_ids)
+    if not scenarios:
+        return []
+    fallback = default_environments({scenario.project_id for scenario in scenarios})
+
+    owns_runner = runner is None
+    runner = runner or SuiteRunner()
+    try:
+        with ThreadPoolExecutor(max_workers=min(runner.max_workers, len(scenarios))) as executor:
+            return list(
+                executor.map(
+                    lambda scenario: run_scenario(scenario, runner, fallback.get(scenario.project_id)),
+                    scenarios,
+                )
+            )
+    finally:
+        if owns_runner:
+            runner.client.close()
@@ -0,0 +1,168 @@
+"""Indexed interface search and path-template matching.
+
+``search_interfaces`` ranks interfaces by name, path, method and
+description through the database's own index instead of a leading-wildcard
+``LIKE``: an FTS5 table with the trigram tokenizer on SQLite (kept in sync
+by triggers, so bulk imports are indexed too) and a ``pg_trgm`` GIN index on
+PostgreSQL. Both match arbitrary substrings, including CJK names; terms
+shorter than three characters cannot use a trigram index and fall back to
+``icontains`` on the already narrowed rows.
+
+``match_path`` finds the templates (``/users/{id}``) that a concrete path
+(``/users/42``) belongs to, using a per-project segment trie.
+"""
+
+import re
+
+from django.db import connections
+from django.db.models import Case, Count, IntegerField, Max, Q, Value, When
+
+from backend.conf import AppSettings
+
+from .lru import VersionedLRU
+from .models import APIInterface
+from .search_index import FTS_TABLE, PG_EXPRESSION
+
+# Ranked rows taken from the full-text index per query and number of projects
+# whose path-template matcher is kept in memory.
+search_settings = AppSettings(
+    "INTERFACE_SEARCH",
+    {
+        "MAX_RESULTS": 1000,
+        "MATCHER_CACHE_SIZE": 256,
+    },
+)
+
+_PARAMETER_RE = re.compile(r"^\{[^{}/]+\}$|^:[^/]+$")
+
+
+def _terms(query):
+    return [term for term in query.split() if term]
+
+
+def _sqlite_ranked_ids(cursor, terms, project_id, limit):
+    match = " AND ".join('"{}"'.format(term.replace('"', '""')) for term in terms)
+    sql = (
+        f"SELECT {FTS_TABLE}.rowid FROM {FTS_TABLE} "
+        f"JOIN interfaces_apiinterface ON interfaces_apiinterface.id = {FTS_TABLE}.rowid "
+        f"WHERE {FTS_TABLE} MATCH %s"
+    )
+    params = [match]
+    if project_id:
+        sql += " AND interfaces_apiinterface.project_id = %s"
+        params.append(project_id)
+    cursor.execute(f"{sql} ORDER BY bm25({FTS_TABLE}, 4.0, 2.0, 1.0, 0.5) LIMIT %s", [*params, limit])
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _postgres_ranked_ids(cursor, terms, project_id, limit):
+    conditions = " AND ".join(f"{PG_EXPRESSION} ILIKE %s" for _ in terms)
+    params = [f"%{term}%" for term in terms]
+    if project_id:
+        conditions += " AND project_id = %s"
+        params.append(project_id)
+    query = " ".join(terms)
+    cursor.execute(
+        f"SELECT id FROM interfaces_apiinterface WHERE {conditions} "
+        f"ORDER BY word_similarity(%s, {PG_EXPRESSION}) DESC, id LIMIT %s",
+        [*params, query, limit],
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def search_interfaces(queryset, query, project_id=None):
+    """Filter ``queryset`` to interfaces matching ``query``, best matches first."""
+
+    terms = _terms(query)
+    if not terms:
+        return queryset
+    indexed = [term for term in terms if len(term) >= 3]
+    short = [term for term in terms if len(term) < 3]
+
+    vendor = connections[queryset.db].vendor
+    if indexed and vendor in ("sqlite", "postgresql"):
+        ranker = _sqlite_ranked_ids if vendor == "sqlite" else _postgres_ranked_ids
+        with connections[queryset.db].cursor() as cursor:
+            ids = ranker(cursor, indexed, project_id, search_settings()["MAX_RESULTS"])
+        queryset = queryset.filter(pk__in=ids)
+        ordering = Case(
+            *[When(pk=pk, then=Value(rank)) for rank, pk in enumerate(ids)],
+            output_field=IntegerField(),
+        )
+        queryset = queryset.order_by(ordering, "pk") if ids else queryset
+    else:
+        short = terms
+    for term in short:
+        queryset = queryset.filter(
+            Q(name__icontains=term) | Q(path__icontains=term) | Q(description__icontains=term) | Q(method__iexact=term)
+        )
+    return queryset
+
+
+# Path templates ---------------------------------------------------------------
+
+
+def _segments(path):
+    return [segment for segment in path.split("?", 1)[0].strip("/").split("/") if segment]
+
+
+def is_parameter(segment):
+    """``{id}`` (OpenAPI) and ``:id`` (Express style) are path parameters."""
+
+    return bool(_PARAMETER_RE.match(segment))
+
+
+class PathMatcher:
+    """Segment trie over path templates; literal segments win over parameters."""
+
+    def __init__(self, templates):
+        self._root = {}
+        for interface_id, method, path in templates:
+            node = self._root
+            for segment in _segments(path):
+                key = None if is_parameter(segment) else segment
+                node = node.setdefault(key, {})
+            node.setdefault("", []).append((interface_id, method))
+
+    def match(self, path, method=None):
+        """Return matching interface ids, most specific template first."""
+
+        segments = _segments(path)
+        found = []
+
+        def walk(node, index, literal):
+            if index == len(segments):
+                for interface_id, template_method in node.get("", []):
+                    if method is None or template_method == method:
+                        found.append((-literal, interface_id))
+                return
+            child = node.get(segments[index])
+            if child is not None:
+                walk(child, index + 1, literal + 1)
+            child = node.get(None)
+            if child is not None:
+                walk(child, index + 1, literal)
+
+        walk(self._root, 0, 0)
+        return [interface_id for _, interface_id in sorted(found)]
+
+
+class MatcherCache(VersionedLRU):
+    """Per-project ``PathMatcher`` rebuilt when the project's interfaces change."""
+
+    def __init__(self, size=None):
+        super().__init__(size or search_settings()["MATCHER_CACHE_SIZE"])
+
+    def get(self, project_id):
+        interfaces = APIInterface.objects.filter(project_id=project_id)
+        version = tuple(interfaces.aggregate(count=Count("id"), latest=Max("updated_at"), top=Max("id")).values())
+        return self.fetch(project_id, version, lambda: PathMatcher(interfaces.values_list("id", "method", "path")))
+
+
+matcher_cache = MatcherCache()
+
+
+def match_path(project_id, path, method=None):
+    """Return ids of ``project_id``'s interfaces whose path template matches ``path``."""
+
+    return matcher_cache.get(project_id).match(path, method.upper() if method else None)
@@ -0,0 +1,96 @@
+"""Database objects behind ``interfaces.search``, shared by the migrations.
+
+SQLite gets an external-content FTS5 table (trigram tokenizer when the
+SQLite build supports it) maintained by triggers, so rows written with
+``bulk_create``/``bulk_update`` are indexed as well. PostgreSQL gets a
+``pg_trgm`` GIN index on the concatenated columns.
+
+SQLite alters a table by copying it into a new one, which drops its
+triggers. Migrations that alter ``interfaces_apiinterface`` should wrap
+their operations in ``around_table_rebuild`` so the index is taken down
+before the rebuild and recreated (and repopulated) afterwards.
+
+This module must not import models: migrations depend on it.
+"""
+
+from django.db import migrations
+from django.db.utils import OperationalError
+
+TABLE = "interfaces_apiinterface"
+FTS_TABLE = f"{TABLE}_fts"
+COLUMNS = "name, path, method, description"
+PG_INDEX = "interface_search_trgm"
+PG_EXPRESSION = "(name || ' ' || path || ' ' || method || ' ' || description)"
+
+
+def _create_fts_table(schema_editor):
+    for tokenizer in ("trigram", "unicode61"):
+        try:
+            with schema_editor.connection.cursor() as cursor:
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5({COLUMNS}, "
+                    f"content='{TABLE}', content_rowid='id', tokenize='{tokenizer}')"
+                )
+            return
+        except OperationalError:
+            if tokenizer == "unicode61":
+                raise
+
+
+def create_sqlite_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    _create_fts_table(schema_editor)
+    new_values = "new.id, new.name, new.path, new.method, new.description"
+    old_values = "old.id, old.name, old.path, old.method, old.description"
+    schema_editor.execute(
+        f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {TABLE} BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, {COLUMNS}) VALUES ({new_values}); END"
+    )
+    schema_editor.execute(
+        f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {TABLE} BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {COLUMNS}) VALUES ('delete', {old_values}); END"
+    )
+    schema_editor.execute(
+        f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF {COLUMNS} ON {TABLE} BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {COLUMNS}) VALUES ('delete', {old_values}); "
+        f"INSERT INTO {FTS_TABLE}(rowid, {COLUMNS}) VALUES ({new_values}); END"
+    )
+    schema_editor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def drop_sqlite_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for suffix in ("ai", "ad", "au"):
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+    schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        create_sqlite_search_index(apps, schema_editor)
+    elif vendor == "postgresql":
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {PG_INDEX} ON {TABLE} USING gin ({PG_EXPRESSION} gin_trgm_ops)"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        drop_sqlite_search_index(apps, schema_editor)
+    elif vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {PG_INDEX}")
+
+
+def around_table_rebuild(*operations):
+    """Return ``operations`` with the SQLite index dropped before and recreated after them."""
+
+    return [
+        migrations.RunPython(drop_sqlite_search_index, create_sqlite_search_index),
+        *operations,
+        migrations.RunPython(create_sqlite_search_index, drop_sqlite_search_index),
+    ]
@@ -1,16 +1,192 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
+from rest_framework.validators import UniqueTogetherValidator
+
+from backend.conf import AppSettings
 
 from .models import (
     APIInterface,
     InterfaceCase,
     Scenario,
     ScenarioStep,
+    TestCaseResult,
     TestReport,
     TestSuite,
 )
+from .loadtest import load_test_settings
+from .results import decode_body
+
+
+class DynamicFieldsMixin:
+    """Restrict a serializer's output with ``fields=[...]`` or ``omit=[...]``."""
+
+    def __init__(self, *args, fields=None, omit=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in omit or ():
+            self.fields.pop(name, None)
+
+
+# /bulk/ write endpoints for cases and scenario steps: items accepted per
+# request and rows per bulk_create/bulk_update statement.
+bulk_settings = AppSettings(
+    "BULK_WRITE",
+    {
+        "MAX_ITEMS": 1000,
+        "BATCH_SIZE": 500,
+    },
+)
+
+# Parked value for integer unique fields while a batch swaps them.
+_PARKING_OFFSET = 2_000_000_000
+
+
+def _key_value(value):
+    """Model instances compare by primary key in ``unique_together`` keys."""
+
+    return value.pk if hasattr(value, "_meta") else value
+
+
+class _PreloadedQueryset:
+    """Stand-in for a related field's queryset that answers ``get(pk=...)`` from one ``in_bulk``."""
+
+    def __init__(self, queryset, ids):
+        self.model = queryset.model
+        keys = set()
+        for pk in ids:
+            try:
+                keys.add(self.model._meta.pk.to_python(pk))
+            except DjangoValidationError:
+                continue
+        self._objects = queryset.in_bulk(keys)
+
+    def get(self, pk):
+        try:
+            key = self.model._meta.pk.to_python(pk)
+        except DjangoValidationError as exc:
+            raise ValueError(pk) from exc
+        try:
+            return self._objects[key]
+        except KeyError:
+            raise self.model.DoesNotExist from None
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """``many=True`` writes with one ``bulk_create`` / ``bulk_update`` per batch.
+
+    For updates ``instance`` maps primary keys to objects and every item
+    carries its ``id``. ``unique_together`` is checked for the batch as a
+    whole (within the payload and against other rows, in one query) instead
+    of per item, so items may swap values, e.g. reorder scenario steps.
+    """
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.child.validators = [
+            validator for validator in self.child.validators if not isinstance(validator, UniqueTogetherValidator)
+        ]
+
+    def to_internal_value(self, data):
+        self._targets = []
+        if isinstance(data, list):
+            self._preload_relations(data)
+        return super().to_internal_value(data)
+
+    def _preload_relations(self, data):
+        """Resolve every primary-key relation of the payload with one query per field."""
+
+        for name, field in self.child.fields.items():
+            if not isinstance(field, serializers.PrimaryKeyRelatedField) or field.read_only:
+                continue
+            ids = {item[name] for item in data if isinstance(item, dict) and isinstance(item.get(name), (int, str))}
+            field.queryset = _PreloadedQueryset(field.get_queryset(), ids)
+
+    def run_child_validation(self, data):
+        target = None
+        if isinstance(self.instance, dict):
+            target = self.instance.get(data.get("id")) if isinstance(data, dict) else None
+            if target is None:
+                raise serializers.ValidationError({"id": ["Missing or unknown id."]})
+            self.child.instance = target
+            self.child.initial_data = data
+        validated = super().run_child_validation(data)
+        self._targets.append(target)
+        return validated
+
+    def validate(self, attrs):
+        model = self.child.Meta.model
+        updated = {target.pk for target in self._targets if target is not None}
+        for fields in model._meta.unique_together:
+            keys = [
+                tuple(
+                    _key_value(item[name] if name in item else getattr(target, name, None))
+                    for name in fields
+                )
+                for item, target in zip(attrs, self._targets)
+            ]
+            if len(set(keys)) != len(keys):
+                raise serializers.ValidationError(f"Items must have unique {', '.join(fields)}.")
+            # Existing keys of the affected parents (first field), compared in Python.
+            existing = model.objects.filter(**{f"{fields[0]}__in": {key[0] for key in keys}}).values_list(
+                "pk", *fields
+            )
+            taken = {tuple(row[1:]) for row in existing if row[0] not in updated}
+            if taken.intersection(keys):
+                raise serializers.ValidationError(f"The {', '.join(fields)} combination already exists.")
+        return attrs
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        return model.objects.bulk_create(
+            [model(**item) for item in validated_data],
+            batch_size=bulk_settings()["BATCH_SIZE"],
+        )
 
-class InterfaceSerializer(serializers.ModelSerializer):
+    def update(self, instance, validated_data):
+        model = self.child.Meta.model
+        batch_size = bulk_settings()["BATCH_SIZE"]
+        targets = self._targets
+        changed = {name for item in validated_data for name in item}
+        if not changed:
+            return targets
+
+        # Integer unique fields are first moved out of the way, so swapping
+        # values between rows never collides halfway through the UPDATE.
+        # Only rows whose item sets such a field are parked; the others keep
+        # their value throughout.
+        parked = [
+            name
+            for fields in model._meta.unique_together
+            for name in fields
+            if name in changed and model._meta.get_field(name).get_internal_type().endswith("IntegerField")
+        ]
+        moving = [
+            target for target, item in zip(targets, validated_data) if any(name in item for name in parked)
+        ]
+        if moving:
+            for index, (target, item) in enumerate(zip(targets, validated_data)):
+                for name in parked:
+                    if name in item:
+                        setattr(target, name, _PARKING_OFFSET + index)
+            model.objects.bulk_update(moving, parked, batch_size=batch_size)
+
+        has_updated_at = any(field.name == "updated_at" for field in model._meta.concrete_fields)
+        now = timezone.now()
+        for target, item in zip(targets, validated_data):
+            for name, value in item.items():
+                setattr(target, name, value)
+            if has_updated_at:
+                target.updated_at = now
+        fields = [*changed, *(["updated_at"] if has_updated_at else [])]
+        model.objects.bulk_update(targets, fields, batch_size=batch_size)
+        return targets
+
+
+class InterfaceSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     project_name = serializers.CharField(source="project.name", read_only=True)
 
     class Meta:
@@ -26,12 +202,30 @@ class InterfaceSerializer(serializers.ModelSerializer):
             "request_params",
             "request_body",
             "headers",
+            "responses",
             "created_at",
             "updated_at",
         ]
 
 
-class InterfaceCaseSerializer(serializers.ModelSerializer):
+def _validate_payload(payload):
+    """A request payload is an object whose ``headers`` and ``params`` are objects too."""
+
+    if not isinstance(payload, dict):
+        raise serializers.ValidationError("Must be an object.")
+    for key in ("headers", "params"):
+        if payload.get(key) is not None and not isinstance(payload[key], dict):
+            raise serializers.ValidationError({key: "Must be an object."})
+    return payload
+
+
+def _validate_extractions(extractions):
+    if not isinstance(extractions, list) or not all(isinstance(item, dict) for item in extractions):
+        raise serializers.ValidationError("Must be a list of objects.")
+    return extractions
+
+
+class InterfaceCaseSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     interface_name = serializers.CharField(source="interface.name", read_only=True)
     project = serializers.PrimaryKeyRelatedField(source="interface.project", read_only=True)
     environment_name = serializers.CharField(source="environment.name", read_only=True)
@@ -54,20 +248,59 @@ class InterfaceCaseSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
+        list_serializer_class = BulkListSerializer
+
+    def validate_request_payload(self, payload):
+        return _validate_payload(payload)
+
+    def validate_extractions(self, extractions):
+        return _validate_extractions(extractions)
 
 
 class ScenarioStepSerializer(serializers.ModelSerializer):
     interface_case_detail = InterfaceCaseSerializer(source="interface_case", read_only=True)
-    interface_case = serializers.PrimaryKeyRelatedField(queryset=InterfaceCase.objects.all())
+    # ``interface_case_detail`` reads both relations; bulk writes preload them with the cases.
+    interface_case = serializers.PrimaryKeyRelatedField(
+        queryset=InterfaceCase.objects.select_related("interface", "environment")
+    )
 
     class Meta:
         model = ScenarioStep
         fields = ["id", "scenario", "interface_case", "interface_case_detail", "order", "config"]
         read_only_fields = ["interface_case_detail"]
+        list_serializer_class = BulkListSerializer
+
+    def validate_config(self, config):
+        """Reject step overrides the scenario runner cannot apply."""
+
+        if not isinstance(config, dict):
+            raise serializers.ValidationError("Must be an object.")
+        errors = {}
+        if config.get("variables") is not None and not isinstance(config["variables"], dict):
+            errors["variables"] = "Must be an object."
+        for key, validate in (("extractions", _validate_extractions), ("request_payload", _validate_payload)):
+            if config.get(key) is not None:
+                try:
+                    validate(config[key])
+                except serializers.ValidationError as exc:
+                    errors[key] = exc.detail
+        if errors:
+            raise serializers.ValidationError(errors)
+        return config
+
+
+class NestedScenarioStepSerializer(ScenarioStepSerializer):
+    """Steps written through their scenario: ``scenario`` is implied and ``order`` defaults to the position."""
+
+    order = serializers.IntegerField(required=False, min_value=1)
+
+    class Meta(ScenarioStepSerializer.Meta):
+        read_only_fields = ["scenario", "interface_case_detail"]
+        list_serializer_class = serializers.ListSerializer
 
 
 class ScenarioSerializer(serializers.ModelSerializer):
-    steps = ScenarioStepSerializer(many=True, required=False)
+    steps = NestedScenarioStepSerializer(many=True, required=False)
     project_name = serializers.CharField(source="project.name", read_only=True)
 
     class Meta:
@@ -83,28 +316,53 @@ class ScenarioSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
 
+    def validate_steps(self, steps):
+        orders = [step.get("order") or index for index, step in enumerate(steps, start=1)]
+        if len(set(orders)) != len(orders):
+            raise serializers.ValidationError("Step orders must be unique.")
+        return steps
+
+    @transaction.atomic
     def create(self, validated_data):
         steps_data = validated_data.pop("steps", [])
         scenario = super().create(validated_data)
-        self._sync_steps(scenario, steps_data)
+        self._sync_steps(scenario, steps_data, existing=False)
         return scenario
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         steps_data = validated_data.pop("steps", None)
         scenario = super().update(instance, validated_data)
         if steps_data is not None:
-            scenario.steps.all().delete()
             self._sync_steps(scenario, steps_data)
         return scenario
 
-    def _sync_steps(self, scenario, steps_data):
-        for index, step in enumerate(steps_data, start=1):
-            ScenarioStep.objects.create(
-                scenario=scenario,
-                interface_case=step["interface_case"],
-                order=step.get("order") or index,
-                config=step.get("config", {}),
-            )
+    def _sync_steps(self, scenario, steps_data, existing=True):
+        """Diff ``steps_data`` against the stored steps by ``order``.
+
+        Steps at an unchanged position are updated in place (only when their
+        case or config changed), new positions are bulk-created and vanished
+        positions deleted, so step ids stay stable across edits.
+        """
+
+        current = {step.order: step for step in scenario.steps.all()} if existing else {}
+        to_create, to_update = [], []
+        for index, data in enumerate(steps_data, start=1):
+            order = data.get("order") or index
+            config = data.get("config", {})
+            step = current.pop(order, None)
+            if step is None:
+                to_create.append(
+                    ScenarioStep(scenario=scenario, interface_case=data["interface_case"], order=order, config=config)
+                )
+            elif step.interface_case_id != data["interface_case"].pk or step.config != config:
+                step.interface_case = data["interface_case"]
+                step.config = config
+                to_update.append(step)
+        if current:
+            ScenarioStep.objects.filter(pk__in=[step.pk for step in current.values()]).delete()
+        ScenarioStep.objects.bulk_update(to_update, ["interface_case", "config"])
+        ScenarioStep.objects.bulk_create(to_create)
 
 
 class TestSuiteSerializer(serializers.ModelSerializer):
@@ -115,7 +373,6 @@ class TestSuiteSerializer(serializers.ModelSerializer):
         required=False,
         source="cases",
     )
-    case_count = serializers.SerializerMethodField()
 
     class Meta:
         model = TestSuite
@@ -130,9 +387,7 @@ class TestSuiteSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
-
-    def get_case_count(self, obj):
-        return obj.cases.count()
+        read_only_fields = ["case_count"]
 
     def create(self, validated_data):
         cases = validated_data.pop("cases", [])
@@ -149,9 +404,10 @@ class TestSuiteSerializer(serializers.ModelSerializer):
         return suite
 
 
-class TestReportSerializer(serializers.ModelSerializer):
-    suite_name = serializers.CharField(source="suite.name", read_only=True)
-    project = serializers.PrimaryKeyRelatedField(source="suite.project", read_only=True)
+class TestReportSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    suite_name = serializers.CharField(source="suite.name", read_only=True, default=None)
+    scenario_name = serializers.CharField(source="scenario.name", read_only=True, default=None)
+    project = serializers.SerializerMethodField()
 
     class Meta:
         model = TestReport
@@ -159,10 +415,78 @@ class TestReportSerializer(serializers.ModelSerializer):
             "id",
             "suite",
             "suite_name",
+            "scenario",
+            "scenario_name",
             "project",
+            "kind",
             "status",
             "summary",
             "details",
             "created_at",
         ]
-        read_only_fields = ["status", "summary", "details", "created_at"]
+        read_only_fields = ["kind", "status", "summary", "details", "created_at"]
+
+    def get_project(self, obj):
+        target = obj.suite or obj.scenario
+        return target.project_id if target else None
+
+
+class LoadTestConfigSerializer(serializers.Serializer):
+    """Request body of the ``load-test`` actions: exactly one of ``rps`` / ``concurrency``."""
+
+    rps = serializers.FloatField(required=False, min_value=0.1)
+    concurrency = serializers.IntegerField(required=False, min_value=1)
+    duration = serializers.FloatField(min_value=1)
+    max_error_rate = serializers.FloatField(required=False, default=0, min_value=0, max_value=1)
+    assertions = serializers.BooleanField(required=False, default=True)
+
+    def validate(self, attrs):
+        config = load_test_settings()
+        if ("rps" in attrs) == ("concurrency" in attrs):
+            raise serializers.ValidationError("Provide exactly one of rps or concurrency.")
+        if attrs["duration"] > config["MAX_DURATION"]:
+            raise serializers.ValidationError({"duration": f"At most {config['MAX_DURATION']} seconds."})
+        if attrs.get("rps", 0) > config["MAX_RPS"]:
+            raise serializers.ValidationError({"rps": f"At most {config['MAX_RPS']}."})
+        if attrs.get("concurrency", 0) > config["MAX_CONCURRENCY"]:
+            raise serializers.ValidationError({"concurrency": f"At most {config['MAX_CONCURRENCY']}."})
+        return attrs
+
+
+class TestCaseResultSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    response_body = serializers.SerializerMethodField()
+    response_truncated = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TestCaseResult
+        fields = [
+            "id",
+            "report",
+            "case",
+            "name",
+            "method",
+            "url",
+            "status_code",
+            "latency_ms",
+            "passed",
+            "assertions",
+            "error",
+            "response_size",
+            "response_body",
+            "response_truncated",
+            "created_at",
+        ]
+
+    def _body(self, obj):
+        try:
+            return obj.body
+        except TestCaseResult.body.RelatedObjectDoesNotExist:
+            return None
+
+    def get_response_body(self, obj):
+        stored = self._body(obj)
+        return decode_body(stored).decode("utf-8", errors="replace") if stored else None
+
+    def get_response_truncated(self, obj):
+        stored = self._body(obj)
+        return bool(stored and stored.truncated)
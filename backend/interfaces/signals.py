@@ -0,0 +1,57 @@
+"""Keep ``TestSuite.case_count`` in sync with suite membership."""
+
+from django.db.models import Count, OuterRef, PositiveIntegerField, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import m2m_changed, post_delete, pre_delete
+from django.dispatch import receiver
+
+from .models import InterfaceCase, TestSuite
+
+SuiteCases = TestSuite.cases.through
+
+
+def refresh_case_counts(suite_ids=None):
+    """Recompute ``TestSuite.case_count`` for ``suite_ids`` (all suites when ``None``)."""
+
+    memberships = (
+        SuiteCases.objects.filter(testsuite_id=OuterRef("pk"))
+        .order_by()
+        .values("testsuite_id")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    suites = TestSuite.objects.all()
+    if suite_ids is not None:
+        suites = suites.filter(pk__in=suite_ids)
+    return suites.update(case_count=Coalesce(Subquery(memberships, output_field=PositiveIntegerField()), 0))
+
+
+@receiver(m2m_changed, sender=SuiteCases)
+def suite_cases_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear" and reverse:
+        # case.test_suites.clear(): remember the suites before the rows go away.
+        instance._cleared_suite_ids = list(instance.test_suites.values_list("pk", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        instance.case_count = SuiteCases.objects.filter(testsuite_id=instance.pk).count()
+        TestSuite.objects.filter(pk=instance.pk).update(case_count=instance.case_count)
+    elif action == "post_clear":
+        refresh_case_counts(getattr(instance, "_cleared_suite_ids", []))
+    elif pk_set:
+        refresh_case_counts(pk_set)
+
+
+@receiver(pre_delete, sender=InterfaceCase)
+def remember_case_suites(sender, instance, **kwargs):
+    # Cascading deletes of the through rows do not send m2m_changed.
+    instance._suite_ids = list(
+        SuiteCases.objects.filter(interfacecase_id=instance.pk).values_list("testsuite_id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=InterfaceCase)
+def case_deleted(sender, instance, **kwargs):
+    if getattr(instance, "_suite_ids", None):
+        refresh_case_counts(instance._suite_ids)
@@ -0,0 +1,194 @@
+"""Server-Sent Events stream of a report's progress.
+
+``GET /api/test-reports/{id}/stream/`` is an async view: under ASGI it holds
+no worker thread while waiting. Under WSGI (``runserver``, gunicorn sync
+workers) Django would collect an async iterator before sending anything, so
+the view hands WSGI requests a blocking generator instead; each open stream
+then occupies one worker. Runs may execute in other processes, so the
+stream follows the database: it polls ``TestCaseResult`` rows past the last
+sent id (an indexed range scan) and pushes each one as a ``result`` event,
+followed by ``status`` events and a final ``end`` event carrying the report's
+aggregate ``details``. Clients that reconnect with ``Last-Event-ID`` resume
+after the last result they received.
+
+Ids are not committed in order: concurrent shard writers (on PostgreSQL)
+can commit a lower id after a higher one was sent. Each poll therefore also
+compares the count and id sum of the rows up to the cursor with the ids
+already sent, and sends late rows when they differ. When rows that were
+sent are gone (a retried shard deletes its earlier results) the stream
+sends a ``reset`` event with id 0 and starts over; clients drop the
+results they have.
+"""
+
+import asyncio
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Count, Sum
+from django.http import Http404, StreamingHttpResponse
+
+from backend.conf import AppSettings
+
+from .models import TestCaseResult, TestReport
+from .serializers import TestCaseResultSerializer
+
+# Seconds between polls, seconds between keep-alive comments, rows per poll.
+stream_settings = AppSettings(
+    "RUN_STREAM",
+    {
+        "POLL_INTERVAL": 0.5,
+        "HEARTBEAT": 15,
+        "BATCH_SIZE": 200,
+    },
+)
+
+FINAL_STATUSES = ("success", "failed")
+
+
+def sse_event(event, data, event_id=None):
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'), default=str)}")
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+def _report_state(report_id):
+    return TestReport.objects.filter(pk=report_id).values("status", "summary").first()
+
+
+def _serialize(rows):
+    return TestCaseResultSerializer(rows, many=True, omit=("response_body", "response_truncated")).data
+
+
+def _results_after(report_id, last_id, limit):
+    return _serialize(TestCaseResult.objects.filter(report_id=report_id, id__gt=last_id).order_by("id")[:limit])
+
+
+def _results_through(report_id, last_id):
+    return TestCaseResult.objects.filter(report_id=report_id, id__lte=last_id)
+
+
+def _details(report_id):
+    return TestReport.objects.values_list("details", flat=True).get(pk=report_id)
+
+
+class ReportPoller:
+    """Stream state of one report; ``poll()`` returns the next events and how long to wait."""
+
+    def __init__(self, report_id, last_id=0, poll_interval=None, heartbeat=None, batch_size=None):
+        config = stream_settings()
+        self.report_id = report_id
+        self.last_id = last_id
+        self.poll_interval = poll_interval or config["POLL_INTERVAL"]
+        self.heartbeat = heartbeat or config["HEARTBEAT"]
+        self.batch_size = batch_size or config["BATCH_SIZE"]
+        self.status = None
+        self.last_sent = time.monotonic()
+        # Ids sent so far (up to ``last_id``); loaded on the first poll when resuming.
+        self._sent = None
+        self._sent_sum = 0
+        self._more_late = False
+
+    def _remember(self, ids):
+        self._sent.update(ids)
+        self._sent_sum += sum(ids)
+
+    def _reconcile(self):
+        """Return events for rows at or below the cursor that changed since they were sent."""
+
+        self._more_late = False
+        rows = _results_through(self.report_id, self.last_id)
+        if self._sent is None:
+            self._sent = set()
+            if self.last_id:
+                self._remember(set(rows.values_list("id", flat=True)))
+            return []
+        if not self.last_id:
+            return []
+        totals = rows.aggregate(count=Count("id"), total=Sum("id"))
+        if (totals["count"], totals["total"] or 0) == (len(self._sent), self._sent_sum):
+            return []
+        current = set(rows.values_list("id", flat=True))
+        if self._sent - current:
+            self.last_id = 0
+            self._sent, self._sent_sum = set(), 0
+            return [sse_event("reset", {"reason": "Results were rewritten; start over."}, event_id=0)]
+        late = sorted(current - self._sent)
+        self._more_late = len(late) > self.batch_size
+        late = late[: self.batch_size]
+        self._remember(late)
+        return [
+            sse_event("result", result, event_id=self.last_id)
+            for result in _serialize(TestCaseResult.objects.filter(pk__in=late).order_by("id"))
+        ]
+
+    def poll(self):
+        """Return ``(events, delay)``; ``delay`` is ``None`` once the stream is over."""
+
+        # Read the status before the results so nothing written in between is missed.
+        state = _report_state(self.report_id)
+        if state is None:
+            return [], None
+        events = self._reconcile()
+        results = _results_after(self.report_id, self.last_id, self.batch_size)
+        for result in results:
+            self.last_id = result["id"]
+            events.append(sse_event("result", result, event_id=self.last_id))
+        self._remember([result["id"] for result in results])
+        if state["status"] != self.status:
+            self.status = state["status"]
+            events.append(sse_event("status", state))
+        if events:
+            self.last_sent = time.monotonic()
+            if len(results) == self.batch_size or self._more_late:
+                return events, 0
+        if self.status in FINAL_STATUSES:
+            events.append(sse_event("end", {"status": self.status, "details": _details(self.report_id)}))
+            return events, None
+        if time.monotonic() - self.last_sent >= self.heartbeat:
+            self.last_sent = time.monotonic()
+            events.append(b": keep-alive\n\n")
+        return events, self.poll_interval
+
+
+async def report_events(report_id, last_id=0, **options):
+    poller = ReportPoller(report_id, last_id, **options)
+    while True:
+        events, delay = await sync_to_async(poller.poll)()
+        for event in events:
+            yield event
+        if delay is None:
+            return
+        if delay:
+            await asyncio.sleep(delay)
+
+
+def report_events_sync(report_id, last_id=0, **options):
+    """Blocking variant of ``report_events`` for WSGI servers."""
+
+    poller = ReportPoller(report_id, last_id, **options)
+    while True:
+        events, delay = poller.poll()
+        yield from events
+        if delay is None:
+            return
+        if delay:
+            time.sleep(delay)
+
+
+async def report_stream(request, pk):
+    exists = await sync_to_async(TestReport.objects.filter(pk=pk).exists)()
+    if not exists:
+        raise Http404("Report not found.")
+    try:
+        last_id = int(request.headers.get("Last-Event-ID") or request.GET.get("after") or 0)
+    except ValueError:
+        last_id = 0
+    events = report_events if isinstance(request, ASGIRequest) else report_events_sync
+    response = StreamingHttpResponse(events(pk, last_id), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
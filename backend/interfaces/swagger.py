@@ -0,0 +1,177 @@
+"""Bulk import of Swagger/OpenAPI operations into ``APIInterface`` rows.
+
+Re-imports are incremental. The SHA-256 of the whole spec is stored on the
+project, so importing an identical spec again is a no-op, and every imported
+row stores a hash of its operation: existing ``(method, path, hash)`` keys
+are loaded in a single query and only operations whose hash changed are
+written. Operations are consumed in batches as the spec is parsed (see
+``openapi.stream_operations``) and written with ``bulk_create`` and
+``bulk_update``. With ``prune``, interfaces missing from the spec are deleted.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from projects.caching import bump_generation
+
+from .models import HTTP_METHODS, APIInterface
+from .openapi import RefResolver, SpecError, digest_stream, stream_operations
+
+OPERATION_METHODS = {method.lower() for method, _ in HTTP_METHODS}
+
+# Columns derived from the spec; their hash decides whether a row changed.
+IMPORTED_FIELDS = ("name", "description", "request_params", "request_body", "headers", "responses")
+
+DEFAULT_BATCH_SIZE = 500
+
+
+@dataclass
+class ImportResult:
+    created: list = field(default_factory=list)
+    updated: list = field(default_factory=list)
+    unchanged: list = field(default_factory=list)
+    deleted: int = 0
+    skipped: bool = False
+
+    def as_dict(self):
+        # "created"/"count" keep their original meaning: every interface in the spec.
+        interfaces = [*self.created, *self.updated, *self.unchanged]
+        return {
+            "created": interfaces,
+            "count": len(interfaces),
+            "new": len(self.created),
+            "updated": len(self.updated),
+            "unchanged": len(self.unchanged),
+            "deleted": self.deleted,
+            "skipped": self.skipped,
+        }
+
+
+def content_hash(values):
+    try:
+        encoded = json.dumps(values, sort_keys=True, separators=(",", ":"), default=str)
+    except TypeError:  # mixed key types (e.g. YAML status codes) cannot be sorted
+        encoded = json.dumps(values, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def iter_operations(spec):
+    """Yield ``(path, method, operation)`` for every HTTP operation in an already parsed ``spec``."""
+
+    resolver = RefResolver(spec)
+    for path, operations in (spec.get("paths") or {}).items():
+        if not isinstance(operations, dict):
+            continue
+        for method, payload in operations.items():
+            if method.lower() in OPERATION_METHODS and isinstance(payload, dict):
+                yield path, method.upper(), resolver.resolve(payload)
+
+
+def operation_values(path, method, payload):
+    return {
+        "name": payload.get("summary") or f"{method} {path}",
+        "description": payload.get("description") or "",
+        "request_params": payload.get("parameters") or {},
+        "request_body": payload.get("requestBody") or {},
+        "headers": payload.get("headers") or {},
+        "responses": {str(status): response for status, response in (payload.get("responses") or {}).items()},
+    }
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _apply_batch(project, batch, existing, result, batch_size):
+    incoming = {}
+    for path, method, payload in batch:
+        values = operation_values(path, method, payload)
+        incoming[(method, path)] = (values, content_hash(values))
+
+    to_create, to_update = [], []
+    now = timezone.now()
+    for (method, path), (values, digest) in incoming.items():
+        pk, stored_digest = existing.get((method, path), (None, None))
+        if pk is None:
+            to_create.append(APIInterface(project=project, method=method, path=path, content_hash=digest, **values))
+        elif stored_digest == digest:
+            result.unchanged.append(pk)
+        else:
+            to_update.append(APIInterface(pk=pk, content_hash=digest, updated_at=now, **values))
+            existing[(method, path)] = (pk, digest)
+
+    created = APIInterface.objects.bulk_create(to_create, batch_size=batch_size)
+    APIInterface.objects.bulk_update(
+        to_update,
+        [*IMPORTED_FIELDS, "content_hash", "updated_at"],
+        batch_size=batch_size,
+    )
+    for interface in created:
+        existing[(interface.method, interface.path)] = (interface.pk, interface.content_hash)
+        result.created.append(interface.pk)
+    result.updated.extend(interface.pk for interface in to_update)
+    return incoming.keys()
+
+
+def import_operations(project, operations, batch_size=None, prune=False, spec_hash=None):
+    """Create or update ``project``'s interfaces from ``(path, method, operation)`` triples.
+
+    ``operations`` may be a lazy iterator; it is consumed ``batch_size``
+    operations at a time inside one transaction. When ``spec_hash`` matches
+    the project's last import (and nothing is to be pruned) nothing is read
+    or written.
+    """
+
+    result = ImportResult()
+    if spec_hash and spec_hash == project.spec_hash and not prune:
+        result.skipped = True
+        result.unchanged = list(APIInterface.objects.filter(project=project).values_list("pk", flat=True))
+        return result
+
+    batch_size = batch_size or getattr(settings, "SWAGGER_IMPORT_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+    seen = set()
+    with transaction.atomic():
+        existing = {
+            (method, path): (pk, digest)
+            for pk, method, path, digest in APIInterface.objects.filter(project=project).values_list(
+                "pk", "method", "path", "content_hash"
+            )
+        }
+        for batch in _batches(operations, batch_size):
+            seen.update(_apply_batch(project, batch, existing, result, batch_size))
+        if prune:
+            stale = [pk for key, (pk, _) in existing.items() if key not in seen]
+            for start in range(0, len(stale), batch_size):
+                APIInterface.objects.filter(pk__in=stale[start : start + batch_size]).delete()
+            result.deleted = len(stale)
+        if spec_hash:
+            project.spec_hash = spec_hash
+            project.save(update_fields=["spec_hash"])
+    # bulk_create/bulk_update send no model signals.
+    bump_generation(project.pk)
+    return result
+
+
+def import_spec(project, spec, batch_size=None, prune=False):
+    if not isinstance(spec.get("paths"), dict):
+        raise SpecError("The spec has no 'paths' section.")
+    digest = content_hash(spec)
+    return import_operations(project, iter_operations(spec), batch_size=batch_size, prune=prune, spec_hash=digest)
+
+
+def import_stream(project, stream, name="", batch_size=None, prune=False):
+    """Import a JSON or YAML spec from a seekable binary ``stream`` without loading it whole."""
+
+    digest = digest_stream(stream)
+    if digest == project.spec_hash and not prune:
+        return import_operations(project, (), spec_hash=digest)
+    operations = stream_operations(stream, name=name, methods=OPERATION_METHODS)
+    return import_operations(project, operations, batch_size=batch_size, prune=prune, spec_hash=digest)
@@ -0,0 +1,191 @@
+"""Compiled ``{{ name }}`` templates for request payloads.
+
+``compile_template`` turns a nested JSON value into a render function once:
+placeholder names are parsed into JSONPath steps up front, mixed strings are
+split into literal and variable parts, and subtrees without placeholders are
+returned as-is instead of being copied, so rendering a large, mostly static
+payload only rebuilds the containers on the path to a placeholder.
+
+``RequestTemplate`` compiles everything a case sends against an
+environment — path, query parameters, merged headers and body — with the
+environment's ``variables`` as the render context. Templates are cached per
+(case, environment) pair and invalidated when the case, its interface or the
+environment is updated.
+"""
+
+import json
+import re
+
+from django.conf import settings
+
+from .jsonpath import JSONPathError, MISSING, compile_path, resolve
+from .lru import VersionedLRU
+
+PLACEHOLDER_RE = re.compile(r"\{\{\s*([^{}\s]+)\s*\}\}")
+
+DEFAULT_CACHE_SIZE = 4096
+
+
+def _variable(name):
+    try:
+        path = compile_path(name)
+    except JSONPathError:
+        return None
+
+    def value(context):
+        try:
+            return resolve(path, context)
+        except JSONPathError:
+            return MISSING
+
+    return value
+
+
+def _compile_string(value):
+    if "{{" not in value:
+        return None
+    whole = PLACEHOLDER_RE.fullmatch(value.strip())
+    if whole:
+        variable = _variable(whole.group(1))
+        if variable is None:
+            return None
+
+        def render_variable(context):
+            resolved = variable(context)
+            return value if resolved is MISSING else resolved
+
+        return render_variable
+
+    parts = []
+    position = 0
+    for match in PLACEHOLDER_RE.finditer(value):
+        if match.start() > position:
+            parts.append((value[position : match.start()], None))
+        parts.append((match.group(0), _variable(match.group(1))))
+        position = match.end()
+    if position < len(value):
+        parts.append((value[position:], None))
+    if all(variable is None for _, variable in parts):
+        return None
+
+    def render_string(context):
+        chunks = []
+        for text, variable in parts:
+            resolved = MISSING if variable is None else variable(context)
+            chunks.append(text if resolved is MISSING else str(resolved))
+        return "".join(chunks)
+
+    return render_string
+
+
+def _compile(value):
+    """Return a render function for ``value``, or ``None`` when it is constant."""
+
+    if isinstance(value, str):
+        return _compile_string(value)
+    if isinstance(value, dict):
+        items = [(key, _compile(key), item, _compile(item)) for key, item in value.items()]
+        if all(key_fn is None and item_fn is None for _, key_fn, _, item_fn in items):
+            return None
+
+        def render_dict(context):
+            return {
+                (key_fn(context) if key_fn else key): (item_fn(context) if item_fn else item)
+                for key, key_fn, item, item_fn in items
+            }
+
+        return render_dict
+    if isinstance(value, list):
+        items = [(item, _compile(item)) for item in value]
+        if all(item_fn is None for _, item_fn in items):
+            return None
+
+        def render_list(context):
+            return [item_fn(context) if item_fn else item for item, item_fn in items]
+
+        return render_list
+    return None
+
+
+def compile_template(value):
+    """Compile nested JSON ``value`` into ``render(context)``.
+
+    A string consisting of a single placeholder is replaced by the raw
+    variable, keeping its JSON type; unknown variables are left untouched.
+    Constant subtrees are shared between renders and must not be mutated.
+    """
+
+    render = _compile(value)
+    return render if render is not None else (lambda context: value)
+
+
+def encode_body(body):
+    if body is None or body == {} or body == "":
+        return None
+    if isinstance(body, (bytes, bytearray)):
+        return bytes(body)
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    return json.dumps(body).encode("utf-8")
+
+
+class RequestTemplate:
+    """Everything a case sends against one environment, compiled once."""
+
+    def __init__(self, case, environment=None, payload=None):
+        interface = case.interface
+        payload = (case.request_payload if payload is None else payload) or {}
+        self.variables = (environment.variables if environment else None) or {}
+        self.method = (payload.get("method") or interface.method or "GET").upper()
+        self.path = compile_template(payload.get("path") or interface.path)
+        self.params = compile_template(payload.get("params") or {})
+
+        headers = {
+            **((environment.headers if environment else None) or {}),
+            **(interface.headers or {}),
+            **(payload.get("headers") or {}),
+        }
+        body = payload.get("body", payload.get("json"))
+        if encode_body(body) is not None and not any(key.lower() == "content-type" for key in headers):
+            headers["Content-Type"] = "application/json"
+        self.headers = compile_template(headers)
+        self._body = _compile(body)
+        # A body without placeholders is encoded once and reused by every render.
+        self._static_body = encode_body(body) if self._body is None else None
+
+    def render(self, context=None):
+        """Return ``(method, path, params, headers, body_bytes)``.
+
+        ``context`` is layered over the environment's variables.
+        """
+
+        context = {**self.variables, **context} if context else self.variables
+        body = self._static_body if self._body is None else encode_body(self._body(context))
+        return self.method, self.path(context), self.params(context), self.headers(context), body
+
+
+class TemplateCache(VersionedLRU):
+    """``RequestTemplate`` keyed by (case, environment) and invalidated on ``updated_at``."""
+
+    def __init__(self, size=None):
+        super().__init__(size or getattr(settings, "TEMPLATE_CACHE_SIZE", DEFAULT_CACHE_SIZE))
+
+    def get(self, case, environment=None):
+        if case.pk is None:
+            return RequestTemplate(case, environment)
+        key = (case.pk, environment.pk if environment else None)
+        version = (
+            case.updated_at,
+            case.interface.updated_at,
+            environment.updated_at if environment else None,
+        )
+        return self.fetch(key, version, lambda: RequestTemplate(case, environment))
+
+
+template_cache = TemplateCache()
+
+
+def request_template(case, environment=None):
+    """Return the cached template for ``case``'s current payload against ``environment``."""
+
+    return template_cache.get(case, environment)
@@ -1,3 +1,1372 @@
-from django.test import TestCase
+import json
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from environments.models import Environment
+from projects.models import Project
+
+from .assertions import AssertionCache, CompiledAssertions
+from .benchmark import compare, run_benchmarks
+from .models import (
+    APIInterface,
+    InterfaceCase,
+    ResponseBody,
+    RunJob,
+    Scenario,
+    ScenarioStep,
+    TestCaseResult,
+    TestReport,
+    TestSuite,
+)
+from .http_client import HTTPResponse
+from .loadtest import LatencyHistogram, run_load_test
+from .lru import VersionedLRU
+from .mock import MockRoutes, MockServer, MockServerThread, example_from_schema
+from .openapi import as_stream, stream_operations
+from .queue import JobHeartbeat, RunWorkerPool, claim_next_job, process_job, requeue_stale_jobs
+from .results import decode_body
+from .runner import SuiteRunner, prepare_request, run_suite
+from .scenarios import extract, run_scenarios, step_dependencies
+from .search import PathMatcher
+from .streams import ReportPoller, report_events
+from .swagger import content_hash, import_spec
+from .templates import compile_template, template_cache
+
+
+class TestSuiteCaseCountTests(APITestCase):
+    def setUp(self):
+        self.project = Project.objects.create(name="demo")
+        interface = APIInterface.objects.create(project=self.project, name="ping", path="/ping")
+        self.cases = [InterfaceCase.objects.create(interface=interface, name=f"case-{index}") for index in range(3)]
+
+    def _count(self, suite):
+        return TestSuite.objects.values_list("case_count", flat=True).get(pk=suite.pk)
+
+    def test_membership_changes_update_count(self):
+        suite = TestSuite.objects.create(project=self.project, name="smoke")
+
+        suite.cases.add(*self.cases)
+        self.assertEqual((suite.case_count, self._count(suite)), (3, 3))
+
+        suite.cases.remove(self.cases[0])
+        self.assertEqual(self._count(suite), 2)
+
+        self.cases[1].test_suites.remove(suite)
+        self.assertEqual(self._count(suite), 1)
+
+        self.cases[2].test_suites.clear()
+        self.assertEqual(self._count(suite), 0)
+
+    def test_deleting_a_case_updates_count(self):
+        suite = TestSuite.objects.create(project=self.project, name="smoke")
+        suite.cases.set(self.cases)
+
+        self.cases[0].delete()
+
+        self.assertEqual(self._count(suite), 2)
+
+    def test_serializer_create_and_update(self):
+        response = self.client.post(
+            "/api/test-suites/",
+            {"project": self.project.pk, "name": "api", "case_ids": [case.pk for case in self.cases[:2]]},
+            format="json",
+        )
+        self.assertEqual(response.data["case_count"], 2)
+
+        response = self.client.patch(
+            f"/api/test-suites/{response.data['id']}/",
+            {"case_ids": [self.cases[0].pk]},
+            format="json",
+        )
+        self.assertEqual(response.data["case_count"], 1)
+
+    def test_list_has_no_per_row_queries(self):
+        for index in range(2):
+            TestSuite.objects.create(project=self.project, name=f"few-{index}").cases.set(self.cases)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get("/api/test-suites/")
+
+        for index in range(10):
+            TestSuite.objects.create(project=self.project, name=f"many-{index}").cases.set(self.cases)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get("/api/test-suites/")
+
+        self.assertEqual(len(few), len(many))
+        self.assertEqual({item["case_count"] for item in response.data["results"]}, {3})
+
+    def test_recount_command(self):
+        suite = TestSuite.objects.create(project=self.project, name="smoke")
+        suite.cases.set(self.cases)
+        TestSuite.objects.filter(pk=suite.pk).update(case_count=0)
+
+        call_command("recount_suite_cases", stdout=StringIO())
+
+        self.assertEqual(self._count(suite), 3)
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        project = Project.objects.create(name="demo")
+        interface = APIInterface.objects.create(project=project, name="ping", path="/ping")
+        suite = TestSuite.objects.create(project=project, name="smoke")
+        # Duplicate names and timestamps exercise the id tie-breaker.
+        for index in range(7):
+            InterfaceCase.objects.create(interface=interface, name=f"case-{index // 2}")
+        reports = [TestReport.objects.create(suite=suite, status="success") for _ in range(7)]
+        TestReport.objects.filter(pk__in=[report.pk for report in reports[:4]]).update(created_at=reports[0].created_at)
+
+    def _walk(self, url):
+        ids, pages = [], []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("count", response.data)
+            pages.append((response.data, len(queries)))
+            ids.extend(item["id"] for item in response.data["results"])
+            url = response.data["next"]
+        return ids, pages
+
+    def test_reports_are_paged_by_created_at_and_id(self):
+        ids, pages = self._walk("/api/test-reports/?page_size=3")
+
+        expected = list(TestReport.objects.order_by("-created_at", "-id").values_list("pk", flat=True))
+        self.assertEqual(ids, expected)
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(len({queries for _, queries in pages}), 1)
+
+    def test_cases_are_paged_by_name_and_id_in_both_directions(self):
+        ids, pages = self._walk("/api/interface-cases/?page_size=2")
+
+        expected = list(InterfaceCase.objects.order_by("name", "id").values_list("pk", flat=True))
+        self.assertEqual(ids, expected)
+
+        last_page = pages[-1][0]
+        previous = self.client.get(last_page["previous"]).data
+        self.assertEqual([item["id"] for item in previous["results"]], expected[4:6])
+        self.assertIsNotNone(previous["previous"])
+        self.assertEqual([item["id"] for item in self.client.get(previous["next"]).data["results"]], expected[6:])
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/test-reports/?cursor=bogus")
+
+        self.assertEqual(response.status_code, 404)
+
+
+class FieldSelectionTests(APITestCase):
+    def setUp(self):
+        project = Project.objects.create(name="demo")
+        interface = APIInterface.objects.create(project=project, name="ping", path="/ping", request_body={"big": "x"})
+        self.case = InterfaceCase.objects.create(interface=interface, name="case", assertions=[{"expected": 200}])
+        suite = TestSuite.objects.create(project=project, name="smoke")
+        self.report = TestReport.objects.create(suite=suite, status="success", details={"results": ["x" * 100]})
+
+    def test_report_list_is_summary_and_retrieve_is_full(self):
+        with CaptureQueriesContext(connection) as queries:
+            listing = self.client.get("/api/test-reports/").data["results"][0]
+        detail = self.client.get(f"/api/test-reports/{self.report.pk}/").data
+
+        self.assertNotIn("details", listing)
+        self.assertNotIn('"details"', " ".join(query["sql"] for query in queries))
+        self.assertEqual(detail["details"], {"results": ["x" * 100]})
+
+    def test_fields_selector(self):
+        listing = self.client.get("/api/interface-cases/?fields=id,name,assertions").data["results"]
+        interfaces = self.client.get("/api/interfaces/").data["results"]
+
+        self.assertEqual(listing, [{"id": self.case.pk, "name": "case", "assertions": [{"expected": 200}]}])
+        self.assertNotIn("request_body", interfaces[0])
+        self.assertEqual(interfaces[0]["path"], "/ping")
+
+
+class BulkWriteTests(APITestCase):
+    def setUp(self):
+        self.project = Project.objects.create(name="demo")
+        self.interface = APIInterface.objects.create(project=self.project, name="ping", path="/ping")
+        self.cases = InterfaceCase.objects.bulk_create(
+            [InterfaceCase(interface=self.interface, name=f"case-{index}") for index in range(3)]
+        )
+        self.scenario = Scenario.objects.create(project=self.project, name="flow")
+
+    def test_bulk_create_update_and_delete_cases(self):
+        items = [{"interface": self.interface.pk, "name": f"generated-{index}"} for index in range(50)]
+        with CaptureQueriesContext(connection) as queries:
+            created = self.client.post("/api/interface-cases/bulk/", items, format="json")
+        self.assertEqual(created.status_code, 201)
+        self.assertEqual(len(created.data), 50)
+        self.assertLess(len(queries), 15)
+
+        ids = [item["id"] for item in created.data]
+        updated = self.client.patch(
+            "/api/interface-cases/bulk/", [{"id": pk, "is_active": False} for pk in ids], format="json"
+        )
+        self.assertEqual(updated.status_code, 200)
+        self.assertEqual(InterfaceCase.objects.filter(pk__in=ids, is_active=False).count(), 50)
+
+        invalid = self.client.patch("/api/interface-cases/bulk/", [{"id": 0, "name": "x"}], format="json")
+        self.assertEqual(invalid.status_code, 400)
+
+        deleted = self.client.delete("/api/interface-cases/bulk/", {"ids": ids}, format="json")
+        self.assertEqual(deleted.data, {"deleted": 50})
+        self.assertEqual(InterfaceCase.objects.count(), 3)
+
+    def test_bulk_step_writes_use_a_fixed_number_of_queries(self):
+        counts = []
+        for size in (10, 100):
+            cases = InterfaceCase.objects.bulk_create(
+                [InterfaceCase(interface=self.interface, name=f"bulk-{size}-{index}") for index in range(size)]
+            )
+            scenario = Scenario.objects.create(project=self.project, name=f"flow-{size}")
+            items = [
+                {"scenario": scenario.pk, "interface_case": case.pk, "order": index}
+                for index, case in enumerate(cases, 1)
+            ]
+            with CaptureQueriesContext(connection) as created:
+                response = self.client.post("/api/scenario-steps/bulk/", items, format="json")
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(response.data[0]["interface_case_detail"]["interface_name"], "ping")
+            patch = [{"id": step["id"], "order": step["order"] + size} for step in response.data]
+            with CaptureQueriesContext(connection) as updated:
+                response = self.client.patch("/api/scenario-steps/bulk/", patch, format="json")
+            self.assertEqual(response.status_code, 200)
+            counts.append((len(created), len(updated)))
+
+        self.assertEqual(counts[0], counts[1])
+
+    def test_bulk_step_updates_may_swap_orders(self):
+        created = self.client.post(
+            "/api/scenario-steps/bulk/",
+            [
+                {"scenario": self.scenario.pk, "interface_case": case.pk, "order": index}
+                for index, case in enumerate(self.cases, 1)
+            ],
+            format="json",
+        )
+        first, second = created.data[0]["id"], created.data[1]["id"]
+        duplicate = self.client.post(
+            "/api/scenario-steps/bulk/",
+            [{"scenario": self.scenario.pk, "interface_case": self.cases[0].pk, "order": 3}],
+            format="json",
+        )
+        swapped = self.client.patch(
+            "/api/scenario-steps/bulk/", [{"id": first, "order": 2}, {"id": second, "order": 1}], format="json"
+        )
+
+        self.assertEqual(duplicate.status_code, 400)
+        self.assertEqual(swapped.status_code, 200)
+        self.assertEqual(list(self.scenario.steps.values_list("pk", flat=True)), [second, first, created.data[2]["id"]])
+
+    def test_mixed_patch_keeps_order_of_items_without_it(self):
+        created = self.client.post(
+            "/api/scenario-steps/bulk/",
+            [
+                {"scenario": self.scenario.pk, "interface_case": case.pk, "order": index}
+                for index, case in enumerate(self.cases, 1)
+            ],
+            format="json",
+        )
+        first, second = created.data[0]["id"], created.data[1]["id"]
+
+        response = self.client.patch(
+            "/api/scenario-steps/bulk/", [{"id": first, "order": 5}, {"id": second, "config": {"a": 1}}], format="json"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        steps = {step.pk: step for step in self.scenario.steps.all()}
+        self.assertEqual((steps[first].order, steps[second].order, steps[second].config), (5, 2, {"a": 1}))
+
+    def test_bulk_create_of_max_items_checks_clashes(self):
+        ScenarioStep.objects.create(scenario=self.scenario, interface_case=self.cases[0], order=1)
+        items = [
+            {"scenario": self.scenario.pk, "interface_case": self.cases[0].pk, "order": order} for order in range(2, 1002)
+        ]
+
+        created = self.client.post("/api/scenario-steps/bulk/", items, format="json")
+        clash = self.client.post("/api/scenario-steps/bulk/", items[:1], format="json")
+
+        self.assertEqual(created.status_code, 201)
+        self.assertEqual(clash.status_code, 400)
+        self.assertEqual(self.scenario.steps.count(), 1001)
+
+    def test_non_integer_ids_are_rejected(self):
+        deleted = self.client.delete("/api/scenario-steps/bulk/", {"ids": ["abc"]}, format="json")
+        patched = self.client.patch("/api/scenario-steps/bulk/", [{"id": "abc", "order": 1}], format="json")
+
+        self.assertEqual((deleted.status_code, patched.status_code), (400, 400))
+
+    def test_scenario_update_diffs_steps_by_order(self):
+        url = f"/api/scenarios/{self.scenario.pk}/"
+        steps = [{"interface_case": case.pk} for case in self.cases]
+        self.client.patch(url, {"steps": steps}, format="json")
+        before = dict(self.scenario.steps.values_list("order", "pk"))
+
+        steps[1] = {"interface_case": self.cases[0].pk, "config": {"variables": {"a": 1}}}
+        response = self.client.patch(url, {"steps": steps[:2]}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        after = {step.order: step for step in self.scenario.steps.all()}
+        self.assertEqual(sorted(after), [1, 2])
+        self.assertEqual((after[1].pk, after[2].pk), (before[1], before[2]))
+        self.assertEqual((after[2].interface_case_id, after[2].config), (self.cases[0].pk, {"variables": {"a": 1}}))
+
+
+class InterfaceSearchTests(APITestCase):
+    def setUp(self):
+        self.project = Project.objects.create(name="demo")
+        rows = [
+            ("GET", "/users/{id}", "查询用户详情", "Fetch one user"),
+            ("GET", "/users/me", "Current user", ""),
+            ("POST", "/orders", "Create order", "Creates an order for the current user"),
+            ("DELETE", "/orders/{orderId}/items/{itemId}", "Remove item", ""),
+        ]
+        APIInterface.objects.bulk_create(
+            [
+                APIInterface(project=self.project, method=method, path=path, name=name, description=description)
+                for method, path, name, description in rows
+            ]
+        )
+
+    def _search(self, query):
+        response = self.client.get("/api/interfaces/", {"project": self.project.pk, "search": query})
+        return [item["path"] for item in response.data["results"]]
+
+    def test_search_covers_name_path_and_description(self):
+        self.assertEqual(self._search("用户详情"), ["/users/{id}"])
+        self.assertEqual(self._search("items"), ["/orders/{orderId}/items/{itemId}"])
+        self.assertEqual(set(self._search("current user")), {"/users/me", "/orders"})
+        self.assertEqual(self._search("order me"), [])
+
+    def test_search_index_follows_updates(self):
+        APIInterface.objects.filter(path="/orders").update(name="Place purchase", description="")
+
+        self.assertEqual(self._search("purchase"), ["/orders"])
+        self.assertEqual(self._search("Create order"), [])
+
+    def test_path_matching_prefers_literal_segments(self):
+        response = self.client.get(
+            "/api/interfaces/match/", {"project": self.project.pk, "path": "/users/me?x=1"}
+        )
+        self.assertEqual([item["path"] for item in response.data["results"]], ["/users/me", "/users/{id}"])
+
+        response = self.client.get(
+            "/api/interfaces/match/", {"project": self.project.pk, "path": "/orders/9/items/3", "method": "get"}
+        )
+        self.assertEqual(response.data["count"], 0)
+        self.assertEqual(PathMatcher([(1, "GET", "/a/:id")]).match("/a/5"), [1])
+
+
+class RequestTemplateTests(APITestCase):
+    def setUp(self):
+        template_cache.clear()
+        project = Project.objects.create(name="demo")
+        self.environment = Environment.objects.create(
+            project=project,
+            name="dev",
+            base_url="http://api.test",
+            variables={"user": {"id": 7}, "token": "abc"},
+            headers={"Authorization": "Bearer {{ token }}"},
+        )
+        interface = APIInterface.objects.create(
+            project=project, name="user", method="POST", path="/users/{{ user.id }}"
+        )
+        self.case = InterfaceCase.objects.create(
+            interface=interface,
+            name="update",
+            request_payload={"params": {"v": "{{ missing }}"}, "body": {"id": "{{ user.id }}", "static": [1, 2]}},
+        )
+
+    def test_constant_subtrees_are_shared(self):
+        payload = {"static": {"a": [1, 2]}, "dynamic": "id={{ id }}!"}
+        render = compile_template(payload)
+
+        rendered = render({"id": 3})
+        self.assertEqual(rendered, {"static": {"a": [1, 2]}, "dynamic": "id=3!"})
+        self.assertIs(rendered["static"], payload["static"])
+
+    def test_case_is_rendered_with_environment_variables(self):
+        prepared = prepare_request(self.case, self.environment)
+
+        self.assertEqual(prepared.url, "http://api.test/users/7?v=%7B%7B+missing+%7D%7D")
+        self.assertEqual(prepared.headers["Authorization"], "Bearer abc")
+        self.assertEqual(json.loads(prepared.body), {"id": 7, "static": [1, 2]})
+
+    def test_template_cache_is_invalidated_on_update(self):
+        self.assertIs(template_cache.get(self.case, self.environment), template_cache.get(self.case, self.environment))
+        first = prepare_request(self.case, self.environment)
+        self.environment.variables = {"user": {"id": 8}, "token": "abc"}
+        self.environment.save()
+        second = prepare_request(self.case, self.environment)
+
+        self.assertTrue(first.url.startswith("http://api.test/users/7"))
+        self.assertTrue(second.url.startswith("http://api.test/users/8"))
+
+
+class VersionedLRUTests(SimpleTestCase):
+    def test_entries_are_rebuilt_on_a_new_version_and_evicted_in_lru_order(self):
+        cache = VersionedLRU(size=2)
+        builds = []
+
+        def build(value):
+            return lambda: builds.append(value) or value
+
+        cache.fetch("a", 1, build("a1"))
+        cache.fetch("b", 1, build("b1"))
+        self.assertEqual(cache.fetch("a", 1, build("unused")), "a1")
+        self.assertEqual(cache.fetch("a", 2, build("a2")), "a2")
+        cache.fetch("c", 1, build("c1"))
+
+        self.assertEqual(builds, ["a1", "b1", "a2", "c1"])
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.fetch("b", 1, build("b1 again")), "b1 again")
+
+
+class CompiledAssertionTests(SimpleTestCase):
+    BODY = json.dumps({"data": {"id": 7, "tags": ["a", "b"], "name": "widget"}}).encode()
+
+    def _results(self, assertions, status_code=200, latency_ms=120, headers=None):
+        return CompiledAssertions(assertions)(status_code, self.BODY, latency_ms, headers or {"X-State": "ready"})
+
+    def test_rules_pass_and_fail_on_the_response(self):
+        results = self._results(
+            [
+                {"type": "status", "expected": 200},
+                {"path": "$.data.id", "expected": 7},
+                {"type": "jsonpath", "path": "$.data.tags", "operator": "contains", "expected": "b"},
+                {"type": "jsonpath", "path": "$.data.id", "operator": "gt", "expected": "x"},
+                {"type": "jsonpath", "path": "$.data.missing", "operator": "exists", "expected": False},
+                {"type": "regex", "pattern": "^rea", "header": "x-state"},
+                {"type": "latency", "expected": 100},
+                {"type": "schema", "path": "$.data", "schema": {"type": "object", "required": ["id", "name"]}},
+            ]
+        )
+
+        self.assertEqual([result["passed"] for result in results], [True, True, True, False, True, True, False, True])
+        self.assertEqual(results[6]["actual"], 120)
+
+    def test_schema_reports_the_failing_location(self):
+        schema = {
+            "type": "object",
+            "properties": {"data": {"properties": {"tags": {"items": {"enum": ["a"]}}, "id": {"maximum": 5}}}},
+        }
+
+        (result,) = self._results([{"type": "schema", "schema": schema}])
+
+        self.assertFalse(result["passed"])
+        self.assertEqual(result["error"], "$.data.id: 7 is greater than 5")
+
+    def test_malformed_rules_become_failing_checks(self):
+        malformed = [
+            {"type": "schema", "schema": {"minimum": "5"}},
+            {"type": "schema", "schema": {"enum": "abc"}},
+            {"type": "schema", "schema": {"maxLength": -1}},
+            {"type": "schema", "schema": {"properties": {"id": {"pattern": 5}}}},
+            {"type": "schema", "schema": {"required": "id"}},
+            {"type": "schema", "schema": {"type": {"object": True}}},
+            {"type": "latency", "expected": "500"},
+            {"type": "regex", "pattern": 5},
+            {"type": "jsonpath", "path": "$.data", "operator": "like"},
+            "status",
+        ]
+
+        results = self._results(malformed)
+
+        self.assertEqual(len(results), len(malformed))
+        self.assertTrue(all(not result["passed"] and result["error"] for result in results))
+
+    def test_cache_recompiles_when_the_case_changes(self):
+        case = InterfaceCase(pk=1, assertions=[{"type": "status", "expected": 200}], updated_at=timezone.now())
+        cache = AssertionCache(size=1)
+
+        first = cache.get(case)
+        self.assertIs(cache.get(case), first)
+        case.updated_at = timezone.now() + timedelta(seconds=1)
+
+        self.assertIsNot(cache.get(case), first)
+
+
+class SwaggerImportTests(APITestCase):
+    def setUp(self):
+        self.project = Project.objects.create(name="Imports")
+
+    def _post(self, swagger, **extra):
+        data = {"project": self.project.pk, "swagger": swagger, **extra}
+        return self.client.post("/api/swagger/import/", data, format="json")
+
+    def _spec(self, *paths, **operation):
+        return {
+            "openapi": "3.0.0",
+            "paths": {path: {"get": {"summary": f"Get {path}", **operation}} for path in paths},
+        }
+
+    def test_import_reports_counts_and_keeps_every_id_in_created(self):
+        APIInterface.objects.create(project=self.project, name="old", method="GET", path="/a")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self._post(self._spec(*(f"/items/{index}" for index in range(50)), "/a"))
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data["new"], response.data["updated"], response.data["unchanged"]), (50, 1, 0))
+        self.assertEqual(response.data["count"], 51)
+        self.assertCountEqual(
+            response.data["created"], APIInterface.objects.filter(project=self.project).values_list("pk", flat=True)
+        )
+        self.assertEqual(APIInterface.objects.get(path="/a").name, "Get /a")
+        self.assertLess(len(queries), 20)
+
+    def test_empty_yaml_values_fall_back_to_defaults(self):
+        spec = "openapi: 3.0.0\npaths:\n  /a:\n    get:\n      description:\n      parameters:\n"
+
+        response = self._post(spec)
+
+        self.assertEqual(response.status_code, 201)
+        interface = APIInterface.objects.get(path="/a")
+        self.assertEqual((interface.description, interface.request_params), ("", {}))
+
+    REF_SPEC = {
+        "openapi": "3.0.0",
+        "paths": {
+            "/pets/{id}": {
+                "parameters": [{"$ref": "#/components/parameters/Id"}],
+                "put": {
+                    "parameters": [{"$ref": "#/components/parameters/Id"}],
+                    "requestBody": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/Pet"}}}},
+                },
+                "get": {"summary": "Get pet"},
+            }
+        },
+        "components": {
+            "parameters": {"Id": {"name": "id", "in": "path", "required": True}},
+            "schemas": {
+                "Pet": {"type": "object", "properties": {"parent": {"$ref": "#/components/schemas/Pet"}}},
+            },
+        },
+    }
+
+    def test_json_and_yaml_streams_yield_the_same_resolved_operations(self):
+        import yaml
+
+        import ijson
+
+        with mock.patch("ijson.parse", wraps=ijson.parse) as json_parse:
+            json_ops = list(stream_operations(as_stream(json.dumps(self.REF_SPEC)), name="spec.json"))
+        with mock.patch("yaml.parse", wraps=yaml.parse) as yaml_parse:
+            yaml_text = yaml.safe_dump(self.REF_SPEC, sort_keys=False)
+            yaml_ops = list(stream_operations(as_stream(yaml_text), name="spec.yaml"))
+
+        self.assertEqual(json_ops, yaml_ops)
+        # One pass for the root check and components, one for the paths.
+        self.assertEqual((json_parse.call_count, yaml_parse.call_count), (2, 2))
+        self.assertEqual(
+            [(path, method) for path, method, _ in json_ops], [("/pets/{id}", "PUT"), ("/pets/{id}", "GET")]
+        )
+        put = json_ops[0][2]
+        self.assertEqual(put["parameters"], [{"name": "id", "in": "path", "required": True}])
+        pet = put["requestBody"]["content"]["application/json"]["schema"]
+        self.assertEqual(pet["type"], "object")
+        # A cyclic reference is left in place instead of recursing forever.
+        self.assertEqual(pet["properties"]["parent"], {"$ref": "#/components/schemas/Pet"})
+
+    def test_uploaded_yaml_file_is_imported_with_refs_resolved(self):
+        import yaml
+
+        upload = SimpleUploadedFile("spec.yaml", yaml.safe_dump(self.REF_SPEC, sort_keys=False).encode())
+
+        response = self.client.post("/api/swagger/import/", {"project": self.project.pk, "file": upload})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["new"], 2)
+        interface = APIInterface.objects.get(method="PUT")
+        self.assertEqual(interface.request_params, [{"name": "id", "in": "path", "required": True}])
+        self.assertEqual(interface.request_body["content"]["application/json"]["schema"]["type"], "object")
+
+    def test_identical_spec_is_skipped_without_writes(self):
+        spec = json.dumps(self._spec("/a", "/b"))
+        first = self._post(spec)
+        stamps = dict(APIInterface.objects.values_list("pk", "updated_at"))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self._post(spec)
+
+        self.assertTrue(response.data["skipped"])
+        self.assertEqual((response.data["new"], response.data["unchanged"]), (0, 2))
+        self.assertCountEqual(response.data["created"], first.data["created"])
+        self.assertFalse([query for query in queries if query["sql"].startswith(("INSERT", "UPDATE", "DELETE"))])
+        self.assertEqual(dict(APIInterface.objects.values_list("pk", "updated_at")), stamps)
+
+    def test_changed_spec_rewrites_only_changed_operations(self):
+        self._post(self._spec("/a", "/b"))
+        untouched = APIInterface.objects.get(path="/a").updated_at
+        spec = self._spec("/a", "/b")
+        spec["paths"]["/b"]["get"]["description"] = "changed"
+
+        response = self._post(spec)
+
+        self.assertFalse(response.data["skipped"])
+        self.assertEqual((response.data["new"], response.data["updated"], response.data["unchanged"]), (0, 1, 1))
+        self.assertEqual(APIInterface.objects.get(path="/a").updated_at, untouched)
+        self.assertEqual(APIInterface.objects.get(path="/b").description, "changed")
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.spec_hash, content_hash(spec))
+
+    def test_prune_deletes_operations_missing_from_the_spec(self):
+        self._post(self._spec("/a", "/b"))
+
+        kept = self._post(self._spec("/a"))
+        self.assertEqual((kept.data["deleted"], APIInterface.objects.count()), (0, 2))
+        pruned = self._post(self._spec("/a"), prune="true")
+
+        self.assertEqual((pruned.data["deleted"], pruned.data["unchanged"]), (1, 1))
+        self.assertEqual(list(APIInterface.objects.values_list("path", flat=True)), ["/a"])
+
+    def test_input_that_is_not_a_spec_is_rejected(self):
+        for swagger in (
+            "not json {",
+            "[1, 2]",
+            '{"openapi": "3.0.0"}',
+            "openapi: 3.0.0\n",
+            "- 1\n",
+            [1, 2],
+            {"openapi": "3.0.0"},
+        ):
+            with self.subTest(swagger=swagger):
+                response = self._post(swagger)
+
+                self.assertEqual(response.status_code, 400)
+        self.project.refresh_from_db()
+        self.assertFalse(self.project.spec_hash)
+        self.assertFalse(APIInterface.objects.exists())
+
+
+class _EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path.startswith("/ok/slow"):
+            time.sleep(0.2)
+        payload = json.dumps({"path": self.path, "padding": "x" * 2000}).encode()
+        self.send_response(200 if self.path.startswith("/ok") else 500)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class LocalServerTestCase(APITestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _EchoHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.project = Project.objects.create(name="demo")
+        self.environment = Environment.objects.create(
+            project=self.project, name="local", base_url=self.base_url, is_default=True
+        )
+
+
+class RunSuiteResultStorageTests(LocalServerTestCase):
+    def test_results_are_stored_per_case(self):
+        ok = APIInterface.objects.create(project=self.project, name="ok", path="/ok")
+        broken = APIInterface.objects.create(project=self.project, name="broken", path="/broken")
+        status_200 = [{"type": "status", "expected": 200}]
+        cases = [
+            InterfaceCase.objects.create(interface=ok, name="ok", assertions=status_200),
+            InterfaceCase.objects.create(interface=broken, name="broken", assertions=status_200),
+        ]
+        suite = TestSuite.objects.create(project=self.project, name="smoke")
+        suite.cases.set(cases)
+        report = TestReport.objects.create(suite=suite, status="running")
+
+        run_suite(report)
+
+        report.refresh_from_db()
+        self.assertEqual(report.status, "failed")
+        self.assertEqual((report.details["passed"], report.details["failed"]), (1, 1))
+        self.assertNotIn("results", report.details)
+        results = {result.name: result for result in TestCaseResult.objects.filter(report=report)}
+        self.assertEqual((results["ok"].status_code, results["ok"].passed), (200, True))
+        self.assertEqual((results["broken"].status_code, results["broken"].passed), (500, False))
+        body = ResponseBody.objects.get(result=results["ok"])
+        self.assertEqual(body.encoding, "zlib")
+        self.assertEqual(json.loads(decode_body(body))["path"], "/ok")
+
+        listing = self.client.get(f"/api/test-results/?report={report.pk}&passed=false").data["results"]
+        self.assertEqual([item["name"] for item in listing], ["broken"])
+        detail = self.client.get(f"/api/test-results/{results['ok'].pk}/").data
+        self.assertEqual(json.loads(detail["response_body"])["path"], "/ok")
+
+
+class SuiteRunnerTests(LocalServerTestCase):
+    def _case(self, path, name=None):
+        interface = APIInterface.objects.create(project=self.project, name=name or path, path=path)
+        return InterfaceCase.objects.create(
+            interface=interface, name=name or path, assertions=[{"type": "status", "expected": 200}]
+        )
+
+    def test_cases_run_concurrently_with_measured_latency(self):
+        prepared = [prepare_request(self._case(f"/ok/slow/{index}"), self.environment) for index in range(4)]
+
+        started = time.perf_counter()
+        results = SuiteRunner(max_workers=4).run(prepared)
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 0.6)
+        self.assertEqual([result.name for result in results], [f"/ok/slow/{index}" for index in range(4)])
+        self.assertTrue(all(result.passed and result.status_code == 200 for result in results))
+        self.assertTrue(all(200 <= result.latency_ms < 600 for result in results))
+
+    def test_unreachable_and_unconfigured_cases_fail_without_aborting_the_run(self):
+        offline = Environment.objects.create(project=self.project, name="offline", base_url="http://127.0.0.1:9")
+        prepared = [
+            prepare_request(self._case("/ok", "ok"), self.environment),
+            prepare_request(self._case("/ok/offline", "offline"), offline),
+            prepare_request(self._case("/ok/unconfigured", "unconfigured"), None),
+        ]
+
+        results = {result.name: result for result in SuiteRunner(max_workers=2).run(prepared)}
+
+        self.assertTrue(results["ok"].passed)
+        for name in ("offline", "unconfigured"):
+            self.assertFalse(results[name].passed)
+            self.assertIsNone(results[name].status_code)
+            self.assertTrue(results[name].error)
+        self.assertIn("base URL", results["unconfigured"].error)
+
+    def test_malformed_payloads_fail_their_case_only(self):
+        suite = TestSuite.objects.create(project=self.project, name="mixed")
+        suite.cases.set([self._case("/ok", "ok")])
+        for name, payload in (("list", ["GET"]), ("headers", {"headers": "abc"}), ("params", {"params": "a=1"})):
+            case = self._case(f"/ok/{name}", name)
+            InterfaceCase.objects.filter(pk=case.pk).update(request_payload=payload)
+            suite.cases.add(case)
+        report = TestReport.objects.create(suite=suite, status="running")
+
+        run_suite(report)
+
+        report.refresh_from_db()
+        self.assertEqual(report.status, "failed")
+        errors = dict(TestCaseResult.objects.filter(report=report).values_list("name", "error"))
+        self.assertEqual(errors["ok"], "")
+        for name in ("list", "headers", "params"):
+            self.assertTrue(errors[name].startswith("Invalid request payload:"))
+
+    def test_api_rejects_malformed_payloads(self):
+        interface = APIInterface.objects.create(project=self.project, name="ok", path="/ok")
+        for payload, field in ((["GET"], None), ({"headers": "abc"}, "headers"), ({"params": "a=1"}, "params")):
+            response = self.client.post(
+                "/api/interface-cases/",
+                {"interface": interface.pk, "name": "bad", "request_payload": payload},
+                format="json",
+            )
+            self.assertEqual(response.status_code, 400)
+            if field:
+                self.assertIn(field, response.data["request_payload"])
+
+
+class ConnectionPoolTests(LocalServerTestCase):
+    def _cases(self, count):
+        interface = APIInterface.objects.create(project=self.project, name="slow", path="/ok/slow")
+        return [
+            InterfaceCase.objects.create(
+                interface=interface,
+                name=f"slow-{index}",
+                assertions=[{"type": "status", "expected": 200}, {"type": "latency", "expected": 350}],
+            )
+            for index in range(count)
+        ]
+
+    def test_queued_requests_wait_for_a_connection_without_counting_the_wait(self):
+        prepared = [prepare_request(case, self.environment) for case in self._cases(4)]
+
+        with self.settings(HTTP_CLIENT={"CONNECT_TIMEOUT": 0.05}):
+            results = SuiteRunner(max_workers=4, per_host_limit=1).run(prepared)
+
+        self.assertEqual([result.error for result in results], [""] * 4)
+        self.assertTrue(all(result.passed for result in results), [result.assertions for result in results])
+        self.assertTrue(all(result.latency_ms < 350 for result in results))
+
+    def test_pool_timeout_bounds_the_wait(self):
+        prepared = [prepare_request(case, self.environment) for case in self._cases(2)]
+
+        with self.settings(HTTP_CLIENT={"POOL_TIMEOUT": 0.05}):
+            results = SuiteRunner(max_workers=2, per_host_limit=1).run(prepared)
+
+        self.assertEqual(sorted(bool(result.error) for result in results), [False, True])
+
+
+class RunQueueTests(LocalServerTestCase):
+    def setUp(self):
+        super().setUp()
+        interface = APIInterface.objects.create(project=self.project, name="ok", path="/ok")
+        case = InterfaceCase.objects.create(
+            interface=interface, name="ok", assertions=[{"type": "status", "expected": 200}]
+        )
+        self.suite = TestSuite.objects.create(project=self.project, name="smoke")
+        self.suite.cases.set([case])
+
+    def test_run_returns_202_and_the_report_moves_through_the_queue(self):
+        with self.settings(RUN_QUEUE={"AUTOSTART": False}):
+            response = self.client.post(f"/api/test-suites/{self.suite.pk}/run/", {}, format="json")
+
+        self.assertEqual((response.status_code, response.data["status"]), (202, "queued"))
+        report_url = f"/api/test-reports/{response.data['id']}/"
+        job = claim_next_job("test")
+        self.assertEqual((job.report_id, job.status, job.attempts), (response.data["id"], "running", 1))
+        self.assertIsNone(claim_next_job("other"))
+
+        process_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "done")
+        self.assertEqual(self.client.get(report_url).data["status"], "success")
+
+    def test_invalid_shards_are_rejected(self):
+        response = self.client.post(f"/api/test-suites/{self.suite.pk}/run/", {"shards": "many"}, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(RunJob.objects.exists())
+
+    def test_jobs_that_keep_killing_their_worker_fail_after_max_attempts(self):
+        report = TestReport.objects.create(suite=self.suite, status="running")
+        job = RunJob.objects.create(
+            report=report, status="running", claimed_at=timezone.now() - timedelta(hours=1), attempts=3
+        )
+
+        with self.settings(RUN_QUEUE={"STALE_AFTER": 60, "MAX_ATTEMPTS": 3}):
+            self.assertEqual(requeue_stale_jobs(), 0)
+
+        job.refresh_from_db()
+        report.refresh_from_db()
+        self.assertEqual((job.status, job.error), ("error", "Worker stopped responding."))
+        self.assertEqual((report.status, report.summary), ("failed", "Run aborted: worker stopped responding."))
+        self.assertIsNone(claim_next_job("test"))
+
+    def test_workers_requeue_jobs_abandoned_by_a_crashed_process(self):
+        report = TestReport.objects.create(suite=self.suite, status="running")
+        abandoned = RunJob.objects.create(
+            report=report, status="running", claimed_at=timezone.now() - timedelta(hours=1), attempts=1
+        )
+        active = RunJob.objects.create(report=report, shard=1, status="running", claimed_at=timezone.now())
+
+        with self.settings(RUN_QUEUE={"STALE_AFTER": 60, "SWEEP_INTERVAL": 3600}):
+            pool = RunWorkerPool(size=1)
+            # Run the worker loop on this thread until it first goes idle.
+            pool._wakeup = mock.Mock(wait=lambda timeout: pool._stopping.set())
+            pool._work("test")
+
+        abandoned.refresh_from_db()
+        self.assertEqual((abandoned.status, abandoned.attempts, abandoned.worker), ("done", 2, "test"))
+        self.assertEqual(RunJob.objects.get(pk=active.pk).status, "running")
+        self.assertEqual(TestReport.objects.get(pk=report.pk).status, "success")
+        self.assertEqual(requeue_stale_jobs(), 0)
+
+
+class JobHeartbeatTests(TransactionTestCase):
+    def test_heartbeat_keeps_a_long_running_job_claimed(self):
+        suite = TestSuite.objects.create(project=Project.objects.create(name="demo"), name="long")
+        report = TestReport.objects.create(suite=suite, status="running")
+        job = RunJob.objects.create(
+            report=report, status="running", claimed_at=timezone.now() - timedelta(hours=1), attempts=1
+        )
+
+        with JobHeartbeat(job, interval=0.05):
+            time.sleep(0.3)
+
+        job.refresh_from_db()
+        self.assertGreater(job.claimed_at, timezone.now() - timedelta(seconds=5))
+        with self.settings(RUN_QUEUE={"STALE_AFTER": 60}):
+            self.assertEqual(requeue_stale_jobs(), 0)
+        self.assertEqual(RunJob.objects.get(pk=job.pk).status, "running")
+
+
+    def test_load_test_running_past_stale_after_is_not_claimed_again(self):
+        suite = TestSuite.objects.create(project=Project.objects.create(name="demo"), name="load")
+        report = TestReport.objects.create(suite=suite, kind="load", status="queued", details={"config": {}})
+        RunJob.objects.create(report=report)
+        requeued = []
+
+        def long_load_test(report):
+            time.sleep(0.5)
+            requeued.append(requeue_stale_jobs())
+
+        with self.settings(RUN_QUEUE={"HEARTBEAT": 0.05, "STALE_AFTER": 0.25, "AUTOSTART": False}):
+            with mock.patch("interfaces.queue.run_load_test", side_effect=long_load_test):
+                job = process_job(claim_next_job("test"))
+
+        self.assertEqual(requeued, [0])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("done", 1))
+
+class ShardedRunTests(LocalServerTestCase):
+    def test_shards_are_merged_into_one_report(self):
+        cases = [
+            InterfaceCase.objects.create(
+                interface=APIInterface.objects.create(project=self.project, name=name, path=f"/{name}"),
+                name=name,
+                assertions=[{"type": "status", "expected": 200}],
+            )
+            for name in ("ok-1", "ok-2", "ok-3", "broken-1", "broken-2")
+        ]
+        suite = TestSuite.objects.create(project=self.project, name="big")
+        suite.cases.set(cases)
+
+        with self.settings(RUN_QUEUE={"AUTOSTART": False}):
+            response = self.client.post(f"/api/test-suites/{suite.pk}/run/", {"shards": 3}, format="json")
+            report = TestReport.objects.get(pk=response.data["id"])
+            self.assertEqual(RunJob.objects.filter(report=report).count(), 3)
+            while job := claim_next_job("test"):
+                process_job(job)
+                if RunJob.objects.filter(report=report, status="queued").exists():
+                    self.assertNotEqual(TestReport.objects.get(pk=report.pk).status, "failed")
+
+        report.refresh_from_db()
+        self.assertEqual(report.status, "failed")
+        self.assertEqual(report.details["shards"], 3)
+        self.assertEqual((report.details["executed_cases"], report.details["passed"]), (5, 3))
+        self.assertEqual(TestCaseResult.objects.filter(report=report).count(), 5)
+
+
+class LoadTestTests(LocalServerTestCase):
+    def setUp(self):
+        super().setUp()
+        interface = APIInterface.objects.create(project=self.project, name="ok", path="/ok")
+        self.case = InterfaceCase.objects.create(
+            interface=interface, name="ok", assertions=[{"type": "status", "expected": 200}]
+        )
+        self.suite = TestSuite.objects.create(project=self.project, name="load")
+        self.suite.cases.set([self.case])
+
+    def test_histogram_percentiles(self):
+        histogram = LatencyHistogram()
+        for value in range(1, 1001):
+            histogram.record(value)
+
+        summary = histogram.summary()
+        self.assertEqual((summary["count"], summary["min"], summary["max"]), (1000, 1.0, 1000.0))
+        self.assertAlmostEqual(summary["p50"], 500, delta=5)
+        self.assertAlmostEqual(summary["p99"], 990, delta=10)
+
+    def test_open_loop_suite_load_test(self):
+        report = TestReport.objects.create(
+            suite=self.suite, kind="load", status="running", details={"config": {"rps": 50, "duration": 1}}
+        )
+
+        run_load_test(report)
+
+        report.refresh_from_db()
+        self.assertEqual(report.status, "success")
+        self.assertEqual(report.details["mode"], "rps")
+        self.assertEqual(report.details["requests"], 50)
+        self.assertEqual(report.details["status_codes"], {"200": 50})
+        self.assertEqual(report.details["latency_ms"]["count"], 50)
+        self.assertLess(report.details["connections"]["connections_created"], 50)
+
+    def test_scenario_load_test_endpoint_validates_and_queues(self):
+        scenario = Scenario.objects.create(project=self.project, name="flow")
+        ScenarioStep.objects.create(scenario=scenario, interface_case=self.case, order=1)
+
+        invalid = self.client.post(f"/api/scenarios/{scenario.pk}/load-test/", {"duration": 1}, format="json")
+        with self.settings(RUN_QUEUE={"AUTOSTART": False}):
+            response = self.client.post(
+                f"/api/scenarios/{scenario.pk}/load-test/", {"concurrency": 2, "duration": 1}, format="json"
+            )
+
+        self.assertEqual(invalid.status_code, 400)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual((response.data["kind"], response.data["project"]), ("load", self.project.pk))
+        report = TestReport.objects.get(pk=response.data["id"])
+        run_load_test(report)
+        report.refresh_from_db()
+        self.assertEqual(report.details["mode"], "concurrency")
+        self.assertGreater(report.details["requests"], 0)
+        self.assertEqual(report.details["errors"], 0)
+
+
+class ReportStreamTests(APITestCase):
+    def setUp(self):
+        project = Project.objects.create(name="demo")
+        suite = TestSuite.objects.create(project=project, name="smoke")
+        self.report = TestReport.objects.create(suite=suite, status="success", details={"passed": 2})
+        self.results = [
+            TestCaseResult.objects.create(report=self.report, name=f"case-{index}", method="GET", passed=True)
+            for index in range(2)
+        ]
+
+    def _events(self, last_id=0):
+        async def collect():
+            return [chunk async for chunk in report_events(self.report.pk, last_id, poll_interval=0.01)]
+
+        events = []
+        for chunk in async_to_sync(collect)():
+            fields = dict(line.split(": ", 1) for line in chunk.decode().strip().splitlines())
+            events.append((fields["event"], json.loads(fields["data"])))
+        return events
+
+    def test_stream_sends_results_then_end(self):
+        events = self._events()
+
+        self.assertEqual([name for name, _ in events], ["result", "result", "status", "end"])
+        self.assertEqual(events[0][1]["id"], self.results[0].pk)
+        self.assertEqual(events[-1][1], {"status": "success", "details": {"passed": 2}})
+
+    def test_wsgi_requests_get_a_blocking_stream(self):
+        response = self.client.get(f"/api/test-reports/{self.report.pk}/stream/")
+
+        self.assertFalse(response.is_async)
+        chunks = list(response.streaming_content)
+        self.assertEqual([chunk.split(b"\n", 1)[0] for chunk in chunks][-2:], [b"event: status", b"event: end"])
+        self.assertEqual(len(chunks), 4)
+
+    def test_stream_resumes_after_last_event_id(self):
+        events = self._events(last_id=self.results[0].pk)
+
+        self.assertEqual([data["id"] for name, data in events if name == "result"], [self.results[1].pk])
+
+    def _result(self, **fields):
+        return TestCaseResult.objects.create(report=self.report, name="late", method="GET", **fields)
+
+    def test_rows_committed_late_are_sent_and_rewritten_rows_reset_the_stream(self):
+        TestReport.objects.filter(pk=self.report.pk).update(status="running")
+        first, second = self.results
+        gap = self._result()
+        last = self._result()
+        gap_id = gap.pk
+        gap.delete()
+        poller = ReportPoller(self.report.pk, poll_interval=0.01)
+
+        def sent():
+            events, _ = poller.poll()
+            return [chunk.decode().split("\n", 1)[0][7:] for chunk in events if chunk.startswith(b"event: ")]
+
+        self.assertEqual(sent(), ["result", "result", "result", "status"])
+        self.assertEqual(poller.last_id, last.pk)
+        # A concurrent writer commits a lower id after a higher one was sent.
+        self._result(id=gap_id)
+        self.assertEqual(sent(), ["result"])
+        self.assertEqual(sent(), [])
+        # A retried shard deletes results the stream already sent.
+        first.delete()
+        self.assertEqual(sent(), ["reset", "result", "result", "result"])
+        self.assertEqual(poller.last_id, last.pk)
+        self.assertEqual(sent(), [])
+
+
+class BenchmarkTests(APITestCase):
+    def test_run_covers_every_endpoint_and_succeeds(self):
+        run = run_benchmarks(3, iterations=1, heavy_iterations=1)
+
+        self.assertEqual(run["seed"], {"interfaces": 3, "cases": 3, "suites": 1, "scenarios": 1, "reports": 3})
+        results = {result["name"]: result for result in run["results"]}
+        for name in ("project-list", "interface-detail", "test-result-list", "swagger-import", "test-suite-run"):
+            self.assertIn(name, results)
+        self.assertEqual(results.pop("test-suite-execute")["status"], "done")
+        self.assertTrue(all(result["status"] in (200, 201, 202) for result in results.values()))
+        self.assertTrue(all(result["p95_ms"] >= result["p50_ms"] > 0 for result in results.values()))
+
+    def test_compare_flags_query_and_latency_regressions(self):
+        def report(queries, p50):
+            result = {"name": "project-list", "queries": queries, "p50_ms": p50, "p95_ms": p50}
+            return {"scales": {"small": {"results": [result]}}}
+
+        regressions = [row[1:] for row in compare(report(2, 10.0), report(3, 11.0)) if row[-1]]
+
+        self.assertEqual(regressions, [("project-list", "queries", 2, 3, True)])
+
+
+class MockServerTests(APITestCase):
+    spec = {
+        "openapi": "3.0.0",
+        "info": {"title": "shop", "version": "1"},
+        "components": {
+            "schemas": {
+                "Order": {
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "integer"},
+                        "created": {"type": "string", "format": "date-time"},
+                        "tags": {"type": "array", "items": {"type": "string"}},
+                        "state": {"enum": ["open", "closed"]},
+                    },
+                }
+            }
+        },
+        "paths": {
+            "/users/{id}": {
+                "get": {
+                    "responses": {
+                        "404": {"description": "missing"},
+                        "200": {"content": {"application/json": {"example": {"id": 7, "name": "Ada"}}}},
+                    }
+                }
+            },
+            "/orders": {
+                "post": {
+                    "responses": {
+                        "201": {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/Order"}}}}
+                    }
+                }
+            },
+        },
+    }
+
+    def setUp(self):
+        self.project = Project.objects.create(name="shop")
+        import_spec(self.project, self.spec)
+
+    def _request(self, base_url, method, path):
+        from http.client import HTTPConnection
+        from urllib.parse import urlsplit
+
+        parts = urlsplit(base_url)
+        connection = HTTPConnection(parts.hostname, parts.port, timeout=5)
+        try:
+            connection.request(method, path, body=b"{}" if method == "POST" else None)
+            response = connection.getresponse()
+            return response.status, json.loads(response.read() or b"null")
+        finally:
+            connection.close()
+
+    def test_serves_examples_and_synthesized_schemas(self):
+        with MockServerThread(MockServer(MockRoutes(self.project.pk))) as mock:
+            self.assertEqual(
+                self._request(mock.base_url, "GET", "/users/42?verbose=1"), (200, {"id": 7, "name": "Ada"})
+            )
+            self.assertEqual(
+                self._request(mock.base_url, "POST", "/orders"),
+                (201, {"id": 0, "created": "2024-01-01T00:00:00Z", "tags": ["string"], "state": "open"}),
+            )
+            self.assertEqual(self._request(mock.base_url, "DELETE", "/users/42")[0], 405)
+            self.assertEqual(self._request(mock.base_url, "GET", "/missing")[0], 404)
+
+    def test_recorded_response_wins_over_the_spec(self):
+        interface = APIInterface.objects.get(project=self.project, path="/users/{id}")
+        case = InterfaceCase.objects.create(interface=interface, name="get user")
+        report = TestReport.objects.create(status="success")
+        result = TestCaseResult.objects.create(
+            report=report, case=case, name="get user", method="GET", status_code=200, passed=True
+        )
+        ResponseBody.objects.create(result=result, data=b'{"id": 42, "name": "Recorded"}')
+
+        routes = MockRoutes(self.project.pk)
+
+        self.assertEqual(routes.resolve("GET", "/users/42"), (200, b'{"id": 42, "name": "Recorded"}'))
+        spec_only = MockRoutes(self.project.pk, recorded=False)
+        self.assertEqual(spec_only.resolve("GET", "/users/42")[1], b'{"id": 7, "name": "Ada"}')
+
+    def test_error_injection_is_repeatable_with_a_seed(self):
+        routes = MockRoutes(self.project.pk)
+
+        def statuses(seed):
+            server = MockServer(routes, error_rate=0.5, error_status=503, jitter_ms=10, seed=seed)
+            return [server.respond("GET", "/users/1")[::2] for _ in range(50)]
+
+        self.assertEqual(statuses(3), statuses(3))
+        self.assertEqual({status for status, _ in statuses(3)}, {200, 503})
+
+    def test_suite_runs_against_the_mock_server(self):
+        interface = APIInterface.objects.get(project=self.project, path="/users/{id}")
+        case = InterfaceCase.objects.create(
+            interface=interface,
+            name="get user",
+            request_payload={"path": "/users/1"},
+            assertions=[{"type": "status", "expected": 200}],
+        )
+        suite = TestSuite.objects.create(project=self.project, name="mocked")
+        suite.cases.set([case])
+
+        with MockServerThread(MockServer(MockRoutes(self.project.pk))) as mock:
+            Environment.objects.create(project=self.project, name="mock", base_url=mock.base_url, is_default=True)
+            report = TestReport.objects.create(suite=suite, status="running")
+            run_suite(report)
+
+        report.refresh_from_db()
+        self.assertEqual(report.status, "success")
+
+    def test_schema_synthesis_handles_composition_and_depth(self):
+        node = {"type": "object", "properties": {}}
+        node["properties"]["child"] = node  # self-referencing schema left unresolved by the importer
+        composed = {"allOf": [{"properties": {"a": {"type": "boolean"}}}, {"properties": {"b": {"type": "number"}}}]}
+
+        self.assertEqual(example_from_schema(composed), {"a": True, "b": 0.0})
+        self.assertEqual(example_from_schema({"oneOf": [{"type": "integer", "minimum": 5}]}), 5)
+        self.assertIsInstance(example_from_schema(node, max_depth=3), dict)
+
+
+class ScenarioExtractionTests(SimpleTestCase):
+    RESPONSE = HTTPResponse(
+        status=200,
+        headers={"X-Request-Id": "req-42", "Set-Cookie": "session=abc123; Path=/"},
+        body=json.dumps({"data": {"token": "t0k", "items": [{"id": 5}]}}).encode(),
+    )
+
+    def test_each_extraction_type(self):
+        values, errors = extract(
+            [
+                {"name": "token", "path": "$.data.token"},
+                {"name": "first", "type": "jsonpath", "path": "$.data.items[0].id"},
+                {"name": "request_id", "type": "header", "header": "x-request-id"},
+                {"name": "X-Request-Id"},
+                {"name": "session", "type": "regex", "header": "Set-Cookie", "pattern": "session=(\\w+)"},
+                {"name": "quoted", "type": "regex", "pattern": '"token": "[a-z0-9]+"'},
+            ],
+            self.RESPONSE,
+        )
+
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            values,
+            {
+                "token": "t0k",
+                "first": 5,
+                "request_id": "req-42",
+                "X-Request-Id": "req-42",
+                "session": "abc123",
+                "quoted": '"token": "t0k"',
+            },
+        )
+
+    def test_missing_values_use_defaults_or_report_errors(self):
+        values, errors = extract(
+            [
+                {"name": "user", "path": "$.data.user", "default": "guest"},
+                {"name": "missing", "path": "$.data.user"},
+                {"name": "bad", "type": "regex", "pattern": 5},
+                {"name": "odd", "type": "cookie"},
+                "token",
+            ],
+            self.RESPONSE,
+        )
+
+        self.assertEqual(values, {"user": "guest"})
+        self.assertEqual(len(errors), 4)
+        self.assertEqual(errors[-1], "Extraction rules must be objects, got 'token'")
+        self.assertEqual(errors[0], "missing: no value extracted")
+
+
+class ScenarioGraphTests(LocalServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.scenario = Scenario.objects.create(project=self.project, name="onboarding")
+
+    def _step(self, order, path, extractions=None, **config):
+        interface = APIInterface.objects.create(project=self.project, name=path, path=path)
+        case = InterfaceCase.objects.create(
+            interface=interface,
+            name=f"step {order}",
+            extractions=extractions or [],
+            assertions=[{"type": "status", "expected": 200}],
+        )
+        return ScenarioStep.objects.create(scenario=self.scenario, interface_case=case, order=order, config=config)
+
+    def _run(self):
+        return run_scenarios([self.scenario.pk])[0]
+
+    def test_api_rejects_step_config_the_runner_cannot_apply(self):
+        case = self._step(1, "/ok").interface_case
+        for config, field in (
+            (["sequential"], None),
+            ({"variables": ["a"]}, "variables"),
+            ({"extractions": ["token"]}, "extractions"),
+            ({"request_payload": {"headers": "abc"}}, "request_payload"),
+        ):
+            response = self.client.post(
+                "/api/scenario-steps/",
+                {"scenario": self.scenario.pk, "interface_case": case.pk, "order": 2, "config": config},
+                format="json",
+            )
+            self.assertEqual(response.status_code, 400)
+            if field:
+                self.assertIn(field, response.data["config"])
+        response = self.client.patch(
+            f"/api/interface-cases/{case.pk}/", {"extractions": [{"name": "a"}, "token"]}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_independent_steps_run_concurrently(self):
+        for order in range(1, 5):
+            self._step(order, f"/ok/slow/{order}")
+
+        outcome = self._run()
+
+        self.assertEqual((outcome["status"], outcome["executed_steps"]), ("success", 4))
+        self.assertLess(outcome["duration_ms"], 600)
+        self.assertEqual([step["order"] for step in outcome["steps"]], [1, 2, 3, 4])
+        self.assertTrue(all(step["depends_on"] == [] for step in outcome["steps"]))
+
+    def test_run_many_validates_ids_and_caps_the_scenario_count(self):
+        self._step(1, "/ok/one")
+        url = "/api/scenarios/run/"
+
+        for scenarios in ("abc", [1, "2"], {"id": 1}):
+            with self.subTest(scenarios=scenarios):
+                self.assertEqual(self.client.post(url, {"scenarios": scenarios}, format="json").status_code, 400)
+        response = self.client.post(url, {"scenarios": [self.scenario.pk]}, format="json")
+        self.assertEqual((response.status_code, response.data["count"]), (200, 1))
+
+        Scenario.objects.create(project=self.project, name="second")
+        with self.settings(SCENARIO_RUN={"MAX_SCENARIOS": 1}):
+            response = self.client.post(f"{url}?project={self.project.pk}", {}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_consumers_wait_for_extracted_values(self):
+        login = self._step(1, "/ok/slow/login", extractions=[{"name": "token", "path": "$.path"}])
+        self._step(2, "/ok/profile", request_payload={"path": "/ok/profile{{ token }}"})
+        self._step(3, "/ok/slow/news")
+
+        outcome = self._run()
+
+        steps = {step["order"]: step for step in outcome["steps"]}
+        self.assertEqual(outcome["status"], "success")
+        self.assertEqual(steps[2]["depends_on"], [login.pk])
+        self.assertTrue(steps[2]["url"].endswith("/ok/profile/ok/slow/login"))
+        self.assertEqual(steps[3]["depends_on"], [])
+        self.assertEqual(outcome["variables"]["token"], "/ok/slow/login")
+        self.assertLess(outcome["duration_ms"], 400)
+
+    def test_sequential_and_declared_dependencies_respect_failures(self):
+        broken = self._step(1, "/broken")
+        self._step(2, "/ok/after", sequential=True)
+        self._step(3, "/ok/declared", depends_on=[1])
+
+        outcome = self._run()
+
+        self.assertEqual(outcome["status"], "failed")
+        self.assertEqual([step["step"] for step in outcome["steps"]], [broken.pk])
+
+    def test_dependency_inference(self):
+        steps = [
+            self._step(1, "/ok/a", extractions=[{"name": "user", "path": "$.path"}]),
+            self._step(2, "/ok/b", variables={"tenant": "acme"}),
+            self._step(
+                3, "/ok/c", request_payload={"headers": {"X-User": "{{ user.id }}", "X-Tenant": "{{ tenant }}"}}
+            ),
+            self._step(4, "/ok/d", request_payload={"body": "{{ $ }}"}),
+            self._step(5, "/ok/e", request_payload={"params": {"q": "{{ unknown }}"}}),
+        ]
+
+        self.assertEqual(step_dependencies(steps), [[], [], [0, 1], [0, 1, 2], []])
+        self.assertEqual(step_dependencies(steps, parallel=False)[4], [0, 1, 2, 3])
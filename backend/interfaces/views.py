@@ -1,28 +1,151 @@
-import json
-
 from django.db import transaction
-from django.db.models import Prefetch
+from django.db.models import Prefetch, Q
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from projects.caching import GenerationCacheMixin, bump_generation
 from projects.models import Project
 
-from .models import APIInterface, InterfaceCase, Scenario, ScenarioStep, TestReport, TestSuite
+from .models import APIInterface, InterfaceCase, Scenario, ScenarioStep, TestCaseResult, TestReport, TestSuite
+from .openapi import SpecError, as_stream
+from .pagination import CasePagination, ReportPagination, ResultPagination
+from .queue import enqueue_load_test, enqueue_suite_run
+from .scenarios import run_scenarios, scenario_settings
+from .search import match_path, search_interfaces
 from .serializers import (
     InterfaceCaseSerializer,
     InterfaceSerializer,
+    LoadTestConfigSerializer,
     ScenarioSerializer,
     ScenarioStepSerializer,
+    TestCaseResultSerializer,
     TestReportSerializer,
     TestSuiteSerializer,
+    bulk_settings,
 )
+from .swagger import import_spec, import_stream
+
+
+def start_load_test(request, **target):
+    config = LoadTestConfigSerializer(data=request.data)
+    config.is_valid(raise_exception=True)
+    report = enqueue_load_test(config.validated_data, **target)
+    serializer = TestReportSerializer(report, context={"request": request})
+    return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+
+class FieldSelectionMixin:
+    """Summary representation for list actions plus an opt-in ``?fields=`` selector.
+
+    List responses omit ``heavy_fields`` and defer their columns; ``?fields=a,b``
+    (on list or retrieve) returns only the named fields and loads heavy columns
+    only when they are requested. ``deferred_relations`` are never needed by
+    the serializer and are always deferred.
+    """
+
+    heavy_fields = ()
+    deferred_relations = ()
+
+    def requested_fields(self):
+        if self.request is None or self.request.method != "GET":
+            return None
+        raw = self.request.query_params.get("fields")
+        if not raw:
+            return None
+        return [name.strip() for name in raw.split(",") if name.strip()]
+
+    def deferred_fields(self):
+        fields = self.requested_fields()
+        if fields is not None:
+            heavy = [name for name in self.heavy_fields if name not in fields]
+        elif self.action == "list":
+            heavy = list(self.heavy_fields)
+        else:
+            heavy = []
+        return [*heavy, *self.deferred_relations]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        deferred = self.deferred_fields()
+        return queryset.defer(*deferred) if deferred else queryset
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.requested_fields()
+        if fields is not None:
+            kwargs.setdefault("fields", fields)
+        elif self.action == "list":
+            kwargs.setdefault("omit", self.heavy_fields)
+        return super().get_serializer(*args, **kwargs)
+
+
+class BulkWriteMixin:
+    """``/bulk/`` list route writing many rows in one transaction.
+
+    ``POST`` creates a list of items, ``PATCH`` partially updates a list of
+    items that carry their ``id`` and ``DELETE`` removes ``{"ids": [...]}``.
+    The payload is validated as a whole; see ``BulkListSerializer``.
+    """
+
+    def bulk_projects(self, objects):
+        """Projects whose cached listings the written ``objects`` belong to."""
+
+        return set()
+
+    def _bulk_error(self, message):
+        return Response({"detail": message}, status=status.HTTP_400_BAD_REQUEST)
+
+    @staticmethod
+    def _valid_ids(ids):
+        return all(isinstance(pk, int) and not isinstance(pk, bool) for pk in ids)
+
+    @action(detail=False, methods=["post", "patch", "delete"], url_path="bulk")
+    def bulk(self, request):
+        max_items = bulk_settings()["MAX_ITEMS"]
+        if request.method == "DELETE":
+            ids = request.data.get("ids") if isinstance(request.data, dict) else None
+            if not isinstance(ids, list) or not ids:
+                return self._bulk_error("Provide a non-empty ids list.")
+            if len(ids) > max_items:
+                return self._bulk_error(f"At most {max_items} items per request.")
+            if not self._valid_ids(ids):
+                return self._bulk_error("ids must be integers.")
+            with transaction.atomic():
+                objects = list(self.get_queryset().filter(pk__in=ids))
+                projects = self.bulk_projects(objects)
+                self.get_queryset().model.objects.filter(pk__in=[obj.pk for obj in objects]).delete()
+            bump_generation(*projects)
+            return Response({"deleted": len(objects)})
+
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return self._bulk_error("Expected a non-empty list of items.")
+        if len(items) > max_items:
+            return self._bulk_error(f"At most {max_items} items per request.")
+        if request.method == "POST":
+            serializer = self.get_serializer(data=items, many=True)
+        else:
+            ids = [item["id"] for item in items if isinstance(item, dict) and "id" in item]
+            if not self._valid_ids(ids):
+                return self._bulk_error("Item ids must be integers.")
+            instances = {obj.pk: obj for obj in self.get_queryset().filter(pk__in=ids)}
+            serializer = self.get_serializer(instances, data=items, many=True, partial=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            objects = serializer.save()
+        # bulk_create/bulk_update send no model signals.
+        bump_generation(*self.bulk_projects(objects))
+        return Response(
+            self.get_serializer(objects, many=True).data,
+            status=status.HTTP_201_CREATED if request.method == "POST" else status.HTTP_200_OK,
+        )
 
 
-class InterfaceViewSet(viewsets.ModelViewSet):
+class InterfaceViewSet(GenerationCacheMixin, FieldSelectionMixin, viewsets.ModelViewSet):
     serializer_class = InterfaceSerializer
+    heavy_fields = ("request_params", "request_body", "headers", "responses")
     queryset = APIInterface.objects.select_related("project").order_by("project__name", "name")
 
     def get_queryset(self):
@@ -32,15 +155,41 @@ class InterfaceViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(project_id=project_id)
         search = self.request.query_params.get("search")
         if search:
-            queryset = queryset.filter(name__icontains=search)
+            queryset = search_interfaces(queryset, search, project_id=project_id)
         return queryset
 
+    @action(detail=False, methods=["get"], url_path="match")
+    def match(self, request):
+        """Interfaces whose path template matches ``?path=``, most specific first."""
 
-class InterfaceCaseViewSet(viewsets.ModelViewSet):
+        project_id = request.query_params.get("project")
+        path = request.query_params.get("path")
+        if not project_id or not path:
+            return Response(
+                {"detail": "Provide project and path parameters."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        ids = match_path(project_id, path, request.query_params.get("method"))
+        interfaces = {interface.pk: interface for interface in self.get_queryset().filter(pk__in=ids)}
+        serializer = self.get_serializer([interfaces[pk] for pk in ids if pk in interfaces], many=True)
+        return Response({"count": len(serializer.data), "results": serializer.data})
+
+
+class InterfaceCaseViewSet(BulkWriteMixin, FieldSelectionMixin, viewsets.ModelViewSet):
     serializer_class = InterfaceCaseSerializer
+    pagination_class = CasePagination
+    heavy_fields = ("request_payload", "assertions", "extractions")
+    deferred_relations = (
+        "interface__description",
+        "interface__request_params",
+        "interface__request_body",
+        "interface__headers",
+        "environment__variables",
+        "environment__headers",
+    )
     queryset = InterfaceCase.objects.select_related("interface", "environment", "interface__project").order_by(
-        "interface__project__name",
         "name",
+        "id",
     )
 
     def get_queryset(self):
@@ -53,6 +202,9 @@ class InterfaceCaseViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(interface__project_id=project_id)
         return queryset
 
+    def bulk_projects(self, objects):
+        return {case.interface.project_id for case in objects}
+
 
 class ScenarioViewSet(viewsets.ModelViewSet):
     serializer_class = ScenarioSerializer
@@ -67,10 +219,47 @@ class ScenarioViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(project_id=project_id)
         return queryset
 
+    @action(detail=True, methods=["post"], url_path="run")
+    def run(self, request, pk=None):
+        scenario = self.get_object()
+        return Response(run_scenarios([scenario.pk])[0])
+
+    @action(detail=False, methods=["post"], url_path="run", url_name="run-many")
+    def run_many(self, request):
+        scenario_ids = request.data.get("scenarios") if isinstance(request.data, dict) else None
+        queryset = self.filter_queryset(self.get_queryset())
+        if scenario_ids is not None:
+            if not isinstance(scenario_ids, list) or not BulkWriteMixin._valid_ids(scenario_ids):
+                return Response({"scenarios": "Must be a list of scenario ids."}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = queryset.filter(pk__in=scenario_ids)
+        elif not request.query_params.get("project"):
+            return Response(
+                {"detail": "Provide a scenarios list or a project parameter."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        ids = list(queryset.values_list("pk", flat=True))
+        max_scenarios = scenario_settings()["MAX_SCENARIOS"]
+        if len(ids) > max_scenarios:
+            return Response(
+                {"detail": f"At most {max_scenarios} scenarios run per request; got {len(ids)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        results = run_scenarios(ids)
+        return Response({"count": len(results), "results": results})
+
+    @action(detail=True, methods=["post"], url_path="load-test")
+    def load_test(self, request, pk=None):
+        return start_load_test(request, scenario=self.get_object())
+
 
-class ScenarioStepViewSet(viewsets.ModelViewSet):
+class ScenarioStepViewSet(BulkWriteMixin, viewsets.ModelViewSet):
     serializer_class = ScenarioStepSerializer
-    queryset = ScenarioStep.objects.select_related("scenario", "interface_case")
+    queryset = ScenarioStep.objects.select_related(
+        "scenario", "interface_case__interface", "interface_case__environment"
+    )
+
+    def bulk_projects(self, objects):
+        return {step.scenario.project_id for step in objects}
 
 
 class TestSuiteViewSet(viewsets.ModelViewSet):
@@ -87,32 +276,58 @@ class TestSuiteViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["post"], url_path="run")
     def run(self, request, pk=None):
         suite = self.get_object()
-        execution_details = {
-            "executed_cases": suite.cases.count(),
-            "request_headers": [case.request_payload.get("headers", {}) for case in suite.cases.all()],
-        }
-        summary = request.data.get("summary") or f"Executed {execution_details['executed_cases']} cases."
-        report = TestReport.objects.create(
-            suite=suite,
-            status="success",
-            summary=summary,
-            details=execution_details,
-        )
+        try:
+            shards = int(request.data.get("shards") or 0) or None
+        except (TypeError, ValueError):
+            return Response({"shards": "Must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        report = enqueue_suite_run(suite, summary=request.data.get("summary") or "", shards=shards)
         serializer = TestReportSerializer(report, context={"request": request})
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=["post"], url_path="load-test")
+    def load_test(self, request, pk=None):
+        return start_load_test(request, suite=self.get_object())
 
 
-class TestReportViewSet(viewsets.ReadOnlyModelViewSet):
+class TestReportViewSet(FieldSelectionMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = TestReportSerializer
-    queryset = TestReport.objects.select_related("suite", "suite__project")
+    pagination_class = ReportPagination
+    heavy_fields = ("details",)
+    queryset = TestReport.objects.select_related("suite", "scenario")
 
     def get_queryset(self):
         queryset = super().get_queryset()
         project_id = self.request.query_params.get("project")
         if project_id:
-            queryset = queryset.filter(suite__project_id=project_id)
+            queryset = queryset.filter(Q(suite__project_id=project_id) | Q(scenario__project_id=project_id))
+        kind = self.request.query_params.get("kind")
+        if kind:
+            queryset = queryset.filter(kind=kind)
+        return queryset
+
+
+class TestCaseResultViewSet(viewsets.ReadOnlyModelViewSet):
+    serializer_class = TestCaseResultSerializer
+    pagination_class = ResultPagination
+    queryset = TestCaseResult.objects.all()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == "retrieve":
+            queryset = queryset.select_related("body")
+        report_id = self.request.query_params.get("report")
+        if report_id:
+            queryset = queryset.filter(report_id=report_id)
+        passed = self.request.query_params.get("passed")
+        if passed in ("true", "false"):
+            queryset = queryset.filter(passed=passed == "true")
         return queryset
 
+    def get_serializer(self, *args, **kwargs):
+        if self.action == "list":
+            kwargs.setdefault("omit", ("response_body", "response_truncated"))
+        return super().get_serializer(*args, **kwargs)
+
 
 class SwaggerImportView(APIView):
     parser_classes = [MultiPartParser, JSONParser]
@@ -129,33 +344,17 @@ class SwaggerImportView(APIView):
         raw_spec = request.data.get("swagger")
         uploaded_file = request.FILES.get("file")
 
-        if uploaded_file:
-            raw_spec = uploaded_file.read().decode("utf-8")
-
-        if not raw_spec:
+        if not uploaded_file and not raw_spec:
             return Response({"detail": "Swagger content is missing."}, status=status.HTTP_400_BAD_REQUEST)
 
+        prune = str(request.data.get("prune", "")).lower() in ("1", "true", "yes")
         try:
-            spec = json.loads(raw_spec)
-        except json.JSONDecodeError as exc:  # pragma: no cover - depends on user input
-            return Response({"detail": f"Invalid JSON: {exc}"}, status=status.HTTP_400_BAD_REQUEST)
-
-        created = []
-        with transaction.atomic():
-            for path, operations in spec.get("paths", {}).items():
-                for method, payload in operations.items():
-                    interface, _ = APIInterface.objects.update_or_create(
-                        project=project,
-                        path=path,
-                        method=method.upper(),
-                        defaults={
-                            "name": payload.get("summary") or f"{method.upper()} {path}",
-                            "description": payload.get("description", ""),
-                            "request_params": payload.get("parameters", {}),
-                            "request_body": payload.get("requestBody", {}),
-                            "headers": payload.get("headers", {}),
-                        },
-                    )
-                    created.append(interface.pk)
-
-        return Response({"created": created, "count": len(created)}, status=status.HTTP_201_CREATED)
+            if uploaded_file:
+                result = import_stream(project, uploaded_file, name=uploaded_file.name, prune=prune)
+            elif isinstance(raw_spec, dict):
+                result = import_spec(project, raw_spec, prune=prune)
+            else:
+                result = import_stream(project, as_stream(raw_spec), prune=prune)
+        except SpecError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result.as_dict(), status=status.HTTP_201_CREATED)
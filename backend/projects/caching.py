@@ -0,0 +1,163 @@
+"""Generation-keyed response caching for read-heavy list endpoints.
+
+Every project has a generation stamp in the Django cache, and so does the
+whole catalogue (``/api/projects/`` aggregates counts over all projects).
+Saving or deleting any project-owned model bumps both stamps (moving an
+object to another project bumps the old project's stamp too); bulk writes
+that bypass model signals call ``bump_generation`` themselves.
+
+``GenerationCacheMixin`` derives an ``ETag`` and ``Last-Modified`` from the
+stamp of the requested scope (``?project=`` or global), so a conditional GET
+for unchanged data is answered with ``304`` after a single cache lookup, and
+stores serialized list pages under the stamp, so unchanged pages are served
+without touching the ORM. Stale entries are never invalidated explicitly:
+they are simply no longer addressed and expire after ``TIMEOUT``.
+
+The stamps must be visible to every web process; with more than one process
+configure a shared cache backend (see ``CACHES``).
+"""
+
+import hashlib
+import time
+
+from django.core.cache import caches
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from backend.conf import AppSettings
+
+# Generation-keyed caching of list endpoints (cache alias, seconds a page is kept).
+api_cache_settings = AppSettings(
+    "API_CACHE",
+    {
+        "ALIAS": "default",
+        "TIMEOUT": 300,
+    },
+)
+
+GLOBAL_SCOPE = "all"
+
+
+def _cache():
+    return caches[api_cache_settings()["ALIAS"]]
+
+
+def _generation_key(scope):
+    return f"api-generation:{scope}"
+
+
+def get_generation(scope=GLOBAL_SCOPE):
+    """Return the scope's stamp (nanoseconds since the epoch of its last change)."""
+
+    cache = _cache()
+    key = _generation_key(scope)
+    value = cache.get(key)
+    if value is None:
+        # Unknown after a restart or eviction: start a new, never-seen generation.
+        cache.add(key, time.time_ns(), timeout=None)
+        value = cache.get(key)
+    return value
+
+
+def bump_generation(*project_ids):
+    """Invalidate cached responses of ``project_ids`` and of the global scope."""
+
+    cache = _cache()
+    now = time.time_ns()
+    for scope in {*(str(pk) for pk in project_ids if pk is not None), GLOBAL_SCOPE}:
+        key = _generation_key(scope)
+        cache.set(key, max(now, (cache.get(key) or 0) + 1), timeout=None)
+
+
+class GenerationCacheMixin:
+    """Conditional GET and a response cache for ``list`` keyed by the scope's generation."""
+
+    cache_scope_param = "project"
+
+    def cache_scope(self):
+        if self.cache_scope_param is None:
+            return GLOBAL_SCOPE
+        return self.request.query_params.get(self.cache_scope_param) or GLOBAL_SCOPE
+
+    def list(self, request, *args, **kwargs):
+        generation = get_generation(self.cache_scope())
+        scope_key = f"{request.get_host()}{request.get_full_path()}|{request.accepted_renderer.format}|{generation}"
+        fingerprint = hashlib.sha256(scope_key.encode("utf-8")).hexdigest()[:32]
+        etag = f'"{fingerprint}"'
+        last_modified = generation // 1_000_000_000
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        cache = _cache()
+        key = f"api-response:{fingerprint}"
+        data = cache.get(key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set(key, data, api_cache_settings()["TIMEOUT"])
+        response = Response(data)
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        response["Cache-Control"] = "no-cache"
+        return response
+
+
+# Signals ------------------------------------------------------------------------
+
+
+def _project_of(instance):
+    model = instance._meta.label
+    try:
+        if model == "projects.Project":
+            return instance.pk
+        if model == "interfaces.InterfaceCase":
+            return instance.interface.project_id
+        if model == "interfaces.ScenarioStep":
+            return instance.scenario.project_id
+    except ObjectDoesNotExist:  # parent removed in the same cascade; it bumps its own project
+        return None
+    return getattr(instance, "project_id", None)
+
+
+# How to read the stored project of models that reach it through a parent.
+_PROJECT_LOOKUPS = {
+    "interfaces.InterfaceCase": "interface__project_id",
+    "interfaces.ScenarioStep": "scenario__project_id",
+}
+
+
+def _remember_project(sender, instance, raw=False, **kwargs):
+    """Record the project an existing row belongs to before it is saved, so a move bumps both."""
+
+    if raw or instance.pk is None or instance._state.adding or sender._meta.label == "projects.Project":
+        return
+    lookup = _PROJECT_LOOKUPS.get(sender._meta.label, "project_id")
+    stored = sender._default_manager.filter(pk=instance.pk).values_list(lookup, flat=True)
+    instance._cached_project_id = stored.first()
+
+
+def _changed(sender, instance, **kwargs):
+    bump_generation(_project_of(instance), instance.__dict__.pop("_cached_project_id", None))
+
+
+CACHED_MODELS = (
+    "projects.Project",
+    "environments.Environment",
+    "interfaces.APIInterface",
+    "interfaces.InterfaceCase",
+    "interfaces.TestSuite",
+    "interfaces.Scenario",
+    "interfaces.ScenarioStep",
+)
+
+
+def connect_signals():
+    for model in CACHED_MODELS:
+        pre_save.connect(_remember_project, sender=model, dispatch_uid=f"api-cache-pre-save-{model}")
+        post_save.connect(_changed, sender=model, dispatch_uid=f"api-cache-save-{model}")
+        post_delete.connect(_changed, sender=model, dispatch_uid=f"api-cache-delete-{model}")
+    m2m_changed.connect(_changed, sender="interfaces.TestSuite_cases", dispatch_uid="api-cache-suite-cases")
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 17:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='spec_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
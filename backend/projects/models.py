@@ -7,6 +7,8 @@ class Project(models.Model):
     name = models.CharField(max_length=120, unique=True)
     description = models.TextField(blank=True)
     owner = models.CharField(max_length=120, blank=True)
+    # SHA-256 of the last imported Swagger/OpenAPI spec.
+    spec_hash = models.CharField(max_length=64, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -4,6 +4,10 @@ from .models import Project
 
 
 class ProjectSerializer(serializers.ModelSerializer):
+    environments = serializers.IntegerField(source="environment_count", read_only=True, default=0)
+    interfaces = serializers.IntegerField(source="interface_count", read_only=True, default=0)
+    cases = serializers.IntegerField(source="case_count", read_only=True, default=0)
+
     class Meta:
         model = Project
         fields = [
@@ -11,6 +15,9 @@ class ProjectSerializer(serializers.ModelSerializer):
             "name",
             "description",
             "owner",
+            "environments",
+            "interfaces",
+            "cases",
             "created_at",
             "updated_at",
         ]
@@ -1,3 +1,112 @@
-from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from environments.models import Environment
+from interfaces.models import APIInterface, InterfaceCase
+
+from .caching import get_generation
+from .models import Project
+
+
+class ProjectListTests(APITestCase):
+    def _create_projects(self, count):
+        for index in range(count):
+            project = Project.objects.create(name=f"project-{Project.objects.count():03d}")
+            Environment.objects.create(project=project, name="dev")
+            Environment.objects.create(project=project, name="test")
+            for number in range(index % 3 + 1):
+                interface = APIInterface.objects.create(project=project, name=f"api-{number}", path=f"/api/{number}")
+                InterfaceCase.objects.create(interface=interface, name="default")
+
+    def _list_query_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/projects/")
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.data["results"]
+
+    def test_list_exposes_counts(self):
+        self._create_projects(3)
+
+        _, results = self._list_query_count()
+
+        counts = {item["name"]: (item["environments"], item["interfaces"], item["cases"]) for item in results}
+        self.assertEqual(counts, {"project-000": (2, 1, 1), "project-001": (2, 2, 2), "project-002": (2, 3, 3)})
+
+    def test_list_query_count_is_independent_of_page_size(self):
+        self._create_projects(2)
+        small, _ = self._list_query_count()
+
+        self._create_projects(18)
+        full, results = self._list_query_count()
+
+        self.assertEqual(len(results), 20)
+        self.assertEqual(small, full)
+        self.assertLessEqual(full, 2)
+
+    def test_create_returns_zero_counts(self):
+        response = self.client.post("/api/projects/", {"name": "fresh"}, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        counts = (response.data["environments"], response.data["interfaces"], response.data["cases"])
+        self.assertEqual(counts, (0, 0, 0))
+
+
+class ListCachingTests(APITestCase):
+    def setUp(self):
+        self.project = Project.objects.create(name="demo")
+        APIInterface.objects.create(project=self.project, name="ping", path="/ping")
+
+    def test_unchanged_list_is_served_without_queries(self):
+        first = self.client.get("/api/interfaces/", {"project": self.project.pk})
+        with CaptureQueriesContext(connection) as queries:
+            conditional = self.client.get(
+                "/api/interfaces/", {"project": self.project.pk}, HTTP_IF_NONE_MATCH=first["ETag"]
+            )
+            cached = self.client.get("/api/interfaces/", {"project": self.project.pk})
+
+        self.assertEqual(conditional.status_code, 304)
+        self.assertEqual(cached.data, first.data)
+        self.assertEqual(len(queries), 0)
+
+    def test_writes_change_the_etag(self):
+        first = self.client.get("/api/projects/")
+        Environment.objects.create(project=self.project, name="dev")
+        second = self.client.get("/api/projects/", HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second["ETag"], first["ETag"])
+        self.assertEqual(second.data["results"][0]["environments"], 1)
+
+    def test_other_projects_keep_their_cache(self):
+        other = Project.objects.create(name="other")
+        first = self.client.get("/api/environments/", {"project": other.pk})
+        Environment.objects.create(project=self.project, name="dev")
+        second = self.client.get("/api/environments/", {"project": other.pk}, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(second.status_code, 304)
+
+    def test_moving_objects_refreshes_both_projects(self):
+        other = Project.objects.create(name="other")
+        environment = Environment.objects.create(project=self.project, name="dev")
+        for path, instance in (
+            ("/api/environments/", environment),
+            ("/api/interfaces/", APIInterface.objects.get(project=self.project)),
+        ):
+            first = self.client.get(path, {"project": self.project.pk})
+            instance.project = other
+            instance.save()
+            second = self.client.get(path, {"project": self.project.pk}, HTTP_IF_NONE_MATCH=first["ETag"])
+
+            self.assertEqual(second.status_code, 200)
+            self.assertEqual(second.data["results"], [])
+
+    def test_moving_a_case_to_another_project_bumps_its_old_project(self):
+        other = Project.objects.create(name="other")
+        case = InterfaceCase.objects.create(interface=APIInterface.objects.get(project=self.project), name="default")
+        before = get_generation(str(self.project.pk))
+
+        case.interface = APIInterface.objects.create(project=other, name="pong", path="/pong")
+        case.save()
+
+        self.assertGreater(get_generation(str(self.project.pk)), before)
@@ -1,41 +1,43 @@
-from django.db.models import Count
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from rest_framework import viewsets
 
 from environments.models import Environment
 from interfaces.models import APIInterface, InterfaceCase
 
+from .caching import GenerationCacheMixin
 from .models import Project
 from .serializers import ProjectSerializer
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+def _count(queryset, project_field):
+    """Correlated ``COUNT(*)`` of ``queryset`` rows belonging to the outer project."""
+
+    counts = (
+        queryset.filter(**{project_field: OuterRef("pk")})
+        .order_by()
+        .values(project_field)
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+class ProjectViewSet(GenerationCacheMixin, viewsets.ModelViewSet):
     queryset = Project.objects.all().order_by("name")
     serializer_class = ProjectSerializer
+    # The list aggregates every project, so it always uses the global generation.
+    cache_scope_param = None
 
-    def get_queryset(self):  # pragma: no cover - relies on ORM aggregation
-        queryset = super().get_queryset()
-        return queryset.annotate(
-            environment_count=Count("environments", distinct=True),
-            interface_count=Count("interfaces", distinct=True),
-            case_count=Count("interfaces__cases", distinct=True),
+    def get_queryset(self):
+        # Subqueries instead of Count() over joins: one query per page, without
+        # the environments x interfaces x cases row explosion.
+        return (
+            super()
+            .get_queryset()
+            .annotate(
+                environment_count=_count(Environment.objects.all(), "project"),
+                interface_count=_count(APIInterface.objects.all(), "project"),
+                case_count=_count(InterfaceCase.objects.all(), "interface__project"),
+            )
         )
-
-    def list(self, request, *args, **kwargs):
-        response = super().list(request, *args, **kwargs)
-        data = response.data
-        if isinstance(data, list):
-            items = data
-        else:
-            items = data.get("results", [])
-        project_ids = [project["id"] for project in items]
-        counts = {
-            project_id: {
-                "environments": Environment.objects.filter(project_id=project_id).count(),
-                "interfaces": APIInterface.objects.filter(project_id=project_id).count(),
-                "cases": InterfaceCase.objects.filter(interface__project_id=project_id).count(),
-            }
-            for project_id in project_ids
-        }
-        for item in items:
-            item.update(counts.get(item["id"], {}))
-        return response